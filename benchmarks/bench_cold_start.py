@@ -0,0 +1,87 @@
+"""
+Benchmarks the pieces of a cold start that come before the bot is listening.
+
+Times fresh interpreters importing config and the core/services packages,
+contract construction from a re-parsed ABI against the cached factory, and
+saving and restoring a warm-state snapshot with a full seen-hash set.
+
+    python -m benchmarks.bench_cold_start --repeat 5 --hashes 100000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from web3 import Web3
+
+from core.mempool_state import SeenHashes
+from core.warm_state import WarmState
+from services.abi_cache import ABI_DIR, contract_factory, load_abi
+from services.pair_reserve_cache import ReserveCache
+
+PAIR = "0x72e46e15ef83c896de44B1874B4D4BA9C7E4B9F7"
+IMPORTS = {
+    "import config": "import config",
+    "import core, services": "import core, services",
+}
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_time(statement, repeat):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return best_of(lambda: subprocess.run([sys.executable, "-c", statement], cwd=root, check=True,
+                                          stdout=subprocess.DEVNULL), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per case; the best is kept")
+    parser.add_argument("--hashes", type=int, default=100_000, help="Hashes in the seen-hash set")
+    args = parser.parse_args()
+
+    print(f"🧪 Cold start (best of {args.repeat})")
+    for name, statement in IMPORTS.items():
+        print(f"   • {name:<28} {import_time(statement, args.repeat) * 1e3:9.1f} ms   (fresh interpreter)")
+
+    web3 = Web3()
+    address = Web3.to_checksum_address(PAIR)
+
+    def uncached():
+        with open(ABI_DIR / "UniswapV2Pair.json") as f:
+            web3.eth.contract(address=address, abi=json.load(f)["abi"])
+
+    load_abi("UniswapV2Pair")
+    contract_factory(web3, "UniswapV2Pair")
+    print(f"   • {'pair contract, parsed ABI':<28} {best_of(uncached, args.repeat) * 1e3:9.2f} ms")
+    cached = best_of(lambda: contract_factory(web3, "UniswapV2Pair")(address=address), args.repeat)
+    print(f"   • {'pair contract, cached':<28} {cached * 1e3:9.2f} ms")
+
+    seen = SeenHashes()
+    for _ in range(args.hashes):
+        seen.add(os.urandom(32))
+    cache = ReserveCache()
+    cache.set_state(PAIR, 10**24, 10**15, 1, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "warm_state.json")
+        state = WarmState(path, seen_hashes=seen, cache=cache, registry=None)
+        save = best_of(state.save, args.repeat)
+        restore = best_of(lambda: WarmState(path, seen_hashes=SeenHashes(), cache=ReserveCache(),
+                                            registry=None).restore(), args.repeat)
+        size = os.path.getsize(path)
+    print(f"   • {'warm state save':<28} {save * 1e3:9.1f} ms   ({size / 1e6:.1f} MB, {args.hashes} hashes)")
+    print(f"   • {'warm state restore':<28} {restore * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Micro-benchmarks of the per-transaction hot path, with JSON baselines.
+
+Every case runs its function over a synthetic corpus sized like a busy mempool
+(see benchmarks.generators) and keeps the best of several repeats.
+
+    python -m benchmarks.bench_hot_path run --save baseline.json
+    python -m benchmarks.bench_hot_path compare baseline.json               # run now and compare
+    python -m benchmarks.bench_hot_path compare baseline.json current.json --threshold 0.15
+
+compare exits with status 1 when a case got slower than the baseline by more than
+the threshold (a fraction, 0.10 by default).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.generators import mempool_transactions, reserve_snapshots
+from core.batch_slippage import max_inputs_for_slippage
+from core.slippage import simulate_front_run_profit, simulate_swap
+from core.swap_decoder import decode_swap_calldata
+from utils import get_transaction_gas_price, is_uniswap_router_transaction
+
+ROUTER = "0xeE567Fe1712Faf6149d80dA1E6934E354124CfE3"
+SLIPPAGE_TOL = 0.015
+
+
+def best_of(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in corpus:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus)
+
+
+def cases(volume):
+    """
+    Returns:
+        dict: {case name: (fn, corpus)}, each fn taking one corpus item
+    """
+    transactions = mempool_transactions(volume, ROUTER)
+    swaps = [transaction for transaction in transactions if transaction["to"] == ROUTER]
+    snapshots = reserve_snapshots(max(volume // 10, 100))
+    sandwiches = [
+        (reserve_in, reserve_out, amount, float(max_inputs_for_slippage(reserve_in, reserve_out, tol=SLIPPAGE_TOL)))
+        for reserve_in, reserve_out, amount in snapshots
+    ]
+    return {
+        "is_uniswap_router_transaction": (lambda tx: is_uniswap_router_transaction(tx, ROUTER), transactions),
+        "get_transaction_gas_price": (get_transaction_gas_price, transactions),
+        "decode_swap_calldata": (lambda tx: decode_swap_calldata(tx["input"], tx["value"]), swaps),
+        "simulate_swap": (lambda snapshot: simulate_swap(*snapshot), snapshots),
+        "max_inputs_for_slippage": (
+            lambda snapshot: float(max_inputs_for_slippage(snapshot[0], snapshot[1], tol=SLIPPAGE_TOL)), snapshots
+        ),
+        "simulate_front_run_profit": (lambda sandwich: simulate_front_run_profit(*sandwich), sandwiches),
+    }
+
+
+def run(volume, repeat):
+    results = {}
+    for name, (fn, corpus) in cases(volume).items():
+        seconds = best_of(fn, corpus, repeat)
+        results[name] = {"ns_per_call": seconds * 1e9, "calls": len(corpus)}
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "volume": volume,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Returns:
+        list: Names of the cases slower than the baseline by more than `threshold`
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"   • {name:<30} {result['ns_per_call']:10.1f} ns   (new)")
+            continue
+        change = result["ns_per_call"] / before["ns_per_call"] - 1
+        flag = "❌" if change > threshold else "✅"
+        if change > threshold:
+            regressions.append(name)
+        print(f"   {flag} {name:<30} {before['ns_per_call']:10.1f} → {result['ns_per_call']:10.1f} ns   "
+              f"{change:+7.1%}")
+    return regressions
+
+
+def report(result):
+    for name, case in result["results"].items():
+        print(f"   • {name:<30} {case['ns_per_call']:10.1f} ns/call   {1e9 / case['ns_per_call']:12.0f} calls/s   "
+              f"({case['calls']} calls)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the suite")
+    run_parser.add_argument("--save", help="Write the results as a JSON baseline")
+    run_parser.add_argument("--volume", type=int, default=50_000, help="Pending transactions per run")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Repeats per case; the best is kept")
+    compare_parser = commands.add_parser("compare", help="Compare against a baseline")
+    compare_parser.add_argument("baseline", help="Baseline JSON")
+    compare_parser.add_argument("current", nargs="?", help="Results JSON to check; runs the suite when omitted")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown as a fraction")
+    compare_parser.add_argument("--volume", type=int, help="Pending transactions per run (baseline's by default)")
+    compare_parser.add_argument("--repeat", type=int, help="Repeats per case (baseline's by default)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        result = run(args.volume, args.repeat)
+        print(f"🧪 Hot path over {args.volume} pending txs (best of {args.repeat})")
+        report(result)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"💾 Baseline saved to {args.save}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run(args.volume or baseline["meta"]["volume"], args.repeat or baseline["meta"]["repeat"])
+    print(f"🧪 Compared with {args.baseline} ({baseline['meta']['created']}), threshold {args.threshold:.0%}")
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
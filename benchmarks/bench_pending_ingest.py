@@ -0,0 +1,148 @@
+"""
+Benchmarks pending-transaction ingest modes against a local WSS node.
+
+The node announces a synthetic mempool (router swaps mixed with unrelated
+traffic, see benchmarks.generators) at a fixed rate. Three ingest paths receive
+it and report the router swaps they find:
+
+    hashes     newPendingTransactions hashes, one get_transaction per hash
+               (MempoolPipeline fetch and filter stages, web3 parsing)
+    full       full-transaction subscription, raw-bytes router/selector filter
+    batched    hash subscription, batched lookups, raw-bytes filter
+
+For each it prints the JSON-RPC bytes exchanged with the node, the swaps found,
+and the latency from announcement to filtered swap. The node shares the event
+loop and CPU with the client, so its own serialization shows up in every mode.
+
+    python -m benchmarks.bench_pending_ingest --transactions 5000 --rate 2000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from web3 import AsyncWeb3, WebSocketProvider
+
+from benchmarks.generators import mempool_transactions
+from core.pipeline import MempoolPipeline
+from services.capture_log import to_rpc_json
+from services.mempool_fan_in import MempoolFanIn
+from services.pending_transaction_stream import PendingTransactionStream
+from services.replay_provider import FakeMempoolNode
+
+ROUTER = "0xeE567Fe1712Faf6149d80dA1E6934E354124CfE3"
+MODES = ("hashes", "full", "batched")
+
+
+def rpc_transaction(transaction, rng):
+    """
+    Returns:
+        dict: The transaction as a node returns it over JSON-RPC, signature included
+    """
+    raw = to_rpc_json(transaction)
+    raw["to"] = raw["to"].lower() if raw["to"] else None
+    raw.update(blockHash=None, blockNumber=None, transactionIndex=None, chainId="0xaa36a7",
+               v="0x1", yParity="0x1", r=hex(rng.getrandbits(256)), s=hex(rng.getrandbits(255)))
+    if "maxFeePerGas" in raw:
+        raw.update(type="0x2", accessList=[], gasPrice=raw["maxFeePerGas"])
+    else:
+        raw["type"] = "0x0"
+    return raw
+
+
+async def receive_hashes(url, found):
+    """
+    The pipeline's hash path: fan-in subscription, then fetch + filter stages.
+    """
+    web3_wss = await AsyncWeb3(WebSocketProvider(url))
+    pipeline = MempoolPipeline(web3_wss, None, None, on_swap=lambda transaction: found(transaction))
+    pipeline.tasks = [asyncio.create_task(pipeline.fetch_stage()) for _ in range(pipeline.fetch_workers)]
+    pipeline.tasks.append(asyncio.create_task(pipeline.filter_stage()))
+
+    async def discard():
+        while True:
+            await pipeline.filtered.get()
+            pipeline.filtered.task_done()
+
+    pipeline.tasks.append(asyncio.create_task(discard()))
+    fan_in = MempoolFanIn([url], standby=False, connect=lambda endpoint: AsyncWeb3(WebSocketProvider(endpoint)))
+    listener = asyncio.create_task(fan_in.run(pipeline.submit))
+    await fan_in.subscribed.wait()
+
+    async def stop():
+        await pipeline.drain()
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await pipeline.stop()
+        await web3_wss.provider.disconnect()
+
+    return stop
+
+
+async def receive_raw(url, found, full):
+    stream = PendingTransactionStream([url], router_address=ROUTER, full=full)
+    listener = asyncio.create_task(stream.run(found))
+    await stream.subscribed.wait()
+
+    async def stop():
+        await asyncio.sleep(0.05)
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+
+    return stop
+
+
+async def run(mode, transactions, rate, propagation):
+    node = FakeMempoolNode(full_transactions=mode == "full", propagation=propagation)
+    url = await node.start()
+    announced = {}
+    latencies = []
+
+    def found(transaction):
+        latencies.append(time.perf_counter() - announced["0x" + bytes(transaction["hash"]).hex()])
+
+    if mode == "hashes":
+        stop = await receive_hashes(url, found)
+    else:
+        stop = await receive_raw(url, found, full=mode == "full")
+    await asyncio.sleep(0.1)
+    node.bytes_sent = node.bytes_received = 0
+
+    start = time.perf_counter()
+    for i, (transaction_hash, transaction) in enumerate(transactions):
+        announced[transaction_hash] = time.perf_counter()
+        node.publish(transaction_hash, transaction)
+        await asyncio.sleep(max(0.0, start + (i + 1) / rate - time.perf_counter()))
+    await asyncio.sleep(max(propagation, 0.1) * 3)
+    await stop()
+    await node.stop()
+    return node.bytes_sent + node.bytes_received, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=5000, help="Pending transactions announced")
+    parser.add_argument("--rate", type=float, default=2000, help="Transactions announced per second")
+    parser.add_argument("--router-share", type=float, default=0.1, help="Fraction of router swaps")
+    parser.add_argument("--propagation", type=float, default=0.0,
+                        help="Seconds before the node can look up an announced transaction")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    transactions = [
+        ("0x" + transaction["hash"].hex(), rpc_transaction(transaction, rng))
+        for transaction in mempool_transactions(args.transactions, ROUTER, args.router_share)
+    ]
+    print(f"🧪 {args.transactions} pending txs at {args.rate:.0f}/s, {args.router_share:.0%} router swaps")
+    for mode in MODES:
+        traffic, latencies = asyncio.run(run(mode, transactions, args.rate, args.propagation))
+        latencies.sort()
+        print(f"   • {mode:<8} {traffic / 1e6:7.2f} MB   {len(latencies):5d} swaps   "
+              f"latency mean {statistics.fmean(latencies) * 1e3:7.2f} ms   "
+              f"p50 {latencies[len(latencies) // 2] * 1e3:7.2f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
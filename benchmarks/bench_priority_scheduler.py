@@ -0,0 +1,158 @@
+"""
+Burst-load benchmark of the gas-priority scheduler against a FIFO stage queue,
+through the real MempoolPipeline.
+
+A burst of pending router swaps is submitted to a pipeline whose simulation
+workers cannot keep up, while a synthetic chain keeps mining the highest-tipping
+swaps. Blocks reach the pipeline like on a live node: a BaseFeeTracker head feeds
+an InclusionTracker, which fetches the block and its receipts and reports it to
+the scheduler. A swap taken out of the decode queue waits for its inclusion in its
+own task, so the workers only bound how fast swaps are picked. A swap is picked in
+time when it was taken (and its pool projected) before the block that mined it; one
+picked after it was mined is a wasted simulation.
+
+    python -m benchmarks.bench_priority_scheduler --burst 3000 --workers 16 --analysis-ms 5
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from web3.datastructures import AttributeDict
+
+from benchmarks.generators import pending_transaction
+from config import ROUTER_CHECKSUM_ADDRESS
+from core.inclusion_tracker import InclusionTracker
+from core.pipeline import MempoolPipeline, StageQueue
+from core.priority_scheduler import effective_priority_fee
+from core.swap_submitter import BaseFeeTracker
+
+BASE_FEE = 30 * 10 ** 9
+GAS_LIMIT = 30_000_000
+
+
+def synthetic_head(number, gas_used):
+    return {"number": number, "baseFeePerGas": BASE_FEE, "gasLimit": GAS_LIMIT, "gasUsed": gas_used}
+
+
+class FifoQueue(StageQueue):
+    """
+    The decode StageQueue the scheduler replaced: arrival order, nothing evicted on a head.
+    """
+
+    mined = expired = 0
+
+    def on_head(self, block_number, included_nonces):
+        pass
+
+
+class SyntheticChain:
+    """
+    The eth namespace an InclusionTracker reads: full blocks and their receipts.
+    """
+
+    def __init__(self):
+        self.eth = self
+        self.blocks = {}
+
+    async def get_block(self, number, full_transactions=False):
+        return {"number": number, "transactions": self.blocks[number]}
+
+    async def get_block_receipts(self, number):
+        return [
+            {"transactionHash": transaction["hash"], "status": 1, "gasUsed": 120_000,
+             "effectiveGasPrice": BASE_FEE + effective_priority_fee(transaction, BASE_FEE)}
+            for transaction in self.blocks[number]
+        ]
+
+
+async def run_burst(fifo, transactions, workers, analysis_s, block_s, blocks, capacity, deadline_blocks):
+    """
+    Returns:
+        dict: Included swaps, those picked in time, simulations run, and simulations
+        wasted on swaps that were already mined
+    """
+    chain = SyntheticChain()
+    base_fee = BaseFeeTracker()
+    base_fee.update(synthetic_head(0, GAS_LIMIT // 2))
+    inclusion = InclusionTracker(chain, max_blocks=blocks + 1)
+    base_fee.listeners.append(inclusion.on_head)
+    picked_at, included_at = {}, {}
+    head = 0
+
+    def analyze(web3_http, router, transaction, decoded, pending, inclusion, **kwargs):
+        time.sleep(analysis_s)
+        return {"inclusion": inclusion.status}
+
+    pipeline = MempoolPipeline(
+        None, None, None, max_workers=workers, queue_size=len(transactions), base_fee=base_fee,
+        inclusion=inclusion, deadline_blocks=deadline_blocks, analyze=analyze,
+    )
+    if fifo:
+        pipeline.decoded = FifoQueue("decode", len(transactions))
+    get = pipeline.decoded.get
+
+    async def get_recorded():
+        item = await get()
+        picked_at[item.transaction_hash] = head
+        return item
+
+    pipeline.decoded.get = get_recorded
+    pipeline.start()
+    for transaction in transactions:
+        pipeline.submit_transaction(AttributeDict(transaction))
+
+    pending = {transaction["hash"]: transaction for transaction in transactions}
+    for block_number in range(1, blocks + 1):
+        await asyncio.sleep(block_s)
+        candidates = [tx for tx in pending.values() if effective_priority_fee(tx, BASE_FEE) >= 0]
+        candidates.sort(key=lambda tx: effective_priority_fee(tx, BASE_FEE), reverse=True)
+        chain.blocks[block_number] = candidates[:capacity]
+        for transaction in candidates[:capacity]:
+            included_at[transaction["hash"]] = block_number
+            del pending[transaction["hash"]]
+        head = block_number
+        base_fee.update(synthetic_head(block_number, GAS_LIMIT // 2))
+        for listener in base_fee.listeners:
+            listener(synthetic_head(block_number, GAS_LIMIT // 2))
+
+    await asyncio.sleep(block_s)
+    stats = pipeline.stats()
+    await pipeline.stop()
+    await inclusion.stop()
+    in_time = sum(1 for h, block in included_at.items() if h in picked_at and picked_at[h] < block)
+    wasted = sum(1 for h, block in picked_at.items() if h in included_at and block >= included_at[h])
+    return {
+        "included": len(included_at), "in_time": in_time, "simulated": stats["simulated"], "wasted": wasted,
+        "evicted": sum(stats["evicted"].values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=3000, help="Pending swaps in the burst")
+    parser.add_argument("--workers", type=int, default=16, help="Pipeline simulation workers")
+    parser.add_argument("--analysis-ms", type=float, default=5.0, help="Time per simulation")
+    parser.add_argument("--block-ms", type=float, default=100.0, help="Time between blocks")
+    parser.add_argument("--blocks", type=int, default=10, help="Blocks produced during the run")
+    parser.add_argument("--capacity", type=int, default=150, help="Swaps included per block")
+    parser.add_argument("--deadline-blocks", type=int, default=2, help="Scheduler deadline")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    transactions = [pending_transaction(rng, ROUTER_CHECKSUM_ADDRESS, BASE_FEE) for _ in range(args.burst)]
+    print(f"💥 Burst of {args.burst} swaps through the pipeline, {args.workers} workers × {args.analysis_ms} ms, "
+          f"block every {args.block_ms} ms including {args.capacity}")
+    for name, fifo in (("FIFO", True), ("Priority", False)):
+        report = asyncio.run(run_burst(
+            fifo, transactions, args.workers, args.analysis_ms / 1e3, args.block_ms / 1e3,
+            args.blocks, args.capacity, args.deadline_blocks,
+        ))
+        share = report["in_time"] / report["included"] * 100 if report["included"] else 0
+        print(f"   • {name:<9} picked in time {report['in_time']:5d}/{report['included']} included "
+              f"({share:5.1f}%), {report['simulated']} simulated, {report['wasted']} wasted on mined swaps, "
+              f"{report['evicted']} evicted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Scaling benchmark of ShardedAnalyzer from 1 to N worker processes.
+
+Replays the pending transactions of a capture log (cycled, with fresh hashes, up
+to --transactions) or synthetic V2 router swaps, publishes reserves for every
+first-hop pair, and measures decode + batch sandwich estimate + ranking
+throughput in process and on 1..N workers.
+
+    python -m benchmarks.bench_process_shards --transactions 20000 --batch 512
+    python -m benchmarks.bench_process_shards --log capture.jsonl.gz --max-processes 8
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+
+from hexbytes import HexBytes
+
+from benchmarks.generators import pending_transaction
+from core import sharded_analysis
+from core.sharded_analysis import ShardedAnalyzer, SharedReserves, analyze_shard, init_worker, transaction_record
+from core.swap_decoder import SWAP_FUNCTIONS, decode_swap_calldata
+from services.abi_cache import load_abi
+from services.capture_log import read_capture_log
+from services.pair_index import pair_registry
+
+V2_SELECTORS = [selector for selector, (name, _, _) in SWAP_FUNCTIONS.items() if name.startswith("swap")]
+
+
+def logged_transactions(path):
+    transactions = []
+    for event in read_capture_log(path):
+        if event["k"] == "rpc" and event["m"] == "eth_getTransactionByHash" and event["r"]:
+            raw = event["r"]
+            transactions.append({"hash": HexBytes(raw["hash"]), "input": HexBytes(raw["input"]),
+                                 "value": int(raw["value"], 16)})
+    return transactions
+
+
+def traffic(size, log=None, seed=0):
+    rng = random.Random(seed)
+    if log:
+        source = logged_transactions(log)
+        return [dict(transaction, hash=rng.randbytes(32))
+                for transaction in itertools.islice(itertools.cycle(source), size)]
+    return [pending_transaction(rng, "0x0", selectors=V2_SELECTORS) for _ in range(size)]
+
+
+def first_hop_pairs(transactions):
+    pairs = set()
+    for transaction in transactions:
+        call = decode_swap_calldata(transaction["input"], transaction["value"])
+        if call is not None and len(call.path) >= 2:
+            pairs.add(pair_registry.pair_address(call.path[0], call.path[1]))
+    return pairs
+
+
+def batches(transactions, size):
+    return [transactions[i:i + size] for i in range(0, len(transactions), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, default=20_000, help="Transactions analyzed per run")
+    parser.add_argument("--batch", type=int, default=512, help="Transactions per analyze() call")
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count(), help="Largest pool measured")
+    parser.add_argument("--log", help="Capture log whose transactions are replayed")
+    args = parser.parse_args()
+
+    transactions = traffic(args.transactions, args.log)
+    pairs = first_hop_pairs(transactions)
+    router_abi = load_abi("UniswapV2Router02")
+    rng = random.Random(1)
+    reserves = {pair: (rng.getrandbits(90), rng.getrandbits(80)) for pair in pairs}
+
+    shared = SharedReserves(max(len(reserves), 1))
+    for pair, (reserve0, reserve1) in reserves.items():
+        shared.set(pair, reserve0, reserve1)
+    init_worker(shared.name, shared.capacity, router_abi, pair_registry.factory, pair_registry.init_code_hash,
+                dict(pair_registry.pairs))
+    start = time.perf_counter()
+    for batch in batches(transactions, args.batch):
+        analyze_shard([transaction_record(transaction) for transaction in batch])
+    baseline = args.transactions / (time.perf_counter() - start)
+    sharded_analysis._worker["reserves"].close()
+    shared.close()
+
+    print(f"🧪 {args.transactions} {'replayed' if args.log else 'synthetic'} txs over {len(pairs)} pairs, "
+          f"batches of {args.batch}, {os.cpu_count()} CPUs")
+    print(f"   • in process   {baseline:9.0f} txs/s")
+    for processes in range(1, args.max_processes + 1):
+        analyzer = ShardedAnalyzer(router_abi, processes, cache=None, capacity=max(len(reserves), 1))
+        analyzer.start()
+        for pair, (reserve0, reserve1) in reserves.items():
+            analyzer.publish(pair, reserve0, reserve1)
+        start = time.perf_counter()
+        estimated = 0
+        for batch in batches(transactions, args.batch):
+            results, _ = analyzer.analyze(batch)
+            estimated += sum(estimate is not None for _, _, estimate in results)
+        throughput = args.transactions / (time.perf_counter() - start)
+        analyzer.stop()
+        print(f"   • {processes:2d} processes {throughput:9.0f} txs/s   ×{throughput / baseline:4.2f}   "
+              f"{estimated} estimated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmarks the batching HTTP transport against web3's HTTPProvider on a local mock node.
+
+The mock node answers eth_call (getReserves), eth_getBalance and eth_blockNumber,
+batched or not, after a fixed delay per HTTP request standing in for the network
+round trip. Worker threads issue the call mix the analysis pipeline makes.
+
+    python -m benchmarks.bench_rpc_transport --threads 16 --calls 50 --rtt-ms 20
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from web3 import HTTPProvider, Web3
+
+from services.batching_http_provider import BatchingHTTPProvider
+
+GET_RESERVES = "0x0902f1ac"
+PAIRS = [f"0x{i:040x}" for i in range(1, 3)]
+ACCOUNTS = [f"0x{i:040x}" for i in range(100, 104)]
+
+
+def answer(call):
+    if call["method"] == "eth_call":
+        result = "0x" + f"{10 ** 24:064x}{5 * 10 ** 20:064x}{0:064x}"
+    elif call["method"] == "eth_getBalance":
+        result = hex(10 ** 18)
+    elif call["method"] == "eth_chainId":
+        result = "0xaa36a7"
+    else:
+        result = "0x10"
+    return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+
+
+def mock_node(rtt, counter, ready):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            calls = payload if isinstance(payload, list) else [payload]
+            with counter.get_lock():
+                counter[0] += 1
+                counter[1] += len(calls)
+            time.sleep(rtt)
+            body = json.dumps([answer(call) for call in calls] if isinstance(payload, list) else answer(payload))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def serve_mock_node(rtt):
+    """
+    Runs the mock node in its own process, so it does not share the GIL with the callers.
+
+    Returns:
+        tuple: (process, url, counter) where counter holds [HTTP requests, node calls]
+    """
+    counter = multiprocessing.Array("q", 2)
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=mock_node, args=(rtt, counter, ready), daemon=True)
+    process.start()
+    return process, f"http://127.0.0.1:{ready.get()}", counter
+
+
+def workload(web3, calls, seed):
+    rng = random.Random(seed)
+    for _ in range(calls):
+        choice = rng.random()
+        if choice < 0.5:
+            web3.eth.call({"to": Web3.to_checksum_address(rng.choice(PAIRS)), "data": GET_RESERVES})
+        elif choice < 0.8:
+            web3.eth.get_balance(Web3.to_checksum_address(rng.choice(ACCOUNTS)))
+        else:
+            web3.eth.block_number
+
+
+def run(provider, counter, threads, calls):
+    web3 = Web3(provider)
+    counter[0] = counter[1] = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda seed: workload(web3, calls, seed), range(threads)))
+    return time.perf_counter() - start, {"requests": counter[0], "calls": counter[1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per caller")
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Mock node delay per HTTP request")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Batch window")
+    args = parser.parse_args()
+
+    node, url, counter = serve_mock_node(args.rtt_ms / 1e3)
+    total = args.threads * args.calls
+    providers = {
+        "HTTPProvider": HTTPProvider(url),
+        "BatchingHTTPProvider": BatchingHTTPProvider(url, batch_window=args.window_ms / 1e3),
+    }
+    print(f"🧪 {args.threads} threads × {args.calls} calls, {args.rtt_ms} ms per HTTP request")
+    for name, provider in providers.items():
+        elapsed, seen = run(provider, counter, args.threads, args.calls)
+        extra = ""
+        if isinstance(provider, BatchingHTTPProvider):
+            stats = provider.stats()
+            extra = f", {stats['batches']} batches, {stats['deduplicated']} deduplicated"
+        print(f"   • {name:<21} {total / elapsed:8.1f} calls/s   {seen['requests']:5d} HTTP requests "
+              f"for {seen['calls']} node calls{extra}")
+    node.terminate()
+
+
+if __name__ == "__main__":
+    main()
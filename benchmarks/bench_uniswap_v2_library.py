@@ -0,0 +1,160 @@
+"""
+Benchmarks local UniswapV2Library quotes against the router's getAmountsOut/getAmountsIn RPCs.
+
+    python -m benchmarks.bench_uniswap_v2_library            # local quotes only
+    python -m benchmarks.bench_uniswap_v2_library --rpc 20   # + RPC round trips and a parity check
+    python -m benchmarks.bench_uniswap_v2_library --rpc 40 --record tests/fixtures/uniswap_v2_router_quotes.json
+
+The parity check exits with status 1 on any mismatch. Recorded quotes are replayed
+offline by tests/test_uniswap_v2_library.py.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import timeit
+
+from core.uniswap_v2_library import get_amount_in, get_amount_out, get_amounts_in, get_amounts_out
+
+TOKENS = [f"0x{i:040x}" for i in range(1, 5)]
+
+
+def synthetic_reserves(seed=0):
+    rng = random.Random(seed)
+    reserves = {}
+    for a, b in zip(TOKENS, TOKENS[1:]):
+        reserves[(a, b)] = (rng.randrange(10 ** 20, 10 ** 26), rng.randrange(10 ** 20, 10 ** 26))
+        reserves[(b, a)] = reserves[(a, b)][::-1]
+    return reserves
+
+
+def time_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def bench_local(number=200_000):
+    reserves = synthetic_reserves()
+    get_reserves = lambda token_a, token_b: reserves[(token_a, token_b)]
+    reserve_in, reserve_out = reserves[(TOKENS[0], TOKENS[1])]
+    amount = 10 ** 18
+    results = {
+        "get_amount_out": time_call(lambda: get_amount_out(amount, reserve_in, reserve_out), number),
+        "get_amount_in": time_call(lambda: get_amount_in(amount, reserve_in, reserve_out), number),
+        "get_amounts_out (1 hop)": time_call(lambda: get_amounts_out(amount, TOKENS[:2], get_reserves), number // 4),
+        "get_amounts_out (3 hops)": time_call(lambda: get_amounts_out(amount, TOKENS, get_reserves), number // 4),
+        "get_amounts_in (3 hops)": time_call(lambda: get_amounts_in(amount, TOKENS, get_reserves), number // 4),
+    }
+    return results
+
+
+def write_quote_fixture(path, source, cases):
+    """
+    Writes router quotes in the format of tests/fixtures/uniswap_v2_router_quotes.json,
+    one case per line.
+    """
+    lines = ",\n".join("    " + json.dumps(case) for case in cases)
+    with open(path, "w") as f:
+        f.write(f'{{\n  "source": {json.dumps(source)},\n  "cases": [\n{lines}\n  ]\n}}\n')
+
+
+def record_quote(web3, router, method, amount, path, block):
+    """
+    Calls router getAmountsOut or getAmountsIn at `block` and reads the reserves of
+    every hop at the same block.
+
+    Returns:
+        dict: {"method", "amount", "path", "reserves": [[reserve_in, reserve_out], ...]}
+        plus "amounts", or "error" with the revert reason when the router reverted
+    """
+    from web3.exceptions import ContractLogicError
+    from services import fetch_pool_reserves, pair_registry
+    from core.uniswap_v2_library import sort_tokens
+
+    reserves = []
+    for pair_address, token_in, token_out in pair_registry.hops(path):
+        reserve0, reserve1 = fetch_pool_reserves(web3, pair_address, block)
+        token0, _ = sort_tokens(token_in, token_out)
+        reserves.append([reserve0, reserve1] if token_in == token0 else [reserve1, reserve0])
+    case = {"method": method, "amount": amount, "path": list(path), "reserves": reserves}
+    try:
+        case["amounts"] = list(getattr(router["contract"].functions, method)(amount, path).call(
+            block_identifier=block
+        ))
+    except ContractLogicError as e:
+        case["error"] = str(e.message or e).removeprefix("execution reverted: ")
+    return case
+
+
+def local_quote(case):
+    """
+    Returns:
+        list: The local quote of a recorded case, from the reserves recorded with it
+    """
+    path = case["path"]
+    hops = {(path[i], path[i + 1]): tuple(reserves) for i, reserves in enumerate(case["reserves"])}
+    quote = get_amounts_out if case["method"] == "getAmountsOut" else get_amounts_in
+    return quote(case["amount"], path, lambda token_a, token_b: hops[(token_a, token_b)])
+
+
+def bench_rpc(calls, record=None):
+    """
+    Times router getAmountsOut and getAmountsIn round trips on the configured node,
+    over one- and two-hop USDC/WETH paths, and checks that the local quote built from
+    the same block's reserves matches each of them bit for bit. With `record`, the
+    quotes are written there as a test fixture.
+
+    Returns:
+        tuple: (mean seconds per router call, mismatches)
+    """
+    from config import CHAIN_ID, USDC_TOKEN, WETH_TOKEN
+    from services import establish_quicknode_http_connection, initialize_uniswap_router
+
+    web3 = establish_quicknode_http_connection()
+    router = initialize_uniswap_router(web3)
+    usdc, weth = web3.to_checksum_address(USDC_TOKEN), web3.to_checksum_address(WETH_TOKEN)
+    paths = [[usdc, weth], [weth, usdc], [usdc, weth, usdc], [weth, usdc, weth]]
+    block = web3.eth.block_number
+    elapsed, mismatches, cases = [], 0, []
+    for i in range(calls):
+        method = ("getAmountsOut", "getAmountsIn")[i % 2]
+        path = paths[i // 2 % len(paths)]
+        amount = random.randrange(10 ** 6, 10 ** 18)
+        start = time.perf_counter()
+        case = record_quote(web3, router, method, amount, path, block)
+        elapsed.append(time.perf_counter() - start)
+        cases.append(case)
+        try:
+            local = local_quote(case)
+        except ValueError as e:
+            local = e
+        if list(case.get("amounts", ())) != local and not ("error" in case and isinstance(local, ValueError)):
+            mismatches += 1
+            print(f"❌ {method} mismatch for {amount} over {len(path) - 1} hops: "
+                  f"router {case.get('amounts', case.get('error'))} != local {local}")
+    if record:
+        source = f"router {router['address']} on chain {CHAIN_ID} at block {block}"
+        write_quote_fixture(record, source, cases)
+        print(f"📼 Recorded {len(cases)} router quotes to {record}")
+    return sum(elapsed) / len(elapsed), mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200_000, help="Calls per local timing loop")
+    parser.add_argument("--rpc", type=int, default=0, help="Router quote round trips to time and check")
+    parser.add_argument("--record", help="Write the router quotes of --rpc to this fixture file")
+    args = parser.parse_args()
+
+    for name, seconds in bench_local(args.number).items():
+        print(f"⚡ {name:<26} {seconds * 1e9:10.1f} ns/quote")
+    if args.rpc:
+        seconds, mismatches = bench_rpc(args.rpc, args.record)
+        print(f"🐢 {'router quote (RPC)':<26} {seconds * 1e9:10.1f} ns/quote")
+        print(f"🔍 {args.rpc - mismatches}/{args.rpc} router quotes matched bit for bit")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
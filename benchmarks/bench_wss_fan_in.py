@@ -0,0 +1,78 @@
+"""
+Benchmarks MempoolFanIn over several local WSS nodes against a single endpoint.
+
+Each fake node announces the same pending hashes with its own delay and loss
+rate. Midway one node drops all its subscribers; the fan-in resubscribes on its
+warm standby (or redials without one) while the other nodes keep delivering.
+Reports how many hashes were seen in total and by each endpoint, which endpoint
+saw them first, and how long failover took. `--handshake-ms` delays every dial
+to stand in for the TCP/TLS/WebSocket handshake with a remote node.
+
+    python -m benchmarks.bench_wss_fan_in --hashes 5000 --rate 2000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from web3 import AsyncWeb3, WebSocketProvider
+
+from services.mempool_fan_in import MempoolFanIn
+from services.replay_provider import FakeMempoolNode
+
+NODES = [(0.004, 0.10), (0.008, 0.02), (0.002, 0.30)]
+
+
+async def run(hashes, rate, standby, handshake_s):
+    async def connect(url):
+        await asyncio.sleep(handshake_s)
+        return await AsyncWeb3(WebSocketProvider(url))
+
+    nodes = [FakeMempoolNode(latency, loss, seed) for seed, (latency, loss) in enumerate(NODES)]
+    urls = [await node.start() for node in nodes]
+    fan_in = MempoolFanIn(urls, connect=connect, standby=standby)
+    delivered = []
+    follower = asyncio.create_task(fan_in.run(delivered.append))
+    while not all(endpoint.connected for endpoint in fan_in.endpoints):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+
+    published = [os.urandom(32) for _ in range(hashes)]
+    interval = 1 / rate
+    start = time.perf_counter()
+    for i, transaction_hash in enumerate(published):
+        if i == hashes // 2:
+            nodes[1].kill_connections()
+        for node in nodes:
+            node.publish("0x" + transaction_hash.hex())
+        await asyncio.sleep(max(0.0, start + (i + 1) * interval - time.perf_counter()))
+    await asyncio.sleep(0.2)
+
+    follower.cancel()
+    await asyncio.gather(follower, return_exceptions=True)
+    for node in nodes:
+        await node.stop()
+    return len(set(delivered)), fan_in.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hashes", type=int, default=5000, help="Pending hashes announced")
+    parser.add_argument("--rate", type=float, default=2000, help="Hashes announced per second")
+    parser.add_argument("--handshake-ms", type=float, default=150, help="Added delay of every connection")
+    args = parser.parse_args()
+
+    for standby in (True, False):
+        seen, stats = asyncio.run(run(args.hashes, args.rate, standby, args.handshake_ms / 1e3))
+        print(f"🧪 {'Warm standby' if standby else 'Redial only'}: {seen}/{args.hashes} hashes "
+              f"({seen / args.hashes:.1%}) seen through {len(stats)} endpoints")
+        for (latency, loss), endpoint in zip(NODES, stats):
+            lag = endpoint["mean_lag_ms"]
+            print(f"   • {latency * 1e3:.0f} ms / {loss:.0%} loss: {endpoint['received'] / args.hashes:6.1%} "
+                  f"coverage, first for {endpoint['first_seen'] / max(seen, 1):6.1%}, "
+                  f"mean lag {'-' if lag is None else f'{lag:.1f} ms'}, {endpoint['failovers']} failovers"
+                  + (f" resubscribed in {endpoint['last_failover_ms']:.1f} ms" if endpoint["failovers"] else ""))
+
+
+if __name__ == "__main__":
+    main()
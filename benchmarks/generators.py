@@ -0,0 +1,118 @@
+"""
+Synthetic mempool data for the benchmarks.
+"""
+import random
+
+from eth_abi import encode
+
+from core.swap_decoder import SWAP_FUNCTIONS
+
+
+def random_address(rng):
+    return "0x" + rng.randbytes(20).hex()
+
+
+def random_value(rng, abi_type):
+    if abi_type.startswith("(") and abi_type.endswith(")"):
+        return tuple(random_value(rng, t) for t in abi_type[1:-1].split(","))
+    if abi_type == "address[]":
+        return [random_address(rng) for _ in range(rng.randint(2, 4))]
+    if abi_type == "address":
+        return random_address(rng)
+    if abi_type == "bytes":
+        return rng.randbytes(43)
+    if abi_type == "bytes[]":
+        return [rng.randbytes(rng.randint(32, 160)) for _ in range(rng.randint(1, 3))]
+    bits = int(abi_type[4:] or 256)
+    return rng.getrandbits(min(bits, 96))
+
+
+def swap_calldata(rng, selector):
+    """
+    Encodes a random call of the router swap function behind `selector`.
+    """
+    _, types, _ = SWAP_FUNCTIONS[selector]
+    values = [random_value(rng, abi_type) for abi_type in types]
+    return selector + encode(list(types), values)
+
+
+def calldata_corpus(size, selectors=None, seed=0):
+    """
+    Returns `size` random swap calldata blobs spread evenly over `selectors`
+    (every known swap selector by default).
+    """
+    rng = random.Random(seed)
+    selectors = list(selectors or SWAP_FUNCTIONS)
+    return [swap_calldata(rng, selectors[i % len(selectors)]) for i in range(size)]
+
+
+def pending_transaction(rng, router, base_fee=30 * 10 ** 9, selectors=None):
+    """
+    Returns a random pending router swap shaped like web3's get_transaction result:
+    a one-off sender at nonce 0, legacy or EIP-1559 fees around `base_fee`.
+    """
+    selector = rng.choice(list(selectors or SWAP_FUNCTIONS))
+    transaction = {
+        "hash": rng.randbytes(32),
+        "from": random_address(rng),
+        "nonce": 0,
+        "to": router,
+        "value": rng.getrandbits(64),
+        "input": swap_calldata(rng, selector),
+        "gas": 250_000,
+    }
+    tip = int(rng.lognormvariate(0, 1.2) * 10 ** 9)
+    if rng.random() < 0.2:
+        transaction["gasPrice"] = int(base_fee * rng.uniform(0.8, 1.3)) + tip
+    else:
+        transaction["maxPriorityFeePerGas"] = tip
+        transaction["maxFeePerGas"] = int(base_fee * rng.uniform(0.8, 2.0)) + tip
+    return transaction
+
+
+def other_transaction(rng, base_fee=30 * 10 ** 9):
+    """
+    Returns a random pending transaction that is not a router swap: an ETH transfer,
+    a call to some other contract or a contract creation.
+    """
+    kind = rng.random()
+    transaction = {
+        "hash": rng.randbytes(32),
+        "from": random_address(rng),
+        "nonce": rng.randrange(1000),
+        "to": random_address(rng),
+        "value": rng.getrandbits(60) if kind < 0.4 else 0,
+        "input": b"" if kind < 0.4 else rng.randbytes(4 + 32 * rng.randint(1, 6)),
+        "gas": 21_000 if kind < 0.4 else 120_000,
+        "maxPriorityFeePerGas": int(rng.lognormvariate(0, 1.2) * 10 ** 9),
+    }
+    if kind > 0.97:
+        transaction["to"] = None
+    transaction["maxFeePerGas"] = int(base_fee * rng.uniform(1.0, 2.0)) + transaction["maxPriorityFeePerGas"]
+    return transaction
+
+
+def mempool_transactions(size, router, router_share=0.1, seed=0):
+    """
+    Returns `size` pending transactions mixed like a busy mempool: `router_share` of
+    them are router swaps spread over every known swap selector, the rest unrelated.
+    """
+    rng = random.Random(seed)
+    return [
+        pending_transaction(rng, router) if rng.random() < router_share else other_transaction(rng)
+        for _ in range(size)
+    ]
+
+
+def reserve_snapshots(size, seed=0):
+    """
+    Returns `size` (reserve_in, reserve_out, victim_amount_in) snapshots: pool depths
+    spread over several orders of magnitude and victims trading 0.01%-2% of the pool.
+    """
+    rng = random.Random(seed)
+    snapshots = []
+    for _ in range(size):
+        reserve_in = int(10 ** rng.uniform(20, 26))
+        reserve_out = int(reserve_in * 10 ** rng.uniform(-4, 4))
+        snapshots.append((reserve_in, reserve_out, int(reserve_in * 10 ** rng.uniform(-4, -1.7))))
+    return snapshots
@@ -1 +1,2 @@
 from .settings import *
+from .settings import __getattr__
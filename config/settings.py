@@ -1,17 +1,27 @@
+import functools
 import os
 import sys
+
 from dotenv import load_dotenv
-from eth_account import Account
-from prettytable import PrettyTable
-from web3 import Web3
 
 load_dotenv()
 
-def require_env(var_name, message=None):
+REQUIRED_ENV = []
+
+
+def require_env(var_name):
+    """
+    Reads a required variable. A missing one is only reported by validate(), so
+    importing config never exits and tools that do not need it still run.
+    """
+    REQUIRED_ENV.append(var_name)
+    return os.getenv(var_name) or None
+
+def optional_env(var_name, default, cast=str):
     value = os.getenv(var_name)
     if not value:
-        sys.exit(message or f"🔑 Please add your {var_name.lower()} to the .env file to continue!")
-    return value
+        return default
+    return cast(value)
 
 ACCOUNT_PRIVATE_KEY = require_env("ACCOUNT_PRIVATE_KEY")
 QUICK_NODE_HTTP_URL = require_env("QUICK_NODE_HTTP_URL")
@@ -24,25 +34,127 @@ GECKOTERMINAL_API = require_env("GECKOTERMINAL_API")
 NETWORK = require_env("NETWORK")
 FACTORYV2 = require_env("FACTORYV2")
 USDC_WETH_POOL = require_env("USDC_WETH_POOL")
+PAIR_INIT_CODE_HASH = optional_env(
+    "PAIR_INIT_CODE_HASH", "0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f"
+)
+QUICK_NODE_WSS_URLS = optional_env("QUICK_NODE_WSS_URLS", QUICK_NODE_WSS_URL or "").split(",")
+PENDING_INGEST = optional_env("PENDING_INGEST", "hashes")
+PENDING_RETRY_DELAYS = optional_env(
+    "PENDING_RETRY_DELAYS", (0.3,), lambda value: tuple(float(delay) for delay in value.split(","))
+)
+WSS_STANDBY = optional_env("WSS_STANDBY", True, lambda value: value.lower() in ("1", "true", "yes"))
+
+PIPELINE_WORKERS = optional_env("PIPELINE_WORKERS", 4, int)
+PIPELINE_FETCH_WORKERS = optional_env("PIPELINE_FETCH_WORKERS", 8, int)
+PIPELINE_QUEUE_SIZE = optional_env("PIPELINE_QUEUE_SIZE", 1024, int)
+PIPELINE_DROP_POLICY = optional_env("PIPELINE_DROP_POLICY", "drop_oldest")
+PIPELINE_PROCESSES = optional_env("PIPELINE_PROCESSES", 0, int)
+PIPELINE_DEADLINE_BLOCKS = optional_env("PIPELINE_DEADLINE_BLOCKS", 2, int)
+PIPELINE_MAX_WATCHED = optional_env("PIPELINE_MAX_WATCHED", 256, int)
+INCLUSION_MAX_BLOCKS = optional_env("INCLUSION_MAX_BLOCKS", 20, int)
+CAPTURE_LOG_PATH = optional_env("CAPTURE_LOG_PATH", None)
+
+RPC_BATCH_WINDOW = optional_env("RPC_BATCH_WINDOW", 0.002, float)
+RPC_MAX_BATCH = optional_env("RPC_MAX_BATCH", 50, int)
+RPC_POOL_SIZE = optional_env("RPC_POOL_SIZE", 8, int)
+RPC_RATE_LIMIT = optional_env("RPC_RATE_LIMIT", 0.0, float)
+
+PRICE_TTL = optional_env("PRICE_TTL", 30.0, float)
+PRICE_MAX_STALENESS = optional_env("PRICE_MAX_STALENESS", 300.0, float)
+PRICE_REFRESH_INTERVAL = optional_env("PRICE_REFRESH_INTERVAL", 15.0, float)
+PRICE_HTTP_POOL_SIZE = optional_env("PRICE_HTTP_POOL_SIZE", 4, int)
+PRICE_HTTP_TIMEOUT = optional_env("PRICE_HTTP_TIMEOUT", 5.0, float)
+PRICE_RETRY_BACKOFF = optional_env("PRICE_RETRY_BACKOFF", 10.0, float)
+USDC_PEG_USD = optional_env("USDC_PEG_USD", 1.0, float)
+
+OUTPUT_DIR = optional_env("OUTPUT_DIR", "output")
+OUTPUT_FORMATS = optional_env("OUTPUT_FORMATS", "jsonl").split(",")
+OUTPUT_MAX_BYTES = optional_env("OUTPUT_MAX_BYTES", 64 << 20, int)
+OUTPUT_MAX_SECONDS = optional_env("OUTPUT_MAX_SECONDS", 3600, int)
+OUTPUT_FLUSH_RECORDS = optional_env("OUTPUT_FLUSH_RECORDS", 16, int)
+
+METRICS_ENABLED = optional_env("METRICS_ENABLED", False, lambda value: value.lower() in ("1", "true", "yes"))
+METRICS_HOST = optional_env("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = optional_env("METRICS_PORT", 9464, int)
+METRICS_REPORT_INTERVAL = optional_env("METRICS_REPORT_INTERVAL", 60, int)
+
+WARM_STATE_PATH = optional_env("WARM_STATE_PATH", None)
+WARM_STATE_INTERVAL = optional_env("WARM_STATE_INTERVAL", 30.0, float)
+WARM_STATE_MAX_AGE = optional_env("WARM_STATE_MAX_AGE", 600.0, float)
+STARTUP_BUDGET = optional_env("STARTUP_BUDGET", 5.0, float)
+
+
+@functools.cache
+def load_account():
+    """
+    Returns:
+        LocalAccount: The signing account, built from ACCOUNT_PRIVATE_KEY on first use
+    """
+    from eth_account import Account
+
+    return Account.from_key(ACCOUNT_PRIVATE_KEY)
+
+
+def checksum_router_address():
+    from eth_utils import to_checksum_address
+    return to_checksum_address(ROUTER_ADDRESS) if ROUTER_ADDRESS else None
+
+
+DERIVED_SETTINGS = {
+    "CHAIN_ID": lambda: int(CHAIN_ID_NUMBER) if CHAIN_ID_NUMBER else None,
+    "ROUTER_CHECKSUM_ADDRESS": checksum_router_address,
+    "ACCOUNT": load_account,
+}
+
+
+def __getattr__(name):
+    """
+    Derives CHAIN_ID, ROUTER_CHECKSUM_ADDRESS and ACCOUNT on first access, so
+    importing config costs neither web3 nor eth_account.
+    """
+    if name not in DERIVED_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name not in globals():
+        globals()[name] = DERIVED_SETTINGS[name]()
+    return globals()[name]
+
+
+def validate():
+    """
+    Checks every required variable and derived setting at once and exits with
+    all the problems found, instead of failing on the first use of a bad value.
+    """
+    problems = [f"🔑 Please add your {name.lower()} to the .env file to continue!"
+                for name in REQUIRED_ENV if globals()[name] is None]
+    if not problems:
+        for name in DERIVED_SETTINGS:
+            try:
+                __getattr__(name)
+            except Exception as e:
+                problems.append(f"🔑 Invalid value behind {name}: {e}")
+    if problems:
+        sys.exit("\n".join(problems))
+
+
+def print_settings():
+    from prettytable import PrettyTable
 
-CHAIN_ID = int(CHAIN_ID_NUMBER)
-ROUTER_CHECKSUM_ADDRESS = Web3.to_checksum_address(ROUTER_ADDRESS)
-ACCOUNT = Account.from_key(ACCOUNT_PRIVATE_KEY)
-
-t = PrettyTable(["Name", "Value"])
-t._max_width = {"Name": 50, "Value": 75}
-t.hrules = True
-t.add_row(["Account address", ACCOUNT.address])
-t.add_row(["Account private key", ACCOUNT_PRIVATE_KEY])
-t.add_row(["Quick Node HTTP URL", QUICK_NODE_HTTP_URL])
-t.add_row(["Quick Node WSS URL", QUICK_NODE_WSS_URL])
-t.add_row(["Chain ID", CHAIN_ID_NUMBER])
-t.add_row(["Router address", ROUTER_ADDRESS])
-t.add_row(["USDC Token", USDC_TOKEN])
-t.add_row(["WETH Token", WETH_TOKEN])
-t.add_row(["GeckoTerminal API", GECKOTERMINAL_API])
-t.add_row(["Network", NETWORK])
-t.add_row(["FactoryV2", FACTORYV2])
-t.add_row(["USDC/WETH Pool", USDC_WETH_POOL])
-
-print(t)
\ No newline at end of file
+    t = PrettyTable(["Name", "Value"])
+    t._max_width = {"Name": 50, "Value": 75}
+    t.hrules = True
+    t.add_row(["Account address", load_account().address])
+    t.add_row(["Quick Node HTTP URL", QUICK_NODE_HTTP_URL])
+    t.add_row(["Quick Node WSS URL", QUICK_NODE_WSS_URL])
+    t.add_row(["Mempool WSS endpoints", len(QUICK_NODE_WSS_URLS)])
+    t.add_row(["Pending ingest", PENDING_INGEST])
+    t.add_row(["Chain ID", CHAIN_ID_NUMBER])
+    t.add_row(["Router address", ROUTER_ADDRESS])
+    t.add_row(["USDC Token", USDC_TOKEN])
+    t.add_row(["WETH Token", WETH_TOKEN])
+    t.add_row(["GeckoTerminal API", GECKOTERMINAL_API])
+    t.add_row(["Network", NETWORK])
+    t.add_row(["FactoryV2", FACTORYV2])
+    t.add_row(["USDC/WETH Pool", USDC_WETH_POOL])
+    t.add_row(["Pipeline workers", PIPELINE_WORKERS])
+    t.add_row(["Warm state", WARM_STATE_PATH or "off"])
+    print(t)
@@ -1,3 +1,10 @@
 from .execute_swap import *
 from .track_mempool import *
 from .slippage import *
+from .pipeline import *
+from .batch_slippage import *
+from .uniswap_v2_library import *
+from .swap_decoder import *
+from .swap_submitter import *
+from .mempool_state import *
+from .instrumentation import *
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+def simulate_swaps(reserve_in, reserve_out, amount_in, fee: float = 0.003):
+    """
+    Vectorized simulate_swap: the same constant-product formulas applied to arrays
+    of candidates at once. Scalars broadcast against arrays.
+
+    returns: (amount_out, price_before, price_after, price_impact) as float64 arrays
+    """
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    reserve_out = np.asarray(reserve_out, dtype=np.float64)
+    amount_in_with_fee = np.asarray(amount_in, dtype=np.float64) * (1 - fee)
+    amount_out = (amount_in_with_fee * reserve_out) / (reserve_in + amount_in_with_fee)
+    price_before = reserve_out / reserve_in
+    price_after = (reserve_out - amount_out) / (reserve_in + amount_in_with_fee)
+    price_impact = (price_before - price_after) / price_before
+    return amount_out, price_before, price_after, price_impact
+
+
+def max_inputs_for_slippage(reserve_in,
+                            reserve_out,
+                            tol: float = 0.0005,
+                            fee: float = 0.003,
+                            max_fraction: float = 0.5):
+    """
+    Closed-form max_input_for_slippage over arrays.
+
+    With the simulate_swap formulas price_after / price_before equals
+    (reserve_in / (reserve_in + amount_in·γ))², so price_impact ≤ tol solves to
+    amount_in ≤ reserve_in · (1 / √(1 − tol) − 1) / γ, capped at max_fraction · reserve_in.
+    """
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    amount_in = reserve_in * (1 / np.sqrt(1 - tol) - 1) / (1 - fee)
+    return np.minimum(amount_in, reserve_in * max_fraction)
+
+
+def max_front_run_inputs(reserve_in,
+                         reserve_out,
+                         victim_amount_in,
+                         victim_min_out,
+                         fee: float = 0.003):
+    """
+    Largest front-run that still lets each victim receive victim_min_out.
+
+    A front-run of x leaves reserves (R_in + x, R_in·R_out / (R_in + γx)), and the
+    victim's output bound γ·v·R_out·R_in ≥ m·(R_in + γx)·(R_in + x + γv) is a
+    quadratic in x:
+        γm·x² + m·(R_in·(1 + γ) + γv)·x + m·R_in·(R_in + γv) − γ·v·R_out·R_in ≤ 0
+    whose positive root is the bound. Candidates whose victim cannot reach
+    victim_min_out even without a front-run get 0, and a victim_min_out of 0
+    gives an unbounded (inf) front-run.
+    """
+    gamma = 1 - fee
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    reserve_out = np.asarray(reserve_out, dtype=np.float64)
+    victim = np.asarray(victim_amount_in, dtype=np.float64)
+    min_out = np.asarray(victim_min_out, dtype=np.float64)
+    a = gamma * min_out
+    b = min_out * (reserve_in * (1 + gamma) + gamma * victim)
+    c = min_out * reserve_in * (reserve_in + gamma * victim) - gamma * victim * reserve_out * reserve_in
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = (-b + np.sqrt(np.maximum(b * b - 4 * a * c, 0))) / (2 * a)
+    root = np.where(a > 0, root, np.inf)
+    return np.maximum(np.nan_to_num(root, nan=0.0, posinf=np.inf), 0)
+
+
+def optimal_front_run_inputs(reserve_in,
+                             reserve_out,
+                             victim_amount_in,
+                             victim_min_out,
+                             fee: float = 0.003,
+                             max_fraction: float = 0.5):
+    """
+    Profit-maximizing front-run for every candidate, without any search.
+
+    The sandwich profit P(x) does not depend on R_out, and the numerator of
+    dP/dx is the quadratic A·x² + B·x + C with
+        A = (γ − 1)·(R_in·(1 + γ) − γ²·v)
+        B = 2·R_in·(γ²·(R_in + v) − R_in)
+        C = R_in·(γ³·v·(R_in + v) + γ²·R_in·(R_in + v) − R_in²)
+    C ≤ 0 means even the first wei of front-run loses money. Otherwise the
+    positive root is the unconstrained optimum, which is then limited by the
+    victim's slippage bound (max_front_run_inputs) and max_fraction · R_in.
+    """
+    gamma = 1 - fee
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    victim = np.asarray(victim_amount_in, dtype=np.float64)
+    a = (gamma - 1) * (reserve_in * (1 + gamma) - gamma ** 2 * victim)
+    b = 2 * reserve_in * (gamma ** 2 * (reserve_in + victim) - reserve_in)
+    c = reserve_in * (gamma ** 3 * victim * (reserve_in + victim)
+                      + gamma ** 2 * reserve_in * (reserve_in + victim) - reserve_in ** 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quadratic = (-b - np.sqrt(np.maximum(b * b - 4 * a * c, 0))) / (2 * a)
+        linear = -c / b
+    optimum = np.where(a != 0, quadratic, linear)
+    optimum = np.where(c > 0, np.nan_to_num(optimum, nan=0.0), 0)
+    bound = max_front_run_inputs(reserve_in, reserve_out, victim, victim_min_out, fee)
+    return np.clip(np.minimum(optimum, bound), 0, reserve_in * max_fraction)
+
+
+def simulate_sandwiches(reserve_in,
+                        reserve_out,
+                        victim_amount_in,
+                        victim_min_out=None,
+                        slippage_tol: float = 0.005,
+                        fee: float = 0.003,
+                        max_fraction: float = 0.5):
+    """
+    Sizes and values a front-run + victim + back-run sandwich for every candidate.
+
+    Uses the exact UniswapV2 reserve updates (the whole input stays in the pool).
+    When victim_min_out is not known it is derived from the victim's expected
+    output and slippage_tol.
+
+    returns: dict of float64 arrays
+        amount_out      victim output without a front-run
+        price_impact    victim price impact without a front-run
+        attacker_input  optimal front-run size, in the input token
+        attacker_output tokens bought by the front-run
+        victim_output   victim output after the front-run
+        profit          back-run proceeds minus attacker_input, in the input token
+    """
+    gamma = 1 - fee
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    reserve_out = np.asarray(reserve_out, dtype=np.float64)
+    victim = np.asarray(victim_amount_in, dtype=np.float64)
+    amount_out, _, _, price_impact = simulate_swaps(reserve_in, reserve_out, victim, fee)
+    if victim_min_out is None:
+        victim_min_out = amount_out * (1 - slippage_tol)
+    attacker_input = optimal_front_run_inputs(
+        reserve_in, reserve_out, victim, victim_min_out, fee, max_fraction
+    )
+    attacker_output = gamma * attacker_input * reserve_out / (reserve_in + gamma * attacker_input)
+    reserve_in_1 = reserve_in + attacker_input
+    reserve_out_1 = reserve_out - attacker_output
+    victim_output = gamma * victim * reserve_out_1 / (reserve_in_1 + gamma * victim)
+    reserve_in_2 = reserve_in_1 + victim
+    reserve_out_2 = reserve_out_1 - victim_output
+    back_run_output = gamma * attacker_output * reserve_in_2 / (reserve_out_2 + gamma * attacker_output)
+    return {
+        "amount_out": amount_out,
+        "price_impact": price_impact,
+        "attacker_input": attacker_input,
+        "attacker_output": attacker_output,
+        "victim_output": victim_output,
+        "profit": back_run_output - attacker_input,
+    }
+
+
+def rank_sandwiches(profit, top=None):
+    """
+    Returns candidate indices ordered by descending profit, optionally only the best `top`.
+    """
+    profit = np.asarray(profit, dtype=np.float64)
+    if top is not None and top < profit.size:
+        best = np.argpartition(-profit, top)[:top]
+        return best[np.argsort(-profit[best])]
+    return np.argsort(-profit)
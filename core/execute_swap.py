@@ -1,41 +1,54 @@
-import json
 import os
-import random
 import time
-from config import ACCOUNT, CHAIN_ID
+from config import CHAIN_ID, USDC_WETH_POOL, load_account
 from eth_utils import to_hex
+from core.uniswap_v2_library import cached_reserves_lookup, get_amounts_out
 
 
-def execute_swap(web3, router, amount_eth):
+def execute_swap(web3, router, amount_eth, submitter=None):
     """
     Executes a test swap transaction on the Uniswap router.
 
     Args:
         web3: Web3 instance
         router_contract: Contract instance of the Uniswap router
+        submitter (SwapSubmitter, optional): Warm submission engine. When given, the nonce,
+            gas limit, fees and calldata come from its local caches instead of RPCs.
 
     Returns:
         str: Transaction hash of the executed swap
     """
 
     deadline = int(time.time()) + 900
-    nonce = web3.eth.get_transaction_count(ACCOUNT.address, "pending")
     weth_address = web3.to_checksum_address(os.getenv("WETH_TOKEN"))
     usdc_address = web3.to_checksum_address(os.getenv("USDC_TOKEN"))
     # get_liquidity(web3, weth_address, usdc_address)
     amount_in_wei = web3.to_wei(amount_eth, "ether")
-    amounts_out = router["contract"].functions.getAmountsOut(amount_in_wei, [usdc_address, weth_address]).call()
+    quote_path = [usdc_address, weth_address]
+    try:
+        get_reserves = cached_reserves_lookup({(usdc_address, weth_address): USDC_WETH_POOL})
+        amounts_out = get_amounts_out(amount_in_wei, quote_path, get_reserves)
+    except LookupError:
+        amounts_out = router["contract"].functions.getAmountsOut(amount_in_wei, quote_path).call()
     min_amount_out = int(amounts_out[-1] * (1 - 0.01))
+    if submitter:
+        tx_hash, _ = submitter.swap_exact_eth_for_tokens(
+            amount_in_wei, min_amount_out, [weth_address, usdc_address], deadline
+        )
+        print("💸 Sent test swap:", to_hex(tx_hash))
+        return tx_hash
+    account = load_account()
+    nonce = web3.eth.get_transaction_count(account.address, "pending")
     gas_estimate = router["contract"].functions.swapExactETHForTokens(min_amount_out, [weth_address, usdc_address],
-        ACCOUNT.address, deadline).estimate_gas({"from": ACCOUNT.address, "value": amount_in_wei, })
+        account.address, deadline).estimate_gas({"from": account.address, "value": amount_in_wei, })
     gas_limit = int(gas_estimate * 1.2)
     latest = web3.eth.get_block("latest")
     base_fee = latest["baseFeePerGas"]
     tip = web3.to_wei(2, "gwei")
     max_fee = base_fee + tip
     tx = (router["contract"].functions.swapExactETHForTokens(min_amount_out, [weth_address, usdc_address],
-        ACCOUNT.address, deadline).build_transaction({
-    "from":                   ACCOUNT.address,
+        account.address, deadline).build_transaction({
+    "from":                   account.address,
     "value":                  amount_in_wei,
     "nonce":                  nonce,
     "gas":                    gas_limit,
@@ -43,7 +56,7 @@ def execute_swap(web3, router, amount_eth):
     "maxFeePerGas":           max_fee,
     "chainId":                CHAIN_ID,
     }))
-    signed = ACCOUNT.sign_transaction(tx)
+    signed = account.sign_transaction(tx)
     tx_hash = web3.eth.send_raw_transaction(signed.raw_transaction)
     print("💸 Sent test swap:", to_hex(tx_hash))
     return tx_hash
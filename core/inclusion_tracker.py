@@ -0,0 +1,164 @@
+import asyncio
+from collections import deque
+
+from config import INCLUSION_MAX_BLOCKS
+
+MINED = "mined"
+REPLACED = "replaced"
+DROPPED = "dropped"
+
+
+class Inclusion:
+    """
+    Outcome of a watched transaction: mined (with its receipt), replaced by another
+    transaction with the same sender and nonce, or dropped after too many blocks.
+    """
+
+    __slots__ = ("status", "block_number", "receipt", "replaced_by")
+
+    def __init__(self, status, block_number=None, receipt=None, replaced_by=None):
+        self.status = status
+        self.block_number = block_number
+        self.receipt = receipt
+        self.replaced_by = replaced_by
+
+    def __repr__(self):
+        return f"Inclusion({self.status}, block={self.block_number})"
+
+
+class IncludedBlock:
+    """
+    Receipts and used (sender, nonce) slots of one block, indexed once for all watchers.
+    """
+
+    __slots__ = ("number", "receipts", "nonces", "max_nonces")
+
+    def __init__(self, number, block, receipts):
+        self.number = number
+        self.receipts = {bytes(receipt["transactionHash"]): receipt for receipt in receipts}
+        self.nonces = {}
+        self.max_nonces = {}
+        for transaction in block["transactions"]:
+            sender = transaction["from"]
+            self.nonces[(sender, transaction["nonce"])] = bytes(transaction["hash"])
+            self.max_nonces[sender] = max(self.max_nonces.get(sender, -1), transaction["nonce"])
+
+    def resolve(self, transaction_hash, sender, nonce):
+        """
+        Returns:
+            Inclusion | None: The outcome of the transaction in this block, if any
+        """
+        receipt = self.receipts.get(transaction_hash)
+        if receipt is not None:
+            return Inclusion(MINED, self.number, receipt)
+        if nonce <= self.max_nonces.get(sender, -1):
+            return Inclusion(REPLACED, self.number, replaced_by=self.nonces.get((sender, nonce)))
+        return None
+
+
+class InclusionTracker:
+    """
+    Resolves the inclusion of many pending transactions from one stream of heads.
+
+    Every new head costs two RPCs however many transactions are watched: the block
+    with its transactions and eth_getBlockReceipts. Both are indexed by hash and
+    (sender, nonce), and every waiting future is settled from that index at once.
+    The last `history` blocks are kept so a transaction mined before it was watched
+    resolves immediately. Feed heads by adding on_head to a BaseFeeTracker's
+    listeners; callables in `listeners` get (block_number, highest nonce per sender)
+    of every processed block.
+
+    Args:
+        web3: AsyncWeb3 instance used to fetch blocks and receipts
+        max_blocks (int, optional): Blocks after which a watched transaction that was
+            neither mined nor replaced is reported dropped. Defaults to INCLUSION_MAX_BLOCKS.
+        history (int, optional): Recent blocks kept for late watchers. Defaults to 8.
+    """
+
+    def __init__(self, web3, max_blocks=INCLUSION_MAX_BLOCKS, history=8):
+        self.web3 = web3
+        self.max_blocks = max_blocks
+        self.blocks = deque(maxlen=history)
+        self.watched = {}
+        self.listeners = []
+        self.block_number = None
+        self.tasks = set()
+        self.lock = asyncio.Lock()
+
+    def watch(self, transaction):
+        """
+        Returns:
+            asyncio.Future: Resolves to the Inclusion of the transaction
+        """
+        transaction_hash = bytes(transaction["hash"])
+        entry = self.watched.get(transaction_hash)
+        if entry is not None:
+            return entry[0]
+        future = asyncio.get_running_loop().create_future()
+        sender, nonce = transaction["from"], transaction["nonce"]
+        for block in reversed(self.blocks):
+            inclusion = block.resolve(transaction_hash, sender, nonce)
+            if inclusion is not None:
+                future.set_result(inclusion)
+                return future
+        self.watched[transaction_hash] = (future, sender, nonce, self.block_number)
+        return future
+
+    def on_head(self, head):
+        task = asyncio.create_task(self.process(head["number"]))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def fetch(self, block_number):
+        block, receipts = await asyncio.gather(
+            self.web3.eth.get_block(block_number, full_transactions=True),
+            self.web3.eth.get_block_receipts(block_number),
+        )
+        return IncludedBlock(block_number, block, receipts)
+
+    async def process(self, block_number):
+        """
+        Fetches the new block (and any skipped since the last one) and settles its watchers.
+        Stops at the first block that fails to fetch, so the next head fetches it again
+        instead of reporting its swaps as dropped.
+        """
+        async with self.lock:
+            first = block_number if self.block_number is None else self.block_number + 1
+            for number in range(max(first, block_number - self.blocks.maxlen + 1), block_number + 1):
+                try:
+                    block = await self.fetch(number)
+                except Exception as e:
+                    print(f"❌ Error fetching block {number}:", str(e))
+                    return
+                self.blocks.append(block)
+                self.settle(block)
+                for listener in self.listeners:
+                    listener(number, block.max_nonces)
+                self.block_number = number
+
+    def settle(self, block):
+        for transaction_hash, (future, sender, nonce, since) in list(self.watched.items()):
+            inclusion = block.resolve(transaction_hash, sender, nonce)
+            if inclusion is None and since is None:
+                self.watched[transaction_hash] = (future, sender, nonce, block.number)
+                continue
+            if inclusion is None and block.number - since >= self.max_blocks:
+                inclusion = Inclusion(DROPPED, block.number)
+            if inclusion is None:
+                continue
+            del self.watched[transaction_hash]
+            if not future.done():
+                future.set_result(inclusion)
+
+    async def stop(self):
+        """
+        Cancels block processing and reports every transaction still watched as dropped.
+        """
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for future, _, _, _ in self.watched.values():
+            if not future.done():
+                future.set_result(Inclusion(DROPPED, self.block_number))
+        self.watched.clear()
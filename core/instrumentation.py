@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from contextlib import nullcontext
+
+from config import METRICS_ENABLED
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+NULL_TIMER = nullcontext()
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear latency histogram with microsecond resolution.
+
+    Values below 2**sub_bits µs get their own bucket; above that every power of two
+    is split into 2**(sub_bits - 1) linear buckets, so the relative error stays
+    below 2**-(sub_bits - 1) (about 3% with the default) at any magnitude while
+    the number of buckets only grows with the log of the largest value.
+    """
+
+    def __init__(self, sub_bits=6):
+        self.sub_bits = sub_bits
+        self.buckets = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def bucket(self, micros):
+        shift = micros.bit_length() - self.sub_bits
+        if shift <= 0:
+            return micros
+        return (micros >> shift) << shift
+
+    def record(self, seconds):
+        floor = self.bucket(int(seconds * 1e6))
+        with self.lock:
+            self.buckets[floor] = self.buckets.get(floor, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentiles(self, quantiles=QUANTILES):
+        """
+        Returns:
+            dict: quantile -> latency in seconds (bucket lower bound)
+        """
+        with self.lock:
+            buckets = sorted(self.buckets.items())
+            count = self.count
+        result = {}
+        seen = 0
+        pending = list(quantiles)
+        for floor, hits in buckets:
+            seen += hits
+            while pending and seen >= pending[0] * count:
+                result[pending.pop(0)] = floor / 1e6
+        for q in pending:
+            result[q] = self.max
+        return result
+
+
+class Metrics:
+    """
+    Process-wide latency histograms and counters.
+
+    Every entry point returns immediately while disabled, and timer() hands back a
+    shared no-op context manager, so instrumented hot paths pay one attribute check.
+    Histograms and counters are created on first use and are safe to update from
+    the pipeline's worker threads.
+
+    Args:
+        enabled (bool, optional): Collect metrics. Defaults to METRICS_ENABLED.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def observe(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def inc(self, name, amount=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timer(self, name):
+        """
+        Context manager recording the duration of its block into histogram `name`.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name)
+
+    def render_prometheus(self, prefix="mev_bot"):
+        """
+        Returns:
+            str: All metrics in the Prometheus text exposition format; histograms are
+            exported as summaries with HDR quantiles.
+        """
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, histogram in sorted(self.histograms.items()):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for q, value in histogram.percentiles().items():
+                lines.append(f'{metric}{{quantile="{q}"}} {value:.6f}')
+            lines.append(f"{metric}_sum {histogram.sum:.6f}")
+            lines.append(f"{metric}_count {histogram.count}")
+        lines.append(f"# TYPE {prefix}_uptime_seconds gauge")
+        lines.append(f"{prefix}_uptime_seconds {time.time() - self.started:.1f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Returns:
+            str: One line per histogram and one line of counters, for the periodic log
+        """
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            p = histogram.percentiles()
+            lines.append(
+                f"   • {name:<14} n={histogram.count:<7} p50 {p[0.5] * 1e3:8.2f} ms   "
+                f"p99 {p[0.99] * 1e3:8.2f} ms   max {histogram.max * 1e3:8.2f} ms"
+            )
+        if self.counters:
+            lines.append("   • " + ", ".join(f"{name} {value}" for name, value in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    async def handle_scrape(self, reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = self.render_prometheus().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=9464):
+        """
+        Starts the Prometheus scrape endpoint; every path serves the metrics.
+
+        Returns:
+            asyncio.Server: Close it to stop serving
+        """
+        server = await asyncio.start_server(self.handle_scrape, host, port)
+        print(f"📈 Metrics served on http://{host}:{port}/metrics")
+        return server
+
+    async def report(self, interval=60):
+        """
+        Prints the summary every `interval` seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            print("📈 Latency summary\n" + self.summary())
+
+
+class Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+metrics = Metrics()
@@ -0,0 +1,143 @@
+import heapq
+import time
+from collections import OrderedDict
+
+from utils import get_transaction_gas_price
+
+
+class SwapRecord:
+    """
+    Compact record of a captured router swap, kept instead of the full transaction.
+    """
+
+    __slots__ = (
+        "hash", "sender", "nonce", "gas_price", "max_priority_fee", "value", "selector", "seen_at",
+    )
+
+    def __init__(self, hash, sender, nonce, gas_price, max_priority_fee, value, selector, seen_at=None):
+        self.hash = hash
+        self.sender = sender
+        self.nonce = nonce
+        self.gas_price = gas_price
+        self.max_priority_fee = max_priority_fee
+        self.value = value
+        self.selector = selector
+        self.seen_at = time.time() if seen_at is None else seen_at
+
+    @classmethod
+    def from_transaction(cls, transaction):
+        return cls(
+            bytes(transaction["hash"]),
+            transaction["from"],
+            transaction["nonce"],
+            get_transaction_gas_price(transaction),
+            transaction.get("maxPriorityFeePerGas"),
+            transaction["value"],
+            bytes(transaction["input"][:4]),
+        )
+
+    def to_dict(self):
+        return {
+            "hash": "0x" + self.hash.hex(),
+            "from": self.sender,
+            "nonce": self.nonce,
+            "gasPrice": self.gas_price,
+            "maxPriorityFeePerGas": self.max_priority_fee,
+            "value": self.value,
+            "selector": "0x" + self.selector.hex(),
+            "seenAt": self.seen_at,
+        }
+
+
+class SeenHashes:
+    """
+    Bounded dedup set of transaction hashes.
+
+    The most recent `capacity` hashes are kept exactly in an LRU. Older hashes fall
+    through to two rotating Bloom filters, so memory stays flat however long the
+    process runs, at the cost of a small false-positive rate on old hashes only.
+    Transaction hashes are keccak digests, so their bytes serve directly as the
+    Bloom filter's hash functions.
+
+    Args:
+        capacity (int, optional): Hashes kept exactly in the LRU.
+        bloom_bits (int, optional): Bits per Bloom filter generation.
+        bloom_hashes (int, optional): Bit positions set per hash.
+    """
+
+    def __init__(self, capacity=100_000, bloom_bits=1 << 23, bloom_hashes=4):
+        self.capacity = capacity
+        self.bloom_bits = bloom_bits
+        self.bloom_hashes = bloom_hashes
+        self.recent = OrderedDict()
+        self.blooms = [bytearray(bloom_bits // 8), bytearray(bloom_bits // 8)]
+        self.bloom_count = 0
+
+    def positions(self, transaction_hash):
+        return [
+            int.from_bytes(transaction_hash[4 * i:4 * i + 4], "big") % self.bloom_bits
+            for i in range(self.bloom_hashes)
+        ]
+
+    def in_bloom(self, positions):
+        return any(
+            all(bloom[p >> 3] & (1 << (p & 7)) for p in positions) for bloom in self.blooms
+        )
+
+    def retire(self, transaction_hash):
+        if self.bloom_count >= self.capacity * 4:
+            self.blooms = [bytearray(self.bloom_bits // 8), self.blooms[0]]
+            self.bloom_count = 0
+        bloom = self.blooms[0]
+        for p in self.positions(transaction_hash):
+            bloom[p >> 3] |= 1 << (p & 7)
+        self.bloom_count += 1
+
+    def add(self, transaction_hash):
+        """
+        Returns:
+            bool: True if the hash was not seen before
+        """
+        transaction_hash = bytes(transaction_hash)
+        if transaction_hash in self.recent:
+            self.recent.move_to_end(transaction_hash)
+            return False
+        if self.in_bloom(self.positions(transaction_hash)):
+            return False
+        self.recent[transaction_hash] = None
+        if len(self.recent) > self.capacity:
+            oldest, _ = self.recent.popitem(last=False)
+            self.retire(oldest)
+        return True
+
+    def __len__(self):
+        return len(self.recent)
+
+
+class TopKSwaps:
+    """
+    Streaming top-K of swap records by gas price, kept in a bounded min-heap.
+    """
+
+    def __init__(self, k=20):
+        self.k = k
+        self.heap = []
+        self.counter = 0
+
+    def push(self, record):
+        entry = (record.gas_price, self.counter, record)
+        self.counter += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def sorted(self):
+        """
+        Returns:
+            list: The kept records, highest gas price first
+        """
+        return [record for _, _, record in sorted(self.heap, key=lambda entry: (-entry[0], entry[1]))]
+
+    def __len__(self):
+        return len(self.heap)
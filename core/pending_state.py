@@ -0,0 +1,325 @@
+import threading
+from bisect import bisect_left, insort
+
+from core.priority_scheduler import effective_priority_fee
+from core.uniswap_v2_library import get_amount_in, get_amount_out, sort_tokens
+
+
+class PendingSwap:
+    """
+    A pending swap on one pair, ordered by (-effective priority fee, nonce, arrival).
+
+    Exact-input swaps carry amount_in. Exact-output swaps carry amount_out and the
+    amount_in_max they revert above; their input is derived from the reserves they meet.
+    """
+
+    __slots__ = (
+        "hash", "transaction", "sender", "nonce", "zero_for_one", "amount_in", "amount_out", "amount_in_max",
+        "sequence", "key",
+    )
+
+    def __init__(self, transaction, zero_for_one, amount_in=None, amount_out=None, amount_in_max=None,
+                 sequence=0):
+        self.hash = bytes(transaction["hash"])
+        self.transaction = transaction
+        self.sender = transaction["from"]
+        self.nonce = transaction["nonce"]
+        self.zero_for_one = zero_for_one
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+        self.amount_in_max = amount_in_max
+        self.sequence = sequence
+        self.key = None
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class PendingPool:
+    """
+    Pending swaps of one pair with their projected reserves.
+
+    projected[i] holds the (reserve0, reserve1) left after applying swaps[0..i] in
+    order on top of the on-chain reserves. Arrivals, re-rankings and removals only
+    truncate the projections from the changed position; they are extended again
+    lazily, and only as far as the next query needs. Swaps are priced with exact
+    UniswapV2Library amounts, and one that would revert leaves the reserves as they are.
+
+    Args:
+        reserve0 (int, optional): On-chain reserve of token0.
+        reserve1 (int, optional): On-chain reserve of token1.
+    """
+
+    def __init__(self, reserve0=0, reserve1=0):
+        self.base = (reserve0, reserve1)
+        self.swaps = []
+        self.projected = []
+        self.by_hash = {}
+
+    def __len__(self):
+        return len(self.swaps)
+
+    def invalidate(self, index):
+        del self.projected[index:]
+
+    def set_reserves(self, reserve0, reserve1):
+        """
+        Rebases the projections on new on-chain reserves; a no-op if they did not change.
+        """
+        if (reserve0, reserve1) != self.base:
+            self.base = (reserve0, reserve1)
+            self.projected.clear()
+
+    def index(self, swap):
+        return bisect_left(self.swaps, swap)
+
+    def add(self, swap):
+        insort(self.swaps, swap)
+        self.by_hash[swap.hash] = swap
+        self.invalidate(self.index(swap))
+
+    def remove(self, transaction_hash):
+        """
+        Drops a swap that was mined, replaced or evicted.
+
+        Returns:
+            bool: True if the swap was pending here
+        """
+        swap = self.by_hash.pop(transaction_hash, None)
+        if swap is None:
+            return False
+        index = self.index(swap)
+        del self.swaps[index]
+        self.invalidate(index)
+        return True
+
+    def rekey(self, swap, key):
+        """
+        Moves a queued swap to the position of its new key.
+        """
+        index = self.index(swap)
+        del self.swaps[index]
+        swap.key = key
+        insort(self.swaps, swap)
+        self.invalidate(min(index, self.index(swap)))
+
+    def resort(self):
+        self.swaps.sort()
+        self.projected.clear()
+
+    def apply(self, reserves, swap):
+        reserve0, reserve1 = reserves
+        reserve_in, reserve_out = (reserve0, reserve1) if swap.zero_for_one else (reserve1, reserve0)
+        try:
+            if swap.amount_out is None:
+                amount_in, amount_out = swap.amount_in, get_amount_out(swap.amount_in, reserve_in, reserve_out)
+            else:
+                amount_in, amount_out = get_amount_in(swap.amount_out, reserve_in, reserve_out), swap.amount_out
+                if amount_in > swap.amount_in_max:
+                    return reserves
+        except ValueError:
+            return reserves
+        if swap.zero_for_one:
+            return reserve0 + amount_in, reserve1 - amount_out
+        return reserve0 - amount_out, reserve1 + amount_in
+
+    def projected_reserves(self, index):
+        """
+        Returns:
+            tuple: (reserve0, reserve1) after the first `index` pending swaps ran
+        """
+        if index == 0:
+            return self.base
+        reserves = self.projected[-1] if self.projected else self.base
+        for swap in self.swaps[len(self.projected):index]:
+            reserves = self.apply(reserves, swap)
+            self.projected.append(reserves)
+        return self.projected[index - 1]
+
+    def reserves_before(self, transaction_hash):
+        """
+        Returns:
+            tuple: (reserves, ahead) — the reserves the swap is expected to execute
+            against, and how many pending swaps are ordered before it
+        """
+        index = self.index(self.by_hash[transaction_hash])
+        return self.projected_reserves(index), index
+
+
+class PendingState:
+    """
+    Pending swaps per watched pair, so a victim is priced after every swap the
+    block builder is expected to order before it rather than against bare
+    on-chain reserves. Thread-safe: the pipeline adds swaps on the event loop while
+    slippage_trigger queries from worker threads.
+
+    Swaps are ordered like a builder fills a block: by effective priority fee at
+    the projected next base fee, but never ahead of a lower nonce of the same sender.
+    A sender's swap therefore ranks with the lowest fee among its earlier pending
+    nonces. The ranking is refreshed on every new head.
+
+    Args:
+        base_fee (BaseFeeTracker, optional): Source of the projected next base fee.
+            Without it swaps are ranked by gas price.
+    """
+
+    def __init__(self, base_fee=None):
+        self.base_fee = base_fee
+        self.pools = {}
+        self.tokens = {}
+        self.pairs_by_tokens = {}
+        self.pair_of = {}
+        self.by_sender = {}
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def watch(self, pair_address, token_a, token_b):
+        """
+        Tracks the pending swaps of a pair. The tokens may come in any order; they are
+        sorted here like the pair sorts them, so reserves_before() takes raw on-chain
+        (reserve0, reserve1).
+        """
+        pair_address = pair_address.lower()
+        token0, token1 = sort_tokens(token_a.lower(), token_b.lower())
+        self.pools[pair_address] = PendingPool()
+        self.tokens[pair_address] = token0
+        self.pairs_by_tokens[frozenset((token0, token1))] = pair_address
+
+    def add_transaction(self, transaction, params):
+        """
+        Queues a decoded router swap if its first hop trades on a watched pair.
+        Exact-output swaps are only queued on a single-hop path, where the amount out
+        of the first hop is known.
+
+        Args:
+            transaction (dict): The pending transaction
+            params (dict): Decoded swap arguments (web3 names)
+
+        Returns:
+            str | None: The pair address the swap was queued on
+        """
+        path = params.get("path") or []
+        if len(path) < 2:
+            return None
+        token_in, token_out = path[0].lower(), path[1].lower()
+        pair_address = self.pairs_by_tokens.get(frozenset((token_in, token_out)))
+        if pair_address is None:
+            return None
+        zero_for_one = token_in == self.tokens[pair_address]
+        if params.get("amountOut"):
+            amount_in_max = params.get("amountInMax") or transaction["value"]
+            if len(path) != 2 or not amount_in_max:
+                return None
+            amounts = {"amount_out": params["amountOut"], "amount_in_max": amount_in_max}
+        else:
+            amount_in = params.get("amountIn") or transaction["value"]
+            if not amount_in:
+                return None
+            amounts = {"amount_in": amount_in}
+        with self.lock:
+            self.sequence += 1
+            swap = PendingSwap(transaction, zero_for_one, sequence=self.sequence, **amounts)
+            replaced = self.by_sender.get(swap.sender, {}).get(swap.nonce)
+            if replaced is not None:
+                self.discard(replaced)
+            self.by_sender.setdefault(swap.sender, {})[swap.nonce] = swap.hash
+            self.pair_of[swap.hash] = pair_address
+            self.rank_sender(swap.sender, added=swap)
+            self.pools[pair_address].add(swap)
+        return pair_address
+
+    def next_base_fee(self):
+        return self.base_fee.next_base_fee if self.base_fee else None
+
+    def swap(self, transaction_hash):
+        return self.pools[self.pair_of[transaction_hash]].by_hash.get(transaction_hash)
+
+    def rank_sender(self, sender, added=None, moved=True):
+        """
+        Keys a sender's swaps in nonce order, each capped at the lowest effective
+        priority fee of the swaps before it. `added` is keyed but not yet queued;
+        with moved=False the keys change in place and the caller re-sorts the pools.
+        """
+        base_fee = self.next_base_fee()
+        cap = None
+        for nonce, transaction_hash in sorted(self.by_sender.get(sender, {}).items()):
+            swap = added if added is not None and added.hash == transaction_hash else self.swap(transaction_hash)
+            fee = effective_priority_fee(swap.transaction, base_fee)
+            cap = fee if cap is None else min(cap, fee)
+            key = (-cap, nonce, swap.sequence)
+            if swap.key == key:
+                continue
+            if swap is added or not moved:
+                swap.key = key
+            else:
+                self.pools[self.pair_of[transaction_hash]].rekey(swap, key)
+
+    def discard(self, transaction_hash):
+        pair_address = self.pair_of.get(transaction_hash)
+        if pair_address is None:
+            return
+        swap = self.pools[pair_address].by_hash[transaction_hash]
+        self.pools[pair_address].remove(transaction_hash)
+        del self.pair_of[transaction_hash]
+        nonces = self.by_sender[swap.sender]
+        del nonces[swap.nonce]
+        if nonces:
+            self.rank_sender(swap.sender)
+        else:
+            del self.by_sender[swap.sender]
+
+    def remove(self, transaction_hash):
+        """
+        Drops a swap once it was mined or dropped from the mempool.
+        """
+        with self.lock:
+            self.discard(bytes(transaction_hash))
+
+    def on_head(self, block_number, included_nonces):
+        """
+        Drops the swaps a new block mined or replaced, so they are not projected again
+        on top of on-chain reserves that already include them, and re-ranks the rest
+        for the next base fee. Registered as an InclusionTracker listener.
+
+        Args:
+            block_number (int): Number of the new head
+            included_nonces (dict): Highest nonce included in the head per sender
+        """
+        with self.lock:
+            for sender, nonces in list(self.by_sender.items()):
+                included = included_nonces.get(sender, -1)
+                for nonce in [nonce for nonce in nonces if nonce <= included]:
+                    pair_address = self.pair_of.pop(nonces[nonce])
+                    self.pools[pair_address].remove(nonces.pop(nonce))
+                if not nonces:
+                    del self.by_sender[sender]
+            for sender in self.by_sender:
+                self.rank_sender(sender, moved=False)
+            for pool in self.pools.values():
+                pool.resort()
+
+    def reserves_before(self, transaction_hash, reserve0, reserve1):
+        """
+        Projects the reserves a pending swap will meet on its pair.
+
+        Args:
+            transaction_hash (bytes): The pending swap
+            reserve0 (int): Current on-chain reserve of token0
+            reserve1 (int): Current on-chain reserve of token1
+
+        Returns:
+            tuple | None: ((reserve0, reserve1), ahead), or None if the swap is not tracked
+        """
+        with self.lock:
+            pair_address = self.pair_of.get(bytes(transaction_hash))
+            if pair_address is None:
+                return None
+            pool = self.pools[pair_address]
+            pool.set_reserves(reserve0, reserve1)
+            return pool.reserves_before(bytes(transaction_hash))
+
+    def __contains__(self, transaction_hash):
+        return bytes(transaction_hash) in self.pair_of
+
+    def __len__(self):
+        return len(self.pair_of)
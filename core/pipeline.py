@@ -0,0 +1,519 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    PENDING_RETRY_DELAYS,
+    PIPELINE_DEADLINE_BLOCKS,
+    PIPELINE_DROP_POLICY,
+    PIPELINE_FETCH_WORKERS,
+    PIPELINE_MAX_WATCHED,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_WORKERS,
+)
+from utils import is_uniswap_router_transaction
+from core.instrumentation import metrics
+from core.priority_scheduler import PriorityScheduler
+from core.slippage import project_reserves, slippage_trigger
+from core.sharded_analysis import ESTIMATE_FIELDS
+from core.swap_decoder import SwapCall, decode_swap_calldata
+
+BLOCK = "block"
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+DROP_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+PROFIT = ESTIMATE_FIELDS.index("profit")
+
+
+class PipelineItem:
+    """
+    A pending transaction travelling through the pipeline stages.
+    """
+
+    __slots__ = (
+        "transaction_hash", "transaction", "decoded", "result", "estimate", "received_at", "stamps",
+        "last_stamp", "attempts",
+    )
+
+    def __init__(self, transaction_hash):
+        self.transaction_hash = transaction_hash
+        self.transaction = None
+        self.attempts = 0
+        self.decoded = None
+        self.result = None
+        self.estimate = None
+        self.received_at = self.last_stamp = time.perf_counter()
+        self.stamps = {}
+
+    def stamp(self, stage):
+        now = self.stamps[stage] = time.perf_counter()
+        if metrics.enabled:
+            metrics.observe(stage, now - self.last_stamp)
+            if stage == "simulate":
+                metrics.observe("total", now - self.received_at)
+        self.last_stamp = now
+
+
+def estimated_profit(item):
+    """
+    Returns:
+        float: Profit of the sandwich estimate attached by a ShardedAnalyzer, 0 without one
+    """
+    return item.estimate[PROFIT] if item.estimate is not None else 0.0
+
+
+class StageQueue:
+    """
+    Bounded queue joining two pipeline stages.
+
+    With the "block" policy producers wait for free space (backpressure). With
+    "drop_newest" the incoming item is discarded when the queue is full, and with
+    "drop_oldest" the oldest queued item is evicted to make room for it.
+    """
+
+    def __init__(self, name, maxsize=PIPELINE_QUEUE_SIZE, policy=BLOCK):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {policy!r}, expected one of {DROP_POLICIES}")
+        self.name = name
+        self.policy = policy
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def put_nowait(self, item):
+        """
+        Enqueues an item without waiting, applying the drop policy when full.
+
+        Returns:
+            bool: True if the item was enqueued
+        """
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.inc(f"dropped_{self.name}")
+            if self.policy != DROP_OLDEST:
+                return False
+        self.queue.get_nowait()
+        self.queue.task_done()
+        self.queue.put_nowait(item)
+        return True
+
+    async def put(self, item):
+        if self.policy == BLOCK:
+            await self.queue.put(item)
+            return True
+        return self.put_nowait(item)
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def get_batch(self, limit):
+        """
+        Waits for one item, then takes whatever else is already queued, up to `limit`.
+        """
+        items = [await self.queue.get()]
+        while len(items) < limit and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    def task_done(self):
+        self.queue.task_done()
+
+    async def join(self):
+        await self.queue.join()
+
+    def qsize(self):
+        return self.queue.qsize()
+
+
+class MempoolPipeline:
+    """
+    Staged analysis pipeline: ingest → fetch → filter → decode → simulate.
+
+    Pending hashes are handed to submit() by the mempool listener and never wait on
+    analysis; the ingest queue sheds load according to its drop policy instead.
+    Hashes the node does not know yet go back to the ingest queue after each of
+    `retry_delays`, scheduled with call_later so no fetch worker sleeps on them.
+    Full transactions already filtered on the wire (PendingTransactionStream) enter
+    through submit_transaction() and skip the fetch stage. The
+    fetch and filter stages are joined by blocking queues so a slow stage backs up
+    into the ingest queue. Decoded swaps wait for simulation in a PriorityScheduler,
+    so the ones most likely to land in the next block are analyzed first and those
+    mined, replaced or past their deadline are evicted on each block reported by the
+    InclusionTracker, which also resolves the receipts the simulation needs without
+    holding a worker: a swap taken out of the scheduler waits in its own task, so
+    every watched swap is settled from the same block fetch. At most `max_watched`
+    swaps wait at once; the rest stay ranked in the scheduler until one resolves.
+    Calldata is decoded with the precompiled selector decoders;
+    synchronous web3 work (the generic ABI decode fallback and slippage_trigger)
+    runs on a thread pool so it never stalls the event loop. With a ShardedAnalyzer,
+    filtered swaps are instead decoded in micro-batches across its worker processes,
+    which also attach a first-hop sandwich estimate to every swap they can price.
+    The scheduler simulates the more profitable estimate first among swaps paying
+    the same priority fee, so the workers skip the cross-shard ranking.
+
+    Args:
+        web3_wss: AsyncWeb3 instance used to fetch pending transactions
+        web3_http: Web3 HTTP instance used for the analysis
+        router (dict): Router configuration returned by initialize_uniswap_router
+        on_swap (callable, optional): Called with each router swap as it passes the filter.
+        max_workers (int, optional): Size of the worker pool for synchronous work.
+        fetch_workers (int, optional): Number of concurrent get_transaction calls.
+        queue_size (int, optional): Capacity of every stage queue.
+        drop_policy (str, optional): Policy of the ingest queue when it is full.
+        on_complete (callable, optional): Called with every PipelineItem that finished
+            simulation, carrying the perf_counter stamps of each stage.
+        capture_log (CaptureLogWriter, optional): Records pending hashes and fetched
+            transactions for offline replay.
+        seen_hashes (SeenHashes, optional): Dedup set; hashes already seen are not refetched.
+        pending_state (PendingState, optional): Decoded swaps are queued there so each one is
+            simulated after the pending swaps ordered before it, projected before waiting for
+            its inclusion, and removed once simulated or mined.
+        base_fee (BaseFeeTracker, optional): Running newHeads tracker used to rank decoded
+            swaps by effective priority fee.
+        inclusion (InclusionTracker, optional): Resolves the inclusion of simulated swaps
+            and reports the blocks used to evict stale decoded swaps. Without it every
+            simulation polls its own receipt.
+        deadline_blocks (int, optional): Blocks a decoded swap may wait for simulation.
+        max_watched (int, optional): Swaps that may wait for their inclusion at once.
+            Defaults to PIPELINE_MAX_WATCHED.
+        shards (ShardedAnalyzer, optional): Started process pool that decodes and estimates
+            filtered swaps in batches of up to `shard_batch`.
+        shard_batch (int, optional): Largest batch handed to the process pool. Defaults to 256.
+        retry_delays (tuple, optional): Seconds before each new fetch of a hash the node did
+            not know yet. Defaults to PENDING_RETRY_DELAYS.
+        account_address (str, optional): Account whose balance slippage_trigger lists with
+            every swap. Not read when None.
+        analyze (callable, optional): Simulation run on the thread pool with the arguments of
+            slippage_trigger. Defaults to slippage_trigger.
+    """
+
+    def __init__(
+        self,
+        web3_wss,
+        web3_http,
+        router,
+        on_swap=None,
+        max_workers=PIPELINE_WORKERS,
+        fetch_workers=PIPELINE_FETCH_WORKERS,
+        queue_size=PIPELINE_QUEUE_SIZE,
+        drop_policy=PIPELINE_DROP_POLICY,
+        on_complete=None,
+        capture_log=None,
+        seen_hashes=None,
+        pending_state=None,
+        base_fee=None,
+        inclusion=None,
+        deadline_blocks=PIPELINE_DEADLINE_BLOCKS,
+        max_watched=PIPELINE_MAX_WATCHED,
+        shards=None,
+        shard_batch=256,
+        retry_delays=PENDING_RETRY_DELAYS,
+        account_address=None,
+        analyze=slippage_trigger,
+    ):
+        if drop_policy == BLOCK:
+            raise ValueError("The ingest queue must not block the mempool listener")
+        self.web3_wss = web3_wss
+        self.web3_http = web3_http
+        self.router = router
+        self.on_swap = on_swap
+        self.on_complete = on_complete
+        self.capture_log = capture_log
+        self.seen_hashes = seen_hashes
+        self.pending_state = pending_state
+        self.base_fee = base_fee
+        self.inclusion = inclusion
+        self.shards = shards
+        self.shard_batch = shard_batch
+        self.retry_delays = tuple(retry_delays)
+        self.account_address = account_address
+        self.analyze = analyze
+        self.max_workers = max_workers
+        self.fetch_workers = fetch_workers
+        self.ingest = StageQueue("ingest", queue_size, drop_policy)
+        self.fetched = StageQueue("fetch", queue_size)
+        self.filtered = StageQueue("filter", queue_size)
+        self.decoded = PriorityScheduler(
+            "decode", queue_size, base_fee, deadline_blocks, on_evict=self.evicted, tiebreak=estimated_profit
+        )
+        self.received = 0
+        self.duplicates = 0
+        self.fetch_misses = 0
+        self.fetch_retries = 0
+        self.simulated = 0
+        self.simulation_errors = 0
+        self.last_error = None
+        self.awaiting_inclusion = 0
+        self.waiting = set()
+        self.watch_slots = asyncio.Semaphore(max_watched)
+        self.executor = None
+        self.tasks = []
+        self.retries = set()
+
+    def start(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="pipeline"
+        )
+        stages = [self.fetch_stage] * self.fetch_workers
+        stages += [self.filter_stage, self.decode_stage]
+        stages += [self.simulate_stage] * self.max_workers
+        self.tasks = [asyncio.create_task(stage()) for stage in stages]
+        if self.inclusion:
+            self.inclusion.listeners.extend(self.head_listeners())
+
+    def head_listeners(self):
+        listeners = [self.decoded.on_head]
+        if self.pending_state is not None:
+            listeners.append(self.pending_state.on_head)
+        return listeners
+
+    async def stop(self):
+        if self.inclusion:
+            for listener in self.head_listeners():
+                if listener in self.inclusion.listeners:
+                    self.inclusion.listeners.remove(listener)
+        for handle in self.retries:
+            handle.cancel()
+        self.retries.clear()
+        tasks = self.tasks + list(self.waiting)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks = []
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def submit(self, transaction_hash):
+        """
+        Ingests a pending transaction hash without ever waiting on analysis.
+
+        Returns:
+            bool: True if the hash was queued, False if it was dropped
+        """
+        self.received += 1
+        metrics.inc("received")
+        if self.seen_hashes is not None and not self.seen_hashes.add(transaction_hash):
+            self.duplicates += 1
+            metrics.inc("duplicates")
+            return False
+        if self.capture_log:
+            self.capture_log.pending(transaction_hash)
+        return self.ingest.put_nowait(PipelineItem(transaction_hash))
+
+    def submit_transaction(self, transaction):
+        """
+        Ingests a pending transaction that arrived in full, skipping the fetch stage.
+        The caller has already deduplicated it against seen_hashes.
+
+        Returns:
+            bool: True if the transaction was queued, False if it was dropped
+        """
+        self.received += 1
+        metrics.inc("received")
+        item = PipelineItem(bytes(transaction["hash"]))
+        item.transaction = transaction
+        if self.capture_log:
+            self.capture_log.pending(item.transaction_hash)
+            self.capture_log.transaction(item.transaction_hash, transaction)
+        item.stamp("fetch")
+        return self.fetched.put_nowait(item)
+
+    async def drain(self):
+        """
+        Waits until every item submitted so far has left the pipeline, including
+        hashes waiting for a fetch retry.
+        """
+        while True:
+            for queue in (self.ingest, self.fetched, self.filtered, self.decoded):
+                await queue.join()
+            if not self.retries:
+                return
+            await asyncio.sleep(min(self.retry_delays))
+
+    async def run_sync(self, fn, *args, **kwargs):
+        if kwargs:
+            fn = functools.partial(fn, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def evicted(self, item):
+        if self.pending_state is not None:
+            self.pending_state.remove(item.transaction["hash"])
+
+    async def fetch_stage(self):
+        while True:
+            item = await self.ingest.get()
+            try:
+                await self.fetch(item)
+            finally:
+                self.ingest.task_done()
+
+    async def fetch(self, item):
+        try:
+            item.transaction = await self.web3_wss.eth.get_transaction(item.transaction_hash)
+        except Exception:
+            item.transaction = None
+        if item.transaction is None and item.attempts < len(self.retry_delays):
+            self.schedule_retry(item)
+            return
+        if self.capture_log:
+            self.capture_log.transaction(item.transaction_hash, item.transaction)
+        if item.transaction is None:
+            self.fetch_misses += 1
+            metrics.inc("fetch_misses")
+            return
+        item.stamp("fetch")
+        await self.fetched.put(item)
+
+    def schedule_retry(self, item):
+        self.fetch_retries += 1
+        metrics.inc("fetch_retries")
+
+        def retry():
+            self.retries.discard(handle)
+            self.ingest.put_nowait(item)
+
+        handle = asyncio.get_running_loop().call_later(self.retry_delays[item.attempts], retry)
+        item.attempts += 1
+        self.retries.add(handle)
+
+    async def filter_stage(self):
+        while True:
+            item = await self.fetched.get()
+            try:
+                if is_uniswap_router_transaction(item.transaction):
+                    item.stamp("filter")
+                    if self.on_swap:
+                        self.on_swap(item.transaction)
+                    await self.filtered.put(item)
+            finally:
+                self.fetched.task_done()
+
+    async def decode_stage(self):
+        while True:
+            if self.shards is not None:
+                items = await self.filtered.get_batch(self.shard_batch)
+                try:
+                    await self.decode_sharded(items)
+                finally:
+                    for _ in items:
+                        self.filtered.task_done()
+                continue
+            item = await self.filtered.get()
+            try:
+                await self.decode(item)
+            finally:
+                self.filtered.task_done()
+
+    async def decode(self, item):
+        try:
+            call = decode_swap_calldata(item.transaction.input, item.transaction["value"])
+            if call is not None:
+                item.decoded = (call.function, call.as_params())
+            else:
+                item.decoded = await self.run_sync(
+                    self.router["contract"].decode_function_input, item.transaction.input
+                )
+        except Exception as e:
+            print("❌ Error decoding transaction input:", str(e))
+            return
+        await self.queue_decoded(item)
+
+    async def decode_sharded(self, items):
+        try:
+            results, _ = await self.shards.analyze_async([item.transaction for item in items], top=0)
+        except Exception as e:
+            print("❌ Error decoding transaction input:", str(e))
+            return
+        for item, (_, record, estimate) in zip(items, results):
+            if record is None:
+                continue
+            call = SwapCall(*record)
+            item.decoded = (call.function, call.as_params())
+            item.estimate = estimate
+            await self.queue_decoded(item)
+
+    async def queue_decoded(self, item):
+        if self.pending_state is not None:
+            self.pending_state.add_transaction(item.transaction, item.decoded[1])
+        item.stamp("decode")
+        await self.decoded.put(item)
+
+    async def simulate_stage(self):
+        while True:
+            if self.inclusion is None:
+                await self.simulate(await self.decoded.get())
+                continue
+            await self.watch_slots.acquire()
+            try:
+                item = await self.decoded.get()
+            except BaseException:
+                self.watch_slots.release()
+                raise
+            task = asyncio.create_task(self.simulate(item, self.inclusion.watch(item.transaction)))
+            self.waiting.add(task)
+            task.add_done_callback(self.watched)
+
+    def watched(self, task):
+        self.waiting.discard(task)
+        self.watch_slots.release()
+
+    async def simulate(self, item, inclusion=None):
+        try:
+            projection = None
+            if inclusion is not None:
+                projection = await self.run_sync(
+                    project_reserves, self.web3_http, item.transaction, item.decoded[1].get("path"),
+                    self.pending_state,
+                )
+                self.awaiting_inclusion += 1
+                try:
+                    inclusion = await inclusion
+                finally:
+                    self.awaiting_inclusion -= 1
+            item.result = await self.run_sync(
+                self.analyze, self.web3_http, self.router, item.transaction, item.decoded,
+                self.pending_state, inclusion, account_address=self.account_address, projection=projection,
+            )
+            if item.result is not None and "error" in item.result:
+                self.failed(item.result["error"])
+            if item.result is not None and item.estimate is not None:
+                item.result["estimate"] = dict(zip(ESTIMATE_FIELDS, item.estimate))
+            item.stamp("simulate")
+            if self.on_complete:
+                self.on_complete(item)
+        except Exception as e:
+            print("❌ Error simulating transaction:", str(e))
+            self.failed(str(e))
+        finally:
+            if self.pending_state is not None:
+                self.pending_state.remove(item.transaction["hash"])
+            self.simulated += 1
+            self.decoded.task_done()
+
+    def failed(self, error):
+        self.simulation_errors += 1
+        self.last_error = error
+        metrics.inc("simulation_errors")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters and queue depths of every stage
+        """
+        queues = (self.ingest, self.fetched, self.filtered, self.decoded)
+        return {
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "fetch_misses": self.fetch_misses,
+            "fetch_retries": self.fetch_retries,
+            "awaiting_retry": len(self.retries),
+            "simulated": self.simulated,
+            "simulation_errors": self.simulation_errors,
+            "dropped": {queue.name: queue.dropped for queue in queues},
+            "evicted": {"mined": self.decoded.mined, "expired": self.decoded.expired},
+            "awaiting_inclusion": self.awaiting_inclusion,
+            "queued": {queue.name: queue.qsize() for queue in queues},
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+
+from config import PIPELINE_DEADLINE_BLOCKS, PIPELINE_QUEUE_SIZE
+from core.instrumentation import metrics
+
+
+def effective_priority_fee(transaction, base_fee):
+    """
+    The tip per gas a transaction pays to the block builder at the given base fee.
+    Negative when it cannot be included until the base fee drops.
+
+    Args:
+        transaction (dict): The pending transaction
+        base_fee (int | None): Base fee of the block being built; None ranks by gas price.
+
+    Returns:
+        int: Effective priority fee in wei
+    """
+    base_fee = base_fee or 0
+    max_fee = transaction.get("maxFeePerGas")
+    if max_fee is None:
+        return transaction["gasPrice"] - base_fee
+    return min(transaction["maxPriorityFeePerGas"], max_fee - base_fee)
+
+
+class PriorityScheduler:
+    """
+    Drop-in replacement for a StageQueue that hands out the transactions most likely
+    to land in the next block first.
+
+    Items are ranked by effective priority fee against the projected next base fee
+    of `base_fee` (a BaseFeeTracker) and re-ranked on every new head. Each item gets
+    a deadline `deadline_blocks` blocks after the head it was queued at; on_head()
+    evicts items past their deadline that still cannot pay the base fee, and those
+    whose sender nonce was already used in the new block (mined or replaced). When
+    full, the lowest-ranked item is evicted instead of making producers wait.
+    Evicted items are passed to `on_evict`. Items paying the same priority fee, such
+    as the many wallets sending a round default tip, are ordered by `tiebreak`.
+
+    Args:
+        name (str): Stage name used in stats and metrics
+        maxsize (int, optional): Capacity. Defaults to PIPELINE_QUEUE_SIZE.
+        base_fee (BaseFeeTracker, optional): Source of the base fee and block number.
+            Without it items are ranked by gas price and never expire.
+        deadline_blocks (int, optional): Blocks an item may wait. Defaults to
+            PIPELINE_DEADLINE_BLOCKS.
+        on_evict (callable, optional): Called with every evicted item.
+        tiebreak (callable, optional): Score of an item; higher goes first among items
+            with the same priority fee. Defaults to arrival order.
+    """
+
+    def __init__(self, name, maxsize=PIPELINE_QUEUE_SIZE, base_fee=None,
+                 deadline_blocks=PIPELINE_DEADLINE_BLOCKS, on_evict=None, tiebreak=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.base_fee = base_fee
+        self.deadline_blocks = deadline_blocks
+        self.on_evict = on_evict
+        self.tiebreak = tiebreak
+        self.heap = []
+        self.counter = itertools.count()
+        self.not_empty = asyncio.Event()
+        self.unfinished = 0
+        self.finished = asyncio.Event()
+        self.finished.set()
+        self.dropped = 0
+        self.expired = 0
+        self.mined = 0
+
+    def next_base_fee(self):
+        return self.base_fee.next_base_fee if self.base_fee else None
+
+    def entry(self, item, deadline):
+        priority = effective_priority_fee(item.transaction, self.next_base_fee())
+        score = self.tiebreak(item) if self.tiebreak else 0
+        return (-priority, -score, next(self.counter), item, deadline)
+
+    def evict(self, item, counter):
+        setattr(self, counter, getattr(self, counter) + 1)
+        metrics.inc(f"{counter}_{self.name}")
+        if self.on_evict:
+            self.on_evict(item)
+
+    def put_nowait(self, item):
+        """
+        Queues an item, evicting the lowest-ranked one when full.
+
+        Returns:
+            bool: True if the item was queued
+        """
+        block_number = self.base_fee.block_number if self.base_fee else None
+        deadline = None if block_number is None else block_number + self.deadline_blocks
+        entry = self.entry(item, deadline)
+        if len(self.heap) >= self.maxsize:
+            lowest = max(self.heap)
+            if entry > lowest:
+                self.evict(item, "dropped")
+                return False
+            self.heap.remove(lowest)
+            heapq.heapify(self.heap)
+            self.evict(lowest[3], "dropped")
+            self.unfinished -= 1
+        heapq.heappush(self.heap, entry)
+        self.unfinished += 1
+        self.finished.clear()
+        self.not_empty.set()
+        return True
+
+    async def put(self, item):
+        return self.put_nowait(item)
+
+    async def get(self):
+        while not self.heap:
+            self.not_empty.clear()
+            await self.not_empty.wait()
+        return heapq.heappop(self.heap)[3]
+
+    def task_done(self):
+        self.unfinished -= 1
+        if self.unfinished <= 0:
+            self.finished.set()
+
+    async def join(self):
+        await self.finished.wait()
+
+    def qsize(self):
+        return len(self.heap)
+
+    def on_head(self, block_number, included_nonces):
+        """
+        Re-ranks the queue for the next block and evicts mined, replaced and expired items.
+
+        Args:
+            block_number (int): Number of the new head
+            included_nonces (dict): Highest nonce included in the head per sender
+        """
+        kept = []
+        for _, _, _, item, deadline in self.heap:
+            sender = item.transaction["from"]
+            if item.transaction["nonce"] <= included_nonces.get(sender, -1):
+                self.evict(item, "mined")
+                self.unfinished -= 1
+                continue
+            entry = self.entry(item, deadline)
+            if deadline is not None and block_number > deadline and entry[0] > 0:
+                self.evict(item, "expired")
+                self.unfinished -= 1
+            else:
+                kept.append(entry)
+        heapq.heapify(kept)
+        self.heap = kept
+        if self.unfinished <= 0:
+            self.finished.set()
@@ -0,0 +1,153 @@
+"""
+Replays a mempool capture through the real analysis pipeline against a local stand-in node.
+
+    python -m core.replay output/capture.jsonl.gz --speed 10
+    python -m core.replay output/capture.jsonl.gz --from-swaps output/swaps-20260101-000000-0000.jsonl --speed max
+"""
+import argparse
+import asyncio
+import sys
+import time
+from functools import partial
+
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, Web3
+
+from core.instrumentation import metrics
+from core.pending_state import PendingState
+from core.pipeline import MempoolPipeline
+from core.sharded_analysis import ShardedAnalyzer
+from core.slippage import slippage_trigger
+from config import USDC_TOKEN, USDC_WETH_POOL, WETH_TOKEN
+from services import initialize_uniswap_router, pair_registry
+from services.capture_log import capture_log_from_swaps_dump, read_capture_log
+from services.price_feed import PriceOracle
+from services.replay_provider import AsyncReplayProvider, ReplayProvider, ReplayState, serve_price_stub
+
+STAGES = ("fetch", "filter", "decode", "simulate")
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def replay_capture(log_path, speed=1.0, reserves=None, latency=0.0, price_usd=1.0, processes=0):
+    """
+    Feeds the pending hashes of a capture log through a MempoolPipeline.
+
+    Args:
+        log_path (str): Capture log written by CaptureLogWriter
+        speed (float, optional): Replay speed multiplier; 0 replays as fast as possible.
+        reserves (tuple, optional): (reserve0, reserve1) for getReserves calls missing from the log.
+        latency (float, optional): Simulated node round trip per RPC, in seconds.
+        price_usd (float, optional): USD price served by the local GeckoTerminal stand-in.
+        processes (int, optional): Decode and estimate on a ShardedAnalyzer with this many
+            worker processes; 0 keeps everything in process.
+
+    Returns:
+        dict: Throughput, drop counters and per-stage latency percentiles in milliseconds
+
+    Raises:
+        RuntimeError: Every replayed simulation failed, so the report would be empty
+    """
+    events = list(read_capture_log(log_path))
+    state = ReplayState(events, reserves)
+    web3_http = Web3(ReplayProvider(state, latency))
+    web3_wss = AsyncWeb3(AsyncReplayProvider(state, latency))
+    router = initialize_uniswap_router(web3_http)
+    price_server, price_url = serve_price_stub(price_usd)
+    oracle = PriceOracle(api=price_url)
+
+    latencies = {stage: [] for stage in STAGES + ("total",)}
+
+    def on_complete(item):
+        previous = item.received_at
+        for stage in STAGES:
+            latencies[stage].append(item.stamps[stage] - previous)
+            previous = item.stamps[stage]
+        latencies["total"].append(previous - item.received_at)
+
+    pending_state = PendingState()
+    pending_state.watch(USDC_WETH_POOL, USDC_TOKEN, WETH_TOKEN)
+    pair_registry.register(USDC_TOKEN, WETH_TOKEN, USDC_WETH_POOL)
+    pair_registry.warm(web3_http, USDC_TOKEN, WETH_TOKEN)
+    shards = None
+    if processes:
+        shards = ShardedAnalyzer(router["abi"], processes)
+        shards.start()
+        if reserves:
+            shards.publish(USDC_WETH_POOL, *reserves)
+    pipeline = MempoolPipeline(
+        web3_wss, web3_http, router, on_complete=on_complete, pending_state=pending_state, shards=shards,
+        analyze=partial(slippage_trigger, oracle=oracle),
+    )
+    pipeline.start()
+    pending = [event for event in events if event["k"] == "pending"]
+    start = time.perf_counter()
+    for event in pending:
+        delay = event["t"] / speed - (time.perf_counter() - start) if speed else 0
+        await asyncio.sleep(max(delay, 0))
+        pipeline.submit(HexBytes(event["h"]))
+    await pipeline.drain()
+    elapsed = time.perf_counter() - start
+    await pipeline.stop()
+    if shards:
+        shards.stop()
+    price_server.shutdown()
+
+    report = pipeline.stats()
+    if report["simulated"] and report["simulation_errors"] == report["simulated"]:
+        raise RuntimeError(
+            f"All {report['simulated']} replayed simulations failed, last error: {pipeline.last_error}"
+        )
+    report["elapsed_s"] = elapsed
+    report["txs_per_s"] = len(pending) / elapsed if elapsed else 0.0
+    report["latency_ms"] = {
+        stage: {
+            "mean": sum(values) / len(values) * 1e3,
+            "p50": percentile(values, 0.5) * 1e3,
+            "p99": percentile(values, 0.99) * 1e3,
+        }
+        for stage, values in latencies.items()
+        if values
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="Capture log (.jsonl.gz)")
+    parser.add_argument("--from-swaps", help="Build the capture log from a swaps JSONL output file first")
+    parser.add_argument("--speed", default="1", help="Replay speed multiplier, or 'max'")
+    parser.add_argument("--reserves", nargs=2, type=int, default=(10 ** 24, 5 * 10 ** 20),
+                        metavar=("RESERVE0", "RESERVE1"), help="Reserves for unrecorded getReserves calls")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated RPC round trip in seconds")
+    parser.add_argument("--processes", type=int, default=0, help="Worker processes for decoding and estimates")
+    parser.add_argument("--metrics", action="store_true", help="Also print the instrumentation summary")
+    args = parser.parse_args()
+    metrics.enabled = metrics.enabled or args.metrics
+
+    if args.from_swaps:
+        count = capture_log_from_swaps_dump(args.from_swaps, args.log)
+        print(f"📼 Converted {count} swaps from {args.from_swaps}")
+    speed = 0 if args.speed == "max" else float(args.speed)
+    try:
+        report = asyncio.run(replay_capture(
+            args.log, speed, tuple(args.reserves), args.latency, processes=args.processes
+        ))
+    except RuntimeError as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"\n📊 Replayed {report['received']} txs in {report['elapsed_s']:.3f}s "
+          f"→ {report['txs_per_s']:.1f} txs/s (dropped {report['dropped']}, misses {report['fetch_misses']}, "
+          f"simulation errors {report['simulation_errors']})")
+    for stage, latency in report["latency_ms"].items():
+        print(f"   • {stage:<9} mean {latency['mean']:9.3f} ms   p50 {latency['p50']:9.3f} ms   "
+              f"p99 {latency['p99']:9.3f} ms")
+    if metrics.enabled:
+        print("\n📈 Latency summary\n" + metrics.summary())
+
+
+if __name__ == "__main__":
+    main()
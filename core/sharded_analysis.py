@@ -0,0 +1,360 @@
+import asyncio
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from web3 import Web3
+
+from config import PIPELINE_PROCESSES
+from services.pair_index import PairRegistry, pair_registry
+from services.pair_reserve_cache import reserve_cache
+from core.batch_slippage import rank_sandwiches, simulate_sandwiches
+from core.swap_decoder import SwapCall, decode_swap_calldata
+from core.uniswap_v2_library import get_amount_in
+
+RESERVE_SLOT_DTYPE = np.dtype([
+    ("pair", "V20"),
+    ("version", "<u8"),
+    ("reserve0", "<u8", (2,)),
+    ("reserve1", "<u8", (2,)),
+])
+ESTIMATE_FIELDS = ("pair", "attacker_input", "profit", "price_impact")
+HEADER_BYTES = 8
+WORD = (1 << 64) - 1
+
+
+class SharedReserves:
+    """
+    Pair reserves in shared memory, written by the main process and read by workers.
+
+    A fixed table of slots (pair address, version, reserve0, reserve1) follows an
+    8-byte slot count. Reserves are exact uint128 values stored as two 64-bit
+    words. Each slot is a seqlock: the writer makes the version odd while it
+    updates the slot, and readers retry until they see the same even version
+    before and after reading, so a worker never sees half of an update.
+
+    Args:
+        capacity (int): Number of pair slots
+        name (str, optional): Attach to an existing block instead of creating one.
+    """
+
+    def __init__(self, capacity, name=None):
+        size = HEADER_BYTES + capacity * RESERVE_SLOT_DTYPE.itemsize
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.owner = name is None
+        self.capacity = capacity
+        self.count = np.ndarray((1,), dtype="<u8", buffer=self.memory.buf)
+        self.slots = np.ndarray((capacity,), dtype=RESERVE_SLOT_DTYPE, buffer=self.memory.buf, offset=HEADER_BYTES)
+        self.index = {}
+        self.published = {}
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def refresh_index(self):
+        for slot in range(len(self.index), int(self.count[0])):
+            self.index[bytes(self.slots["pair"][slot])] = slot
+
+    def set(self, pair_address, reserve0, reserve1):
+        """
+        Publishes the reserves of a pair, claiming a new slot the first time.
+        """
+        pair = bytes.fromhex(pair_address[2:].lower())
+        slot = self.index.get(pair)
+        if slot is None:
+            slot = int(self.count[0])
+            if slot >= self.capacity:
+                raise LookupError(f"No free reserve slot for {pair_address}")
+            self.slots["pair"][slot] = np.void(pair)
+            self.index[pair] = slot
+        row = self.slots[slot:slot + 1]
+        row["version"] += 1
+        row["reserve0"] = (reserve0 & WORD, reserve0 >> 64)
+        row["reserve1"] = (reserve1 & WORD, reserve1 >> 64)
+        row["version"] += 1
+        if slot == self.count[0]:
+            self.count[0] = slot + 1
+
+    def get(self, pair_address):
+        """
+        Returns:
+            tuple | None: (reserve0, reserve1) of the pair, or None if it was never published
+        """
+        pair = bytes.fromhex(pair_address[2:].lower())
+        slot = self.index.get(pair)
+        if slot is None:
+            self.refresh_index()
+            slot = self.index.get(pair)
+            if slot is None:
+                return None
+        row = self.slots[slot:slot + 1]
+        while True:
+            version = int(row["version"][0])
+            if version & 1:
+                continue
+            low0, high0 = row["reserve0"][0].tolist()
+            low1, high1 = row["reserve1"][0].tolist()
+            if int(row["version"][0]) == version:
+                return low0 | high0 << 64, low1 | high1 << 64
+
+    def publish_cache(self, cache=reserve_cache):
+        """
+        Copies every pair state of a ReserveCache that changed since the last call.
+        """
+        for pair_address, state in list(cache.states.items()):
+            if self.published.get(pair_address) is not state:
+                self.set(pair_address, state[0], state[1])
+                self.published[pair_address] = state
+
+    def close(self):
+        del self.count, self.slots
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def transaction_record(transaction):
+    """
+    Returns:
+        tuple: (hash, input, value), all a worker needs to analyze a transaction
+    """
+    return bytes(transaction["hash"]), bytes(transaction["input"]), transaction["value"]
+
+
+def call_record(call):
+    """
+    Returns:
+        tuple: The SwapCall fields in __slots__ order; SwapCall(*record) rebuilds it
+    """
+    return tuple(getattr(call, name) for name in SwapCall.__slots__)
+
+
+_worker = None
+
+
+def init_worker(reserves_name, capacity, router_abi, factory, init_code_hash, pinned_pairs):
+    """
+    Process pool initializer: attaches the shared reserves and builds the router
+    contract and pair registry once, so every batch starts on warm state.
+    """
+    global _worker
+    registry = PairRegistry(factory, init_code_hash, cache=None)
+    registry.pairs.update(pinned_pairs)
+    _worker = {
+        "reserves": SharedReserves(capacity, reserves_name),
+        "router": Web3().eth.contract(abi=router_abi),
+        "registry": registry,
+    }
+
+
+def decode_record(router, calldata, value):
+    call = decode_swap_calldata(calldata, value)
+    if call is not None:
+        return call
+    function, params = router.decode_function_input(calldata)
+    return SwapCall(
+        bytes(calldata[:4]), function.fn_name, params.get("amountIn"), params.get("amountOutMin"),
+        params.get("amountOut"), params.get("amountInMax"), tuple(params.get("path") or ()),
+        params.get("to"), params.get("deadline"),
+    )
+
+
+def victim_amounts(call, reserve_in, reserve_out):
+    """
+    The first-hop (amount in, minimum amount out) a sandwich is sized against.
+
+    An exact-output swap pays get_amount_in(amountOut) rather than amountInMax; its
+    minimum out is the amount it would get at the worst price it accepts,
+    amountOut / amountInMax. Its first hop is only known on a single-hop path.
+
+    Returns:
+        tuple | None: (amount_in, min_out), or None if the swap cannot be estimated
+    """
+    if call.amount_out is None:
+        if not call.amount_in:
+            return None
+        return call.amount_in, call.amount_out_min or 0
+    if len(call.path) != 2 or not call.amount_in_max:
+        return None
+    try:
+        amount_in = get_amount_in(call.amount_out, reserve_in, reserve_out)
+    except ValueError:
+        return None
+    if amount_in > call.amount_in_max:
+        return None
+    return amount_in, call.amount_out * amount_in // call.amount_in_max
+
+
+def analyze_shard(records, top=None):
+    """
+    Decodes a shard of transactions and values a sandwich on the first hop of each
+    swap whose pair reserves were published, all candidates at once.
+
+    Args:
+        records (list): transaction_record tuples
+        top (int, optional): Only rank the `top` most profitable candidates; 0 skips
+            the ranking.
+
+    Returns:
+        tuple: (results, ranked) — one (hash, call_record | None, estimate | None)
+        per record, with estimate = (pair, attacker_input, profit, price_impact), and
+        the indices of the estimated results by descending profit
+    """
+    reserves, router, registry = _worker["reserves"], _worker["router"], _worker["registry"]
+    results, candidates, columns = [], [], ([], [], [], [])
+    for transaction_hash, calldata, value in records:
+        try:
+            call = decode_record(router, calldata, value)
+        except Exception:
+            results.append((transaction_hash, None, None))
+            continue
+        results.append((transaction_hash, call_record(call), None))
+        if len(call.path) < 2:
+            continue
+        pair_address = registry.pair_address(call.path[0], call.path[1])
+        pair_reserves = reserves.get(pair_address)
+        if pair_reserves is None or not all(pair_reserves):
+            continue
+        reserve0, reserve1 = pair_reserves
+        if call.path[0].lower() > call.path[1].lower():
+            reserve0, reserve1 = reserve1, reserve0
+        amounts = victim_amounts(call, reserve0, reserve1)
+        if amounts is None:
+            continue
+        candidates.append((len(results) - 1, pair_address))
+        for column, number in zip(columns, (reserve0, reserve1, *amounts)):
+            column.append(number)
+    if not candidates:
+        return results, []
+    sandwiches = simulate_sandwiches(*columns)
+    for position, (index, pair_address) in enumerate(candidates):
+        transaction_hash, record, _ = results[index]
+        estimate = (
+            pair_address,
+            float(sandwiches["attacker_input"][position]),
+            float(sandwiches["profit"][position]),
+            float(sandwiches["price_impact"][position]),
+        )
+        results[index] = (transaction_hash, record, estimate)
+    if top == 0:
+        return results, []
+    ranked = [candidates[position][0] for position in rank_sandwiches(sandwiches["profit"], top)]
+    return results, ranked
+
+
+class ShardedAnalyzer:
+    """
+    Spreads calldata decoding, batch sandwich simulation and profit ranking over a
+    pool of worker processes, so analysis is not capped by one core.
+
+    Workers are started once and keep their warm state: the router ABI decoder, the
+    precompiled selector decoders, a pair registry and a view of the reserves the
+    main process publishes to shared memory. They are started by a forkserver and
+    rebuild that state from the initializer arguments, so they never inherit a lock
+    held by one of this process's threads. A batch is split into one contiguous
+    shard per process; transactions travel as (hash, input, value) tuples and
+    results come back as plain tuples, never as pickled AttributeDicts. Each shard
+    is ranked in its worker and the rankings are merged here.
+
+    Args:
+        router_abi (list): Router ABI used to decode calls without a precompiled decoder
+        processes (int, optional): Worker processes. Defaults to PIPELINE_PROCESSES.
+        registry (PairRegistry, optional): Factory, init code hash and pinned pairs
+            handed to the workers. Defaults to pair_registry.
+        cache (ReserveCache, optional): Reserve mirror published before every batch.
+        capacity (int, optional): Pair slots in shared memory.
+    """
+
+    def __init__(self, router_abi, processes=PIPELINE_PROCESSES, registry=pair_registry,
+                 cache=reserve_cache, capacity=4096):
+        self.router_abi = router_abi
+        self.processes = max(processes, 1)
+        self.registry = registry
+        self.cache = cache
+        self.capacity = capacity
+        self.reserves = None
+        self.executor = None
+        self.batches = 0
+        self.analyzed = 0
+
+    def start(self):
+        self.reserves = SharedReserves(self.capacity)
+        if self.cache is not None:
+            self.reserves.publish_cache(self.cache)
+        initargs = (
+            self.reserves.name, self.capacity, self.router_abi, self.registry.factory,
+            self.registry.init_code_hash, dict(self.registry.pairs),
+        )
+        self.executor = ProcessPoolExecutor(
+            self.processes, mp_context=multiprocessing.get_context("forkserver"), initializer=init_worker,
+            initargs=initargs,
+        )
+        list(self.executor.map(warm_up, range(self.processes)))
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        if self.reserves:
+            self.reserves.close()
+            self.reserves = None
+
+    def publish(self, pair_address, reserve0, reserve1):
+        self.reserves.set(pair_address, reserve0, reserve1)
+
+    def shards(self, transactions):
+        records = [transaction_record(transaction) for transaction in transactions]
+        size = -(-len(records) // self.processes)
+        return [records[i:i + size] for i in range(0, len(records), size)]
+
+    def submit(self, transactions, top=None):
+        if self.cache is not None:
+            self.reserves.publish_cache(self.cache)
+        self.batches += 1
+        self.analyzed += len(transactions)
+        return [self.executor.submit(analyze_shard, shard, top) for shard in self.shards(transactions)]
+
+    def merge(self, shard_results, top=None):
+        results = []
+        rankings = []
+        for shard, ranked in shard_results:
+            offset = len(results)
+            results.extend(shard)
+            rankings.append([offset + index for index in ranked])
+        merged = heapq.merge(*rankings, key=lambda index: -results[index][2][2])
+        ranked = [results[index] for index in merged]
+        return results, ranked[:top] if top is not None else ranked
+
+    def analyze(self, transactions, top=None):
+        """
+        Analyzes a batch across the worker processes.
+
+        Returns:
+            tuple: (results, ranked) — one (hash, call_record | None, estimate | None) per
+            transaction in input order, and the estimated results by descending profit
+        """
+        if not transactions:
+            return [], []
+        return self.merge([future.result() for future in self.submit(transactions, top)], top)
+
+    async def analyze_async(self, transactions, top=None):
+        """
+        analyze() for the event loop: waits on the workers without blocking it.
+        """
+        if not transactions:
+            return [], []
+        futures = [asyncio.wrap_future(future) for future in self.submit(transactions, top)]
+        return self.merge(await asyncio.gather(*futures), top)
+
+    def stats(self):
+        return {"processes": self.processes, "batches": self.batches, "analyzed": self.analyzed}
+
+
+def warm_up(_):
+    """
+    Runs one decode in a worker so its first real batch does not pay for lazy imports.
+    """
+    return decode_swap_calldata(b"") is None
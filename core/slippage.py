@@ -1,11 +1,15 @@
-import os
 import time
-import json
-from config import ACCOUNT
+from eth_utils import to_hex
+from config import USDC_TOKEN, WETH_TOKEN
 from services.get_liquidity_weth_usdc import get_liquidity_and_price
+from services.pair_index import pair_registry
+from services.price_feed import price_oracle
+from core.batch_slippage import max_inputs_for_slippage
+from core.instrumentation import metrics
+from core.swap_decoder import decode_swap_calldata
+from core.uniswap_v2_library import get_amounts_in, get_amounts_out
 
 SLIPPAGE_TOLERANCE = 0.005
-weth_decimals = 18
 
 
 def simulate_front_run_profit(reserve_usdc: float,
@@ -69,17 +73,96 @@ def max_input_for_slippage(reserve_in: float,
             hi = mid
     return lo
 
-def slippage_trigger(web3_http, router, transaction):
-    fn_obj, params = router["contract"].decode_function_input(transaction.input)
+def project_reserves(web3_http, transaction, path, pending, registry=pair_registry):
+    """
+    Projects the first-hop reserves a pending swap will meet, after the pending swaps
+    ordered before it. Call it while the swap is still pending: once it is mined the
+    on-chain reserves already include the swaps ahead of it, and the swap itself.
+
+    Args:
+        web3_http: Web3 HTTP instance
+        transaction (dict): The pending swap transaction
+        path (list): Decoded swap path
+        pending (PendingState): Pending swaps of the watched pairs
+        registry (PairRegistry, optional): Defaults to pair_registry.
+
+    Returns:
+        tuple | None: (pair address, (reserve0, reserve1), ahead), or None if the swap
+        is not tracked in `pending`
+    """
+    if pending is None or transaction["hash"] not in pending:
+        return None
+    pair_address = registry.pair_address(path[0], path[1])
+    projection = pending.reserves_before(transaction["hash"], *registry.raw_reserves(web3_http, pair_address))
+    if projection is None:
+        return None
+    reserves, ahead = projection
+    return pair_address, reserves, ahead
+
+def slippage_trigger(web3_http, router, transaction, decoded=None, pending=None, inclusion=None,
+                     registry=pair_registry, account_address=None, projection=None, oracle=price_oracle):
+    """
+    Prints the details of a pending router swap and simulates its slippage and MEV profit.
+
+    Every hop of the decoded path is quoted on the pair the registry derives for it,
+    with exact UniswapV2Library amounts, and the front-run is sized on the first hop.
+
+    Args:
+        web3_http: Web3 HTTP instance
+        router (dict): Router configuration returned by initialize_uniswap_router
+        transaction (dict): The pending swap transaction
+        decoded (tuple, optional): Already decoded (function, params) of the transaction input.
+            Decoded here when not provided. Defaults to None.
+        pending (PendingState, optional): When the swap is tracked there, it is simulated
+            against the reserves projected after the pending swaps ordered before it,
+            read before waiting for its receipt. Defaults to None.
+        inclusion (Inclusion, optional): Outcome already resolved by an InclusionTracker.
+            Without it the receipt is polled with wait_for_transaction_receipt. A replaced
+            or dropped swap is not simulated. Defaults to None.
+        registry (PairRegistry, optional): Pair addresses, reserves and token decimals.
+            Defaults to pair_registry.
+        account_address (str, optional): Account whose balance is listed with the swap
+            details. Not read when None, e.g. in an offline replay. Defaults to None.
+        projection (tuple, optional): project_reserves() result taken while the swap was
+            still pending; replaces `pending`. Defaults to None.
+        oracle (PriceOracle, optional): USD price source of the USDC/WETH pool.
+            Defaults to price_oracle.
+
+    Returns:
+        dict | None: The swap details and simulation result, or None if the swap has no
+        usable path. Holds an "error" entry when the simulation failed.
+    """
+    if decoded is None:
+        call = decode_swap_calldata(transaction.input, transaction["value"])
+        decoded = (call.function, call.as_params()) if call else router["contract"].decode_function_input(transaction.input)
+    fn_obj, params = decoded
     min_amount_out = params.get("amountOutMin", "Not specified")
     path = params.get("path", [])
     recipient = params.get("to", "Not specified")
     deadline = params.get("deadline", "Not specified")
     if not isinstance(transaction["value"], int) or not isinstance(path, list) or len(path) < 2:
         return
-    balance = web3_http.eth.get_balance(ACCOUNT.address)
+    result = {
+        "function": fn_obj if isinstance(fn_obj, str) else fn_obj.fn_name,
+        "amount_in": transaction["value"],
+        "min_amount_out": params.get("amountOutMin"),
+        "path": list(path),
+        "recipient": params.get("to"),
+        "deadline": params.get("deadline"),
+        "inclusion": inclusion.status if inclusion else "mined",
+    }
+    if projection is None and inclusion is None:
+        projection = project_reserves(web3_http, transaction, path, pending, registry)
+    if inclusion is None:
+        with metrics.timer("receipt_wait"):
+            receipt = web3_http.eth.wait_for_transaction_receipt(transaction["hash"])
+    elif inclusion.receipt is None:
+        replaced = f" by {to_hex(inclusion.replaced_by)}" if inclusion.replaced_by else ""
+        print(f"🫥 Swap {to_hex(transaction['hash'])} {inclusion.status}{replaced} in block {inclusion.block_number}")
+        return result
+    else:
+        receipt = inclusion.receipt
     value_eth = web3_http.from_wei(transaction["value"], "ether")
-    receipt = web3_http.eth.wait_for_transaction_receipt(transaction["hash"])
     gas_used = receipt["gasUsed"]
     eff_price_wei = receipt["effectiveGasPrice"]
     fee_eth = web3_http.from_wei(gas_used * eff_price_wei, "ether")
@@ -93,48 +176,96 @@ def slippage_trigger(web3_http, router, transaction):
         ("Path", [addr for addr in path]),
         ("Recipient", recipient),
         ("Deadline", deadline),
-        ("Account Balance", balance),
         ("Value", f"{value_eth} ETH {status_label}"),
         ("Transaction Fee", f"{fee_eth} ETH"),
         ("Gas Price", f"{gas_price_gwei} Gwei ({gas_price_eth} ETH)"),
         ("Fee % of value", f"{fee_pct_value:.4f}%"),
     ]
+    if account_address is not None:
+        details.insert(5, ("Account Balance", web3_http.eth.get_balance(account_address)))
     print("🔄 Swap Details")
     for i, (label, val) in enumerate(details):
         end = "└─" if i == len(details) - 1 else "├─"
         print(f"{end} {label}: {val}")
+    result.update(status=receipt["status"], gas_used=gas_used, effective_gas_price=eff_price_wei)
 
     try:
-        pair_token = web3_http.to_checksum_address(os.getenv("USDC_WETH_POOL"))
-        reserve_usdc, reserve_weth, usdc_decimals, reserve_weth, price_weth_in_usdc, price_usdc_in_weth, market_price, mainnet_price_usdc = get_liquidity_and_price(web3_http, pair_token)
-        amount_in_victim = transaction["value"]
-        out_weth, price_before, price_after, impact = simulate_swap(
-            reserve_usdc, reserve_weth, amount_in_victim
-        )
-        print(f"\n🔄  Simulating swap of {amount_in_victim / 10 ** usdc_decimals:.5f} USDC →")
-        print(f"   • You get      ≃ {out_weth / 10 ** weth_decimals:.5f} WETH")
-        print(f"   • New price    ≃ {price_after:.5f} WETH/USDC")
+        with metrics.timer("reserve_read"):
+            hops = registry.hops(path)
+            first_pair = hops[0][0]
+            if projection is not None and projection[0] == first_pair:
+                _, reserves, ahead = projection
+                overrides = {first_pair: reserves}
+                result["pending_ahead"] = ahead
+                print(f"⏳ {ahead} pending {'swap' if ahead == 1 else 'swaps'} ahead on the pool")
+            else:
+                overrides = {first_pair: registry.raw_reserves(web3_http, first_pair)}
+            get_reserves = registry.reserves_lookup(web3_http, overrides)
+            hop_reserves = {(token_in, token_out): get_reserves(token_in, token_out) for _, token_in, token_out in hops}
+            decimals = [registry.decimals(web3_http, token) for token in path]
+            mainnet_price_usdc = None
+            if first_pair == registry.pair_address(USDC_TOKEN, WETH_TOKEN):
+                mainnet_price_usdc = get_liquidity_and_price(web3_http, first_pair, oracle=oracle)[-1]
+        simulation_start = time.perf_counter()
+
+        def lookup(token_a, token_b):
+            return hop_reserves[(token_a, token_b)]
+
+        if params.get("amountOut"):
+            amounts = get_amounts_in(params["amountOut"], path, lookup)
+        else:
+            amounts = get_amounts_out(params.get("amountIn") or transaction["value"], path, lookup)
+        print(f"\n🔄  Simulating {len(hops)}-hop swap of {amounts[0] / 10 ** decimals[0]:.5f} →")
+        hop_results = []
+        remaining = 1.0
+        for i, (pair_address, token_in, token_out) in enumerate(hops):
+            reserve_in, reserve_out = hop_reserves[(token_in, token_out)]
+            _, _, hop_price_after, hop_impact = simulate_swap(reserve_in, reserve_out, amounts[i])
+            remaining *= 1 - hop_impact
+            print(f"   • Hop {i + 1} via {pair_address}: {amounts[i] / 10 ** decimals[i]:.5f} → "
+                  f"{amounts[i + 1] / 10 ** decimals[i + 1]:.5f}, price impact ≃ {hop_impact * 100:.5f}%")
+            hop_results.append({
+                "pair": pair_address, "reserve_in": reserve_in, "reserve_out": reserve_out,
+                "amount_in": amounts[i], "amount_out": amounts[i + 1], "price_impact": hop_impact,
+            })
+        impact = 1 - remaining
+        print(f"   • You get      ≃ {amounts[-1] / 10 ** decimals[-1]:.5f}")
         print(f"   • Price impact ≃ {impact * 100:.5f}%")
-        print(f"   • Equivalent Market   ≃ ${((1 / price_after) * mainnet_price_usdc):.5f} USD")
+        reserve_in, reserve_out = hop_reserves[(path[0], path[1])]
+        amount_in_victim = amounts[0]
+        _, price_before, price_after, _ = simulate_swap(reserve_in, reserve_out, amount_in_victim)
+        if mainnet_price_usdc is not None:
+            print(f"   • Equivalent Market   ≃ ${((1 / price_after) * mainnet_price_usdc):.5f} USD")
         slippage_tol: float = 0.015
-        max_usdc_mev = max_input_for_slippage(
-            reserve_weth, reserve_usdc, tol=slippage_tol
-        )
-        max_weth = simulate_swap(reserve_usdc, reserve_weth, max_usdc_mev)[0]
-        print(f"\n🔒  To keep slippage ≤ {slippage_tol * 100:.5f}%:")
-        print(f"   • Max input    ≃ {max_usdc_mev / 10 ** usdc_decimals:.5f} USDC")
-        print(f"   • You’d get    ≃ {max_weth / 10 ** weth_decimals:.5f} WETH")
+        max_mev_input = float(max_inputs_for_slippage(reserve_in, reserve_out, tol=slippage_tol))
+        max_out, _, max_price_after, _ = simulate_swap(reserve_in, reserve_out, max_mev_input)
+        print(f"\n🔒  To keep slippage ≤ {slippage_tol * 100:.5f}% on the first hop:")
+        print(f"   • Max input    ≃ {max_mev_input / 10 ** decimals[0]:.5f}")
+        print(f"   • You’d get    ≃ {max_out / 10 ** decimals[1]:.5f}")
         print(f"   • Price moves  ≃ {price_before:.15f} → "
-              f"{simulate_swap(reserve_usdc, reserve_weth, max_usdc_mev)[2]:.15f} WETH/USDC")
+              f"{max_price_after:.15f}")
         profit = simulate_front_run_profit(
-            reserve_usdc,
-            reserve_weth,
+            reserve_in,
+            reserve_out,
             amount_in_victim,
-            max_usdc_mev,
+            max_mev_input,
             fee_percentage=fee_pct_value
         )
-        print(f"💰 Estimated MEV profit: {profit:.10f} USDC")
+        metrics.observe("simulation", time.perf_counter() - simulation_start)
+        print(f"💰 Estimated MEV profit: {profit:.10f}")
         #print("🚀 Front-run sent:", sent.hex())
+        result.update(
+            reserve_in=reserve_in,
+            reserve_out=reserve_out,
+            amounts=amounts,
+            hops=hop_results,
+            amount_out=amounts[-1],
+            price_impact=impact,
+            max_mev_input=max_mev_input,
+            profit=profit,
+        )
     except Exception as e:
         print("❌ Error executing transaction:", str(e))
+        result["error"] = str(e)
+    return result
 
@@ -0,0 +1,150 @@
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry
+
+V2_EXACT_ETH_IN = ("uint256", "address[]", "address", "uint256")
+V2_EXACT_TOKENS = ("uint256", "uint256", "address[]", "address", "uint256")
+
+
+class SwapCall:
+    """
+    Compact typed record of a decoded router swap call.
+
+    Amounts that the call does not fix are None: exact-input swaps have no amount_out,
+    exact-output swaps have no amount_out_min. For payable functions the ETH value of
+    the transaction is the amount_in (exact input) or amount_in_max (exact output).
+    Addresses are lowercase hex strings.
+    """
+
+    __slots__ = (
+        "selector", "function", "amount_in", "amount_out_min", "amount_out",
+        "amount_in_max", "path", "to", "deadline",
+    )
+
+    def __init__(self, selector, function, amount_in=None, amount_out_min=None, amount_out=None,
+                 amount_in_max=None, path=(), to=None, deadline=None):
+        self.selector = selector
+        self.function = function
+        self.amount_in = amount_in
+        self.amount_out_min = amount_out_min
+        self.amount_out = amount_out
+        self.amount_in_max = amount_in_max
+        self.path = path
+        self.to = to
+        self.deadline = deadline
+
+    def as_params(self):
+        """
+        Returns:
+            dict: The call arguments under the router ABI names used by decode_function_input
+        """
+        names = (
+            ("amountIn", self.amount_in), ("amountOutMin", self.amount_out_min),
+            ("amountOut", self.amount_out), ("amountInMax", self.amount_in_max),
+        )
+        params = {name: value for name, value in names if value is not None}
+        params.update(path=list(self.path), to=self.to, deadline=self.deadline)
+        return params
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"SwapCall({fields})"
+
+
+def exact_eth_in(selector, name, args, value):
+    amount_out_min, path, to, deadline = args
+    return SwapCall(selector, name, amount_in=value, amount_out_min=amount_out_min,
+                    path=path, to=to, deadline=deadline)
+
+
+def eth_for_exact_tokens(selector, name, args, value):
+    amount_out, path, to, deadline = args
+    return SwapCall(selector, name, amount_out=amount_out, amount_in_max=value,
+                    path=path, to=to, deadline=deadline)
+
+
+def exact_tokens_in(selector, name, args, value):
+    amount_in, amount_out_min, path, to, deadline = args
+    return SwapCall(selector, name, amount_in=amount_in, amount_out_min=amount_out_min,
+                    path=path, to=to, deadline=deadline)
+
+
+def tokens_for_exact_out(selector, name, args, value):
+    amount_out, amount_in_max, path, to, deadline = args
+    return SwapCall(selector, name, amount_out=amount_out, amount_in_max=amount_in_max,
+                    path=path, to=to, deadline=deadline)
+
+
+def v3_exact_input_single(selector, name, args, value):
+    token_in, token_out, _, recipient, amount_in, amount_out_min, _ = args[0]
+    return SwapCall(selector, name, amount_in=amount_in, amount_out_min=amount_out_min,
+                    path=(token_in, token_out), to=recipient)
+
+
+def v3_exact_output_single(selector, name, args, value):
+    token_in, token_out, _, recipient, amount_out, amount_in_max, _ = args[0]
+    return SwapCall(selector, name, amount_out=amount_out, amount_in_max=amount_in_max,
+                    path=(token_in, token_out), to=recipient)
+
+
+def v3_exact_output_single_deadline(selector, name, args, value):
+    token_in, token_out, _, recipient, deadline, amount_out, amount_in_max, _ = args[0]
+    return SwapCall(selector, name, amount_out=amount_out, amount_in_max=amount_in_max,
+                    path=(token_in, token_out), to=recipient, deadline=deadline)
+
+
+def v3_exact_output(selector, name, args, value):
+    encoded_path, recipient, amount_out, amount_in_max = args[0]
+    tokens = tuple("0x" + encoded_path[i:i + 20].hex() for i in range(0, len(encoded_path), 23))
+    return SwapCall(selector, name, amount_out=amount_out, amount_in_max=amount_in_max,
+                    path=tokens[::-1], to=recipient)
+
+
+def universal_router_execute(selector, name, args, value):
+    _, _, deadline = args
+    return SwapCall(selector, name, amount_in=value or None, deadline=deadline)
+
+
+SWAP_FUNCTIONS = {
+    b"\x7f\xf3j\xb5": ("swapExactETHForTokens", V2_EXACT_ETH_IN, exact_eth_in),
+    b"\xb6\xf9\xde\x95": ("swapExactETHForTokensSupportingFeeOnTransferTokens", V2_EXACT_ETH_IN, exact_eth_in),
+    b"\xfb;\xdbA": ("swapETHForExactTokens", V2_EXACT_ETH_IN, eth_for_exact_tokens),
+    b"8\xed\x17\x39": ("swapExactTokensForTokens", V2_EXACT_TOKENS, exact_tokens_in),
+    b"\\\x11\xd7\x95": ("swapExactTokensForTokensSupportingFeeOnTransferTokens", V2_EXACT_TOKENS, exact_tokens_in),
+    b"\x18\xcb\xaf\xe5": ("swapExactTokensForETH", V2_EXACT_TOKENS, exact_tokens_in),
+    b"y\x1a\xc9G": ("swapExactTokensForETHSupportingFeeOnTransferTokens", V2_EXACT_TOKENS, exact_tokens_in),
+    b"\x88\x03\xdb\xee": ("swapTokensForExactTokens", V2_EXACT_TOKENS, tokens_for_exact_out),
+    b"J%\xd9J": ("swapTokensForExactETH", V2_EXACT_TOKENS, tokens_for_exact_out),
+    b"\x04\xe4Z\xaf": ("exactInputSingle", ("(address,address,uint24,address,uint256,uint256,uint160)",),
+                        v3_exact_input_single),
+    b"P#\xb4\xdf": ("exactOutputSingle", ("(address,address,uint24,address,uint256,uint256,uint160)",),
+                    v3_exact_output_single),
+    b"\xdb>!\x98": ("exactOutputSingle", ("(address,address,uint24,address,uint256,uint256,uint256,uint160)",),
+                    v3_exact_output_single_deadline),
+    b"\t\xb8\x13F": ("exactOutput", ("(bytes,address,uint256,uint256)",), v3_exact_output),
+    b"5\x93VL": ("execute", ("bytes", "bytes[]", "uint256"), universal_router_execute),
+}
+
+SWAP_DECODERS = {
+    selector: (name, registry.get_tuple_decoder(*types, strict=False), build)
+    for selector, (name, types, build) in SWAP_FUNCTIONS.items()
+}
+
+
+def decode_swap_calldata(calldata, value=0):
+    """
+    Decodes router swap calldata with the decoder precompiled for its 4-byte selector.
+
+    Args:
+        calldata (bytes): Transaction input, selector included
+        value (int, optional): ETH value of the transaction, used as the input amount of
+            payable swaps. Defaults to 0.
+
+    Returns:
+        SwapCall | None: The decoded call, or None if the selector is not a known swap
+    """
+    entry = SWAP_DECODERS.get(bytes(calldata[:4]))
+    if entry is None:
+        return None
+    name, decoder, build = entry
+    args = decoder(ContextFramesBytesIO(bytes(calldata[4:])))
+    return build(bytes(calldata[:4]), name, args, value)
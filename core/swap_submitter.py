@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+
+from eth_abi import encode
+
+from config import CHAIN_ID, load_account
+from core.instrumentation import metrics
+from services.establish_quicknode_websocket_connection import (
+    establish_quicknode_websocket_connection,
+)
+
+SWAP_EXACT_ETH_FOR_TOKENS = bytes.fromhex("7ff36ab5")
+
+
+class NonceManager:
+    """
+    Hands out account nonces locally after a single get_transaction_count.
+    Thread-safe; call reset() after a failed send so the next nonce is re-read.
+    """
+
+    def __init__(self, web3, address):
+        self.web3 = web3
+        self.address = address
+        self.nonce = None
+        self.synced = False
+        self.lock = threading.Lock()
+
+    def next(self):
+        if not self.synced:
+            self.sync()
+        with self.lock:
+            nonce = self.nonce
+            self.nonce += 1
+            return nonce
+
+    def reset(self):
+        with self.lock:
+            self.nonce = None
+            self.synced = False
+
+    def restore(self, nonce):
+        """
+        Seeds the local nonce from a warm-state snapshot. It is only a placeholder:
+        the chain's pending count replaces it before the first next().
+        """
+        with self.lock:
+            if self.nonce is None:
+                self.nonce = nonce
+
+    def sync(self):
+        """
+        Sets the local nonce to the chain's pending count, up or down: a restored
+        nonce is behind when transactions were sent after the snapshot, and ahead
+        when a send failed or was dropped. A no-op once synced, so a late
+        background call never rewinds nonces already handed out.
+        """
+        pending = self.web3.eth.get_transaction_count(self.address, "pending")
+        with self.lock:
+            if not self.synced:
+                self.nonce = pending
+                self.synced = True
+
+
+class BaseFeeTracker:
+    """
+    Tracks the latest base fee from a newHeads subscription and projects the next
+    block's base fee with the EIP-1559 update rule. Callables in `listeners` are
+    called on the event loop with every head received by run(). `live` stays False
+    until a head was read from the chain, e.g. while it only holds a warm-state snapshot.
+    """
+
+    def __init__(self):
+        self.block_number = None
+        self.base_fee = None
+        self.next_base_fee = None
+        self.live = False
+        self.listeners = []
+
+    def update(self, head):
+        base_fee = head["baseFeePerGas"]
+        gas_target = head["gasLimit"] // 2
+        gas_used = head["gasUsed"]
+        if gas_used == gas_target or not gas_target:
+            next_base_fee = base_fee
+        elif gas_used > gas_target:
+            next_base_fee = base_fee + max(base_fee * (gas_used - gas_target) // gas_target // 8, 1)
+        else:
+            next_base_fee = base_fee - base_fee * (gas_target - gas_used) // gas_target // 8
+        self.block_number = head["number"]
+        self.base_fee = base_fee
+        self.next_base_fee = next_base_fee
+        self.live = True
+
+    def prime(self, web3):
+        self.update(web3.eth.get_block("latest"))
+
+    async def run(self, connect=establish_quicknode_websocket_connection):
+        """
+        Follows newHeads until cancelled, reconnecting with backoff.
+        """
+        backoff = 0.5
+        while True:
+            try:
+                async with await connect() as web3_wss:
+                    sub_id = await web3_wss.eth.subscribe("newHeads")
+                    backoff = 0.5
+                    async for message in web3_wss.socket.process_subscriptions():
+                        if message.get("subscription") == sub_id:
+                            self.update(message["result"])
+                            for listener in self.listeners:
+                                listener(message["result"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("❌ newHeads subscription lost:", str(e))
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10)
+
+
+class GasEstimateCache:
+    """
+    Caches one gas limit per (router function selector, path length), padded by
+    `multiplier`. Every extra hop runs another pair swap, so a limit estimated on a
+    shorter path is never reused for a longer one.
+    """
+
+    def __init__(self, multiplier=1.2):
+        self.multiplier = multiplier
+        self.limits = {}
+
+    def get(self, selector, path, estimate):
+        key = (selector, len(path))
+        limit = self.limits.get(key)
+        if limit is None:
+            limit = self.limits[key] = int(estimate() * self.multiplier)
+        return limit
+
+
+class SwapTemplate:
+    """
+    Pre-encoded swapExactETHForTokens calldata for a fixed path and recipient.
+    Only the amountOutMin (word 0) and deadline (word 3) are patched per swap.
+    """
+
+    def __init__(self, path, recipient):
+        self.path = path
+        self.recipient = recipient
+        encoded = encode(["uint256", "address[]", "address", "uint256"], [0, path, recipient, 0])
+        self.calldata = bytearray(SWAP_EXACT_ETH_FOR_TOKENS + encoded)
+
+    def patch(self, amount_out_min, deadline):
+        calldata = bytearray(self.calldata)
+        calldata[4:36] = amount_out_min.to_bytes(32, "big")
+        calldata[100:132] = deadline.to_bytes(32, "big")
+        return bytes(calldata)
+
+
+class SwapSubmitter:
+    """
+    Low-latency swap submission: local nonces, base fee from newHeads, cached gas
+    limits and pre-encoded templates, so only the send itself goes over the network
+    once warm.
+
+    Args:
+        web3: Web3 HTTP instance
+        router (dict): Router configuration returned by initialize_uniswap_router
+        account (LocalAccount, optional): Signing account. Defaults to load_account().
+        tip_gwei (float, optional): Priority fee in gwei. Defaults to 2.
+        gas_multiplier (float, optional): Padding applied to cached gas estimates. Defaults to 1.2.
+        chain_id (int, optional): Chain id signed into every transaction. Defaults to CHAIN_ID.
+    """
+
+    def __init__(self, web3, router, account=None, tip_gwei=2, gas_multiplier=1.2, chain_id=CHAIN_ID):
+        self.web3 = web3
+        self.router = router
+        self.chain_id = chain_id
+        self.account = account = account or load_account()
+        self.tip = web3.to_wei(tip_gwei, "gwei")
+        self.nonces = NonceManager(web3, account.address)
+        self.base_fee = BaseFeeTracker()
+        self.gas = GasEstimateCache(gas_multiplier)
+        self.templates = {}
+
+    def template(self, path):
+        key = tuple(path)
+        if key not in self.templates:
+            self.templates[key] = SwapTemplate(list(path), self.account.address)
+        return self.templates[key]
+
+    def swap_exact_eth_for_tokens(self, amount_in_wei, min_amount_out, path, deadline=None):
+        """
+        Signs and sends swapExactETHForTokens, timing every step.
+
+        Returns:
+            tuple: (tx_hash, timings) with the milliseconds spent on each step
+        """
+        timings = {}
+        step = time.perf_counter()
+
+        def lap(name):
+            nonlocal step
+            now = time.perf_counter()
+            timings[name] = (now - step) * 1e3
+            step = now
+
+        deadline = deadline or int(time.time()) + 900
+        template = self.template(path)
+        calldata = template.patch(min_amount_out, deadline)
+        lap("encode")
+        nonce = self.nonces.next()
+        lap("nonce")
+        gas_limit = self.gas.get(SWAP_EXACT_ETH_FOR_TOKENS, path, lambda: self.web3.eth.estimate_gas({
+            "from": self.account.address, "to": self.router["address"],
+            "value": amount_in_wei, "data": calldata,
+        }))
+        lap("gas")
+        if not self.base_fee.live:
+            self.base_fee.prime(self.web3)
+        max_fee = self.base_fee.next_base_fee + self.tip
+        lap("fee")
+        signed = self.account.sign_transaction({
+            "type": 2,
+            "chainId": self.chain_id,
+            "nonce": nonce,
+            "to": self.router["address"],
+            "value": amount_in_wei,
+            "data": calldata,
+            "gas": gas_limit,
+            "maxPriorityFeePerGas": self.tip,
+            "maxFeePerGas": max_fee,
+        })
+        lap("sign")
+        try:
+            tx_hash = self.web3.eth.send_raw_transaction(signed.raw_transaction)
+        except Exception:
+            self.nonces.reset()
+            metrics.inc("submission_errors")
+            raise
+        lap("send")
+        timings["total"] = sum(timings.values())
+        metrics.observe("submission", timings["total"] / 1e3)
+        print("⏱️  Submission timings:", ", ".join(f"{name} {ms:.2f} ms" for name, ms in timings.items()))
+        return tx_hash, timings
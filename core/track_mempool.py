@@ -1,69 +1,194 @@
 import asyncio
-import time
 from eth_utils import to_hex
-from services import establish_quicknode_websocket_connection
-from utils import get_transaction_gas_price, is_uniswap_router_transaction
-from core.slippage import slippage_trigger
+from config import (
+    METRICS_HOST,
+    METRICS_PORT,
+    METRICS_REPORT_INTERVAL,
+    PENDING_INGEST,
+    PIPELINE_PROCESSES,
+    QUICK_NODE_WSS_URLS,
+    USDC_TOKEN,
+    USDC_WETH_POOL,
+    WETH_TOKEN,
+    WSS_STANDBY,
+    load_account,
+)
+from services import establish_quicknode_websocket_connection, pair_registry, price_oracle, reserve_cache
+from services.mempool_fan_in import MempoolFanIn
+from services.pending_transaction_stream import PendingTransactionStream
+from utils import get_transaction_gas_price
+from core.instrumentation import metrics
+from core.mempool_state import SeenHashes, SwapRecord, TopKSwaps
+from core.inclusion_tracker import InclusionTracker
+from core.pending_state import PendingState
+from core.swap_submitter import BaseFeeTracker
+from core.pipeline import MempoolPipeline
+from core.sharded_analysis import ShardedAnalyzer
 
 
 async def track_mempool(
-    max_swaps=20, max_seconds=60, subscription_ready=None, router=None, web3_http=None
+    max_swaps=20, max_seconds=60, subscription_ready=None, router=None, web3_http=None,
+    capture_log=None, top_k=None, report_interval=60, stop_event=None, writers=(), base_fee=None,
+    warm_state=None,
 ):
     """
     Tracks the Ethereum mempool for Uniswap router transactions.
 
-    Establishes a WebSocket connection to monitor pending transactions, filters for
-    Uniswap router transactions, and collects them until either the maximum number
-    of swaps is reached or the timeout period elapses.
+    Subscribes to pending transactions on every endpoint of QUICK_NODE_WSS_URLS through
+    a MempoolFanIn, which keeps a warm standby connection per endpoint, and feeds every
+    pending hash the first time any endpoint announces it into a MempoolPipeline, which fetches, filters, decodes and simulates
+    Uniswap router transactions off the listener loop. Hashes already seen are skipped,
+    and swaps on the USDC/WETH pool are simulated on top of the pending swaps ahead of them.
+    Collects them until either the maximum number of swaps is reached or the timeout
+    period elapses; with both set to None it runs until cancelled. When metrics are
+    enabled, per-stage latencies are served on a Prometheus endpoint and summarized
+    every METRICS_REPORT_INTERVAL seconds. With PIPELINE_PROCESSES set, decoding and first-hop
+    sandwich estimates are sharded across that many worker processes. With PENDING_INGEST
+    set to "full", a PendingTransactionStream receives full pending transactions instead
+    and only router swaps that pass its raw-bytes filter enter the pipeline.
 
     Args:
         max_swaps (int, optional): Maximum number of swap transactions to collect. Defaults to 20.
+            None for no limit.
         max_seconds (int, optional): Maximum time in seconds to monitor mempool. Defaults to 60.
+            None for no limit.
         subscription_ready (asyncio.Event, optional): Event to signal when subscription is ready.
             Used for synchronization with other tasks. Defaults to None.
+        capture_log (CaptureLogWriter, optional): Records the pending transaction stream for
+            offline replay with core.replay. Defaults to None.
+        top_k (int, optional): Daemon mode. Keep only the top_k swaps by gas price as compact
+            SwapRecords instead of every transaction, so memory stays flat. Defaults to None.
+        report_interval (int, optional): Seconds between stats reports in daemon mode. Defaults to 60.
+        stop_event (asyncio.Event, optional): Set it to stop tracking gracefully, e.g. from a
+            signal handler. Defaults to None.
+        writers (iterable, optional): Swap writers from services.swap_output; every swap is
+            streamed to them with its simulation result as soon as it is simulated. They are
+            closed when tracking stops. Defaults to ().
+        base_fee (BaseFeeTracker, optional): Running newHeads tracker that ranks and expires
+            queued swaps. A tracker is started here when not provided. Defaults to None.
+        warm_state (WarmState, optional): Snapshot restored into the base fee tracker, reserve
+            mirror, token decimals and seen-hash set before subscribing, then saved every
+            WARM_STATE_INTERVAL seconds and once more on the way out. Defaults to None.
 
     Returns:
         list: List of collected Uniswap swap transactions, where each transaction is a dict
-        containing transaction details like hash, gas price, etc.
+        containing transaction details like hash, gas price, etc. In daemon mode, the top_k
+        SwapRecords, highest gas price first.
     """
-    swaps, start = [], time.time()
-    async with await establish_quicknode_websocket_connection() as web3_wss:
-        sub_id = await web3_wss.eth.subscribe("newPendingTransactions")
+    swaps = []
+    top = TopKSwaps(top_k) if top_k else None
+    captured = 0
+    done = stop_event or asyncio.Event()
 
-        if subscription_ready:
-            subscription_ready.set()
+    def on_swap(transaction):
+        nonlocal captured
+        print(
+            f"👁️  Swap seen: {to_hex(transaction['hash'])} with gas price {get_transaction_gas_price(transaction)}"
+        )
+        captured += 1
+        if top is not None:
+            top.push(SwapRecord.from_transaction(transaction))
+        else:
+            swaps.append(transaction)
+        if max_swaps is not None and captured >= max_swaps:
+            done.set()
 
-        start = time.time()
+    def on_complete(item):
+        for writer in writers:
+            writer.write(item.transaction, item.result)
 
-        async for pending_transaction in web3_wss.socket.process_subscriptions():
-            transaction_hash = pending_transaction["result"]
+    heads = None
+    if base_fee is None:
+        base_fee = BaseFeeTracker()
+        heads = asyncio.create_task(base_fee.run())
+    seen_hashes = SeenHashes()
+    saver = None
+    if warm_state:
+        warm_state.base_fee = base_fee
+        warm_state.seen_hashes = seen_hashes
+        restored = warm_state.restore()
+        if restored:
+            print(f"♻️  Restored warm state: {restored}")
+        saver = asyncio.create_task(warm_state.run())
+    reserve_cache.watch(USDC_WETH_POOL)
+    if pair_registry.pair_address(USDC_TOKEN, WETH_TOKEN).lower() != USDC_WETH_POOL.lower():
+        print("⚠️  USDC_WETH_POOL is not the CREATE2 address of FACTORYV2; check PAIR_INIT_CODE_HASH")
+        pair_registry.register(USDC_TOKEN, WETH_TOKEN, USDC_WETH_POOL)
+    await asyncio.get_running_loop().run_in_executor(None, pair_registry.warm, web3_http, USDC_TOKEN, WETH_TOKEN)
+    pending_state = PendingState(base_fee)
+    pending_state.watch(USDC_WETH_POOL, USDC_TOKEN, WETH_TOKEN)
+    reserve_mirror = asyncio.create_task(reserve_cache.run(web3_http))
+    price_oracle.track(USDC_TOKEN, WETH_TOKEN)
+    await price_oracle.start()
+    shards = ShardedAnalyzer(router["abi"]) if PIPELINE_PROCESSES else None
+    if shards:
+        shards.start()
+    metrics_server = await metrics.serve(METRICS_HOST, METRICS_PORT) if metrics.enabled else None
+    metrics_reporter = asyncio.create_task(metrics.report(METRICS_REPORT_INTERVAL)) if metrics.enabled else None
 
-            try:
-                transaction = await web3_wss.eth.get_transaction(transaction_hash)
-            except Exception:
-                continue
+    try:
+        async with await establish_quicknode_websocket_connection() as web3_wss:
+            inclusion = InclusionTracker(web3_wss)
+            base_fee.listeners.append(inclusion.on_head)
+            pipeline = MempoolPipeline(
+                web3_wss, web3_http, router, on_swap=on_swap, on_complete=on_complete,
+                capture_log=capture_log, seen_hashes=seen_hashes, pending_state=pending_state,
+                base_fee=base_fee, inclusion=inclusion, shards=shards,
+                account_address=load_account().address,
+            )
+            pipeline.start()
+            if PENDING_INGEST == "full":
+                source = PendingTransactionStream(QUICK_NODE_WSS_URLS, seen_hashes=seen_hashes)
+                listener = asyncio.create_task(source.run(pipeline.submit_transaction))
+            else:
+                source = MempoolFanIn(QUICK_NODE_WSS_URLS, standby=WSS_STANDBY)
+                listener = asyncio.create_task(source.run(pipeline.submit))
+            await source.subscribed.wait()
 
-            if transaction is None:
-                await asyncio.sleep(0.3)
-                try:
-                    transaction = await web3_wss.eth.get_transaction(transaction_hash)
-                except Exception:
-                    continue
-            if transaction and is_uniswap_router_transaction(transaction):
+            if subscription_ready:
+                subscription_ready.set()
 
+            async def report():
+                while True:
+                    await asyncio.sleep(report_interval)
+                    print(f"📊 {captured} swaps captured, pipeline stats: {pipeline.stats()}")
+                    print(f"📡 Endpoint stats: {source.stats()}")
 
-                print(
-                    f"👁️  Swap seen: {to_hex(transaction_hash)} with gas price {get_transaction_gas_price(transaction)}"
+            finished = asyncio.create_task(done.wait())
+            reporter = asyncio.create_task(report()) if top is not None else None
+            tasks = [task for task in (listener, finished, reporter) if task]
+            try:
+                await asyncio.wait(
+                    [listener, finished], timeout=max_seconds, return_when=asyncio.FIRST_COMPLETED
                 )
-                slippage_trigger(web3_http, router, transaction)
-                swaps.append(transaction)
-                if len(swaps) >= max_swaps:
-                    break
-
-            elapsed_time = time.time() - start
-            if elapsed_time > max_seconds:
-                print("⏰ Timeout reached")
-                break
-
-        await web3_wss.eth.unsubscribe(sub_id)
-    return swaps
+                if not done.is_set() and not listener.done():
+                    print("⏰ Timeout reached")
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                base_fee.listeners.remove(inclusion.on_head)
+                await inclusion.stop()
+                await pipeline.stop()
+                print(f"📊 Pipeline stats: {pipeline.stats()}")
+                print(f"📡 Endpoint stats: {source.stats()}")
+    finally:
+        background = [task for task in (reserve_mirror, heads, saver) if task]
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        if warm_state:
+            await warm_state.save_async()
+            print(f"💾 Warm state saved to {warm_state.path}")
+        await price_oracle.stop()
+        if shards:
+            shards.stop()
+        if metrics_server:
+            metrics_reporter.cancel()
+            metrics_server.close()
+            print("📈 Latency summary\n" + metrics.summary())
+        for writer in writers:
+            writer.close()
+    if top is not None:
+        return top.sorted()
+    return swaps[:max_swaps]
@@ -0,0 +1,113 @@
+from services.pair_index import sort_tokens
+from services.pair_reserve_cache import reserve_cache
+
+FEE_NUMERATOR = 997
+FEE_DENOMINATOR = 1000
+
+
+def quote(amount_a: int, reserve_a: int, reserve_b: int) -> int:
+    """
+    UniswapV2Library.quote: equivalent amount of the other asset at the current reserves.
+    """
+    if amount_a <= 0:
+        raise ValueError("UniswapV2Library: INSUFFICIENT_AMOUNT")
+    if reserve_a <= 0 or reserve_b <= 0:
+        raise ValueError("UniswapV2Library: INSUFFICIENT_LIQUIDITY")
+    return amount_a * reserve_b // reserve_a
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    """
+    UniswapV2Library.getAmountOut with the 0.3% fee, in exact uint256 integer math.
+    """
+    if amount_in <= 0:
+        raise ValueError("UniswapV2Library: INSUFFICIENT_INPUT_AMOUNT")
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise ValueError("UniswapV2Library: INSUFFICIENT_LIQUIDITY")
+    amount_in_with_fee = amount_in * FEE_NUMERATOR
+    return amount_in_with_fee * reserve_out // (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+
+def get_amount_in(amount_out: int, reserve_in: int, reserve_out: int) -> int:
+    """
+    UniswapV2Library.getAmountIn with the 0.3% fee, in exact uint256 integer math.
+    """
+    if amount_out <= 0:
+        raise ValueError("UniswapV2Library: INSUFFICIENT_OUTPUT_AMOUNT")
+    if reserve_in <= 0 or reserve_out <= 0 or amount_out >= reserve_out:
+        raise ValueError("UniswapV2Library: INSUFFICIENT_LIQUIDITY")
+    numerator = reserve_in * amount_out * FEE_DENOMINATOR
+    denominator = (reserve_out - amount_out) * FEE_NUMERATOR
+    return numerator // denominator + 1
+
+
+def get_amounts_out(amount_in: int, path, get_reserves):
+    """
+    UniswapV2Library.getAmountsOut over a multi-hop path.
+
+    Args:
+        amount_in (int): Exact input amount of path[0]
+        path (list): Token addresses of the route
+        get_reserves (callable): get_reserves(token_a, token_b) -> (reserve_a, reserve_b)
+
+    Returns:
+        list: Amounts for every token in path, matching the router's uint256[] result
+    """
+    if len(path) < 2:
+        raise ValueError("UniswapV2Library: INVALID_PATH")
+    amounts = [amount_in]
+    for i in range(len(path) - 1):
+        reserve_in, reserve_out = get_reserves(path[i], path[i + 1])
+        amounts.append(get_amount_out(amounts[i], reserve_in, reserve_out))
+    return amounts
+
+
+def get_amounts_in(amount_out: int, path, get_reserves):
+    """
+    UniswapV2Library.getAmountsIn over a multi-hop path.
+
+    Args:
+        amount_out (int): Exact output amount of path[-1]
+        path (list): Token addresses of the route
+        get_reserves (callable): get_reserves(token_a, token_b) -> (reserve_a, reserve_b)
+
+    Returns:
+        list: Amounts for every token in path, matching the router's uint256[] result
+    """
+    if len(path) < 2:
+        raise ValueError("UniswapV2Library: INVALID_PATH")
+    amounts = [0] * len(path)
+    amounts[-1] = amount_out
+    for i in range(len(path) - 1, 0, -1):
+        reserve_in, reserve_out = get_reserves(path[i - 1], path[i])
+        amounts[i - 1] = get_amount_in(amounts[i], reserve_in, reserve_out)
+    return amounts
+
+
+def cached_reserves_lookup(pairs, cache=reserve_cache):
+    """
+    Builds a get_reserves callable served from the local reserve mirror.
+
+    Args:
+        pairs (dict): {(token_a, token_b): pair_address} for every hop that may be quoted
+        cache (ReserveCache, optional): Reserve mirror to read from.
+
+    Returns:
+        callable: get_reserves(token_a, token_b) -> (reserve_a, reserve_b). Raises
+        LookupError when the pair is unknown or not mirrored yet.
+    """
+    pair_addresses = {}
+    for (token_a, token_b), pair_address in pairs.items():
+        pair_addresses[frozenset((token_a.lower(), token_b.lower()))] = pair_address
+
+    def get_reserves(token_a, token_b):
+        pair_address = pair_addresses.get(frozenset((token_a.lower(), token_b.lower())))
+        reserves = cache.get(pair_address) if pair_address else None
+        if reserves is None:
+            raise LookupError(f"No cached reserves for {token_a}/{token_b}")
+        token0, _ = sort_tokens(token_a, token_b)
+        if token_a == token0:
+            return reserves
+        return reserves[1], reserves[0]
+
+    return get_reserves
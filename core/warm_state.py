@@ -0,0 +1,210 @@
+import asyncio
+import base64
+import json
+import os
+import time
+from collections import OrderedDict
+
+from config import CHAIN_ID, WARM_STATE_INTERVAL, WARM_STATE_MAX_AGE
+from services.pair_index import pair_registry
+from services.pair_reserve_cache import reserve_cache
+
+WARM_STATE_VERSION = 1
+HASH_BYTES = 32
+
+
+def encode_bytes(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def decode_bytes(text):
+    return base64.b64decode(text)
+
+
+class WarmState:
+    """
+    Snapshot of the state a restart otherwise rebuilds with RPC calls and minutes of
+    traffic: the next account nonce, the last base fee, mirrored pair reserves,
+    token decimals and the seen-hash set.
+
+    snapshot() copies everything in one pass on the event loop, and the file is
+    written from a thread to a temporary file that then replaces the previous
+    snapshot, so a crash mid-write keeps the last one. restore() ignores a snapshot
+    of another chain or older than max_age, and never overwrites newer state.
+    Restored reserves, nonces and base fee are only a head start: the reserve mirror
+    resyncs on connect, the submitter reads its nonce and fees from the chain before
+    its first send (run() reads the nonce early in the background so the send does
+    not wait for it), and the restored base fee only ranks pending swaps.
+
+    Args:
+        path (str): Snapshot file
+        max_age (float, optional): Oldest snapshot restored, in seconds. Defaults to
+            WARM_STATE_MAX_AGE.
+        nonces (NonceManager, optional): Local nonce source of the submitter.
+        base_fee (BaseFeeTracker, optional): newHeads tracker.
+        seen_hashes (SeenHashes, optional): Pipeline dedup set.
+        cache (ReserveCache, optional): Reserve mirror. Defaults to reserve_cache.
+        registry (PairRegistry, optional): Token decimals cache. Defaults to pair_registry.
+    """
+
+    def __init__(self, path, max_age=WARM_STATE_MAX_AGE, nonces=None, base_fee=None, seen_hashes=None,
+                 cache=reserve_cache, registry=pair_registry):
+        self.path = path
+        self.max_age = max_age
+        self.nonces = nonces
+        self.base_fee = base_fee
+        self.seen_hashes = seen_hashes
+        self.cache = cache
+        self.registry = registry
+        self.restored_nonce = False
+        self.saves = 0
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: JSON-ready copy of the current state; call it on the event loop
+        """
+        state = {"version": WARM_STATE_VERSION, "saved_at": time.time(), "chain_id": CHAIN_ID}
+        if self.nonces is not None and self.nonces.nonce is not None:
+            state["nonce"] = {"address": self.nonces.address, "next": self.nonces.nonce}
+        if self.base_fee is not None and self.base_fee.block_number is not None:
+            state["base_fee"] = {
+                "block_number": self.base_fee.block_number,
+                "base_fee": self.base_fee.base_fee,
+                "next_base_fee": self.base_fee.next_base_fee,
+            }
+        if self.cache is not None:
+            state["reserves"] = {pair: list(pair_state) for pair, pair_state in list(self.cache.states.items())}
+        if self.registry is not None:
+            state["decimals"] = dict(self.registry.token_decimals)
+        if self.seen_hashes is not None:
+            seen = self.seen_hashes
+            state["seen_hashes"] = {
+                "bloom_bits": seen.bloom_bits,
+                "bloom_hashes": seen.bloom_hashes,
+                "bloom_count": seen.bloom_count,
+                "recent": encode_bytes(b"".join(seen.recent)),
+                "blooms": [encode_bytes(bytes(bloom)) for bloom in seen.blooms],
+            }
+        return state
+
+    def write(self, state):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+        os.replace(temporary, self.path)
+        self.saves += 1
+
+    def save(self):
+        self.write(self.snapshot())
+
+    async def save_async(self):
+        """
+        save() for the event loop: snapshots here and writes from a thread.
+        """
+        state = self.snapshot()
+        await asyncio.get_running_loop().run_in_executor(None, self.write, state)
+
+    def load(self):
+        """
+        Returns:
+            dict | None: The snapshot, or None when it is missing, unreadable, of another
+            chain or version, or older than max_age
+        """
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable warm state {self.path}: {e}")
+            return None
+        if state.get("version") != WARM_STATE_VERSION or state.get("chain_id") != CHAIN_ID:
+            print(f"⚠️  Ignoring warm state {self.path} of another version or chain")
+            return None
+        age = time.time() - state["saved_at"]
+        if age > self.max_age:
+            print(f"⚠️  Ignoring warm state {self.path} saved {age:.0f}s ago")
+            return None
+        return state
+
+    def restore(self):
+        """
+        Loads the snapshot into the attached components.
+
+        Returns:
+            dict | None: What was restored, e.g. {"age": 12.5, "reserves": 3, ...}, or None
+        """
+        state = self.load()
+        if state is None:
+            return None
+        restored = {"age": round(time.time() - state["saved_at"], 1)}
+
+        nonce = state.get("nonce")
+        if self.nonces is not None and nonce and nonce["address"] == self.nonces.address:
+            self.nonces.restore(nonce["next"])
+            self.restored_nonce = True
+            restored["nonce"] = nonce["next"]
+
+        head = state.get("base_fee")
+        if self.base_fee is not None and head and (self.base_fee.block_number or 0) < head["block_number"]:
+            self.base_fee.block_number = head["block_number"]
+            self.base_fee.base_fee = head["base_fee"]
+            self.base_fee.next_base_fee = head["next_base_fee"]
+            restored["block_number"] = head["block_number"]
+
+        if self.cache is not None:
+            count = 0
+            for pair, (reserve0, reserve1, block_number, log_index) in state.get("reserves", {}).items():
+                current = self.cache.states.get(pair)
+                if current is None or (current[2], current[3]) < (block_number, log_index):
+                    self.cache.set_state(pair, reserve0, reserve1, block_number, log_index)
+                    count += 1
+            restored["reserves"] = count
+
+        if self.registry is not None:
+            for token, decimals in state.get("decimals", {}).items():
+                if token not in self.registry.token_decimals:
+                    self.registry.set_decimals(token, decimals)
+            restored["decimals"] = len(state.get("decimals", {}))
+
+        seen = state.get("seen_hashes")
+        if self.seen_hashes is not None and seen:
+            restored["seen_hashes"] = self.restore_seen_hashes(seen)
+        return restored
+
+    def restore_seen_hashes(self, seen):
+        target = self.seen_hashes
+        recent = decode_bytes(seen["recent"])
+        hashes = [recent[i:i + HASH_BYTES] for i in range(0, len(recent), HASH_BYTES)]
+        if (seen["bloom_bits"], seen["bloom_hashes"]) == (target.bloom_bits, target.bloom_hashes):
+            target.blooms = [bytearray(decode_bytes(bloom)) for bloom in seen["blooms"]]
+            target.bloom_count = seen["bloom_count"]
+        live = target.recent
+        target.recent = OrderedDict.fromkeys(hashes[-target.capacity:])
+        for transaction_hash in hashes[:-target.capacity]:
+            target.retire(transaction_hash)
+        for transaction_hash in live:
+            target.add(transaction_hash)
+        return len(hashes)
+
+    async def run(self, interval=WARM_STATE_INTERVAL):
+        """
+        Syncs a restored nonce with the chain ahead of the first send, then saves every
+        `interval` seconds until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        if self.restored_nonce:
+            try:
+                await loop.run_in_executor(None, self.nonces.sync)
+            except Exception as e:
+                print("❌ Failed to reconcile the restored nonce:", str(e))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.save_async()
+            except Exception as e:
+                print("❌ Failed to save warm state:", str(e))
@@ -1,6 +1,6 @@
 SWAP_SELECTORS = {
     b"\x7f\xf3j\xb5",
-    b"\xfb=\xdbA",
+    b"\xfb;\xdbA",
     b"\x18\xcb\xaf\xe5",
     b"J%\xd9J",
     b"8\xed\x17\x39",
@@ -10,4 +10,7 @@ SWAP_SELECTORS = {
     b"\xdb>!\x98",
     b"\t\xb8\x13F",
     b"5\x93VL",
+    b"\xb6\xf9\xde\x95",
+    b"\\\x11\xd7\x95",
+    b"y\x1a\xc9G",
 }
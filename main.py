@@ -1,24 +1,71 @@
+import time
+
+STARTED_AT = time.perf_counter()
+
+import argparse
 import asyncio
-import json
-import os
 import random
+import signal
 
 from prettytable import PrettyTable
-from core import execute_swap, track_mempool
+from config import (
+    CAPTURE_LOG_PATH,
+    OUTPUT_DIR,
+    OUTPUT_FLUSH_RECORDS,
+    OUTPUT_FORMATS,
+    OUTPUT_MAX_BYTES,
+    OUTPUT_MAX_SECONDS,
+    STARTUP_BUDGET,
+    WARM_STATE_PATH,
+    print_settings,
+    validate,
+)
+from core import SwapSubmitter, execute_swap, track_mempool
+from core.instrumentation import metrics
+from core.warm_state import WarmState
 from eth_utils import to_hex
 from services import (
     establish_quicknode_http_connection,
     initialize_uniswap_router,
 )
-from services.get_liquidity_weth_usdc import get_liquidity_and_price
+from services.capture_log import CaptureLogWriter
+from services.swap_output import SWAP_WRITERS
 from utils import get_transaction_gas_price
 
-web3_http = establish_quicknode_http_connection()
+validate()
+print_settings()
+capture_log = CaptureLogWriter(CAPTURE_LOG_PATH) if CAPTURE_LOG_PATH else None
+web3_http = establish_quicknode_http_connection(capture_log)
 router = initialize_uniswap_router(web3_http)
+submitter = SwapSubmitter(web3_http, router)
+
+
+async def report_startup(ready):
+    """
+    Reports how long after the first import the mempool subscription was live,
+    against STARTUP_BUDGET.
+    """
+    await ready.wait()
+    elapsed = time.perf_counter() - STARTED_AT
+    metrics.observe("startup", elapsed)
+    flag = "✅" if elapsed <= STARTUP_BUDGET else "⚠️ "
+    print(f"{flag} Listening {elapsed:.2f}s after start (budget {STARTUP_BUDGET:.2f}s)")
+
+
+def swap_writers():
+    return [
+        SWAP_WRITERS[output_format](
+            OUTPUT_DIR, max_bytes=OUTPUT_MAX_BYTES, max_seconds=OUTPUT_MAX_SECONDS,
+            flush_records=OUTPUT_FLUSH_RECORDS,
+        )
+        for output_format in OUTPUT_FORMATS
+    ]
 
 
 async def main():
     ready = asyncio.Event()
+    startup = asyncio.create_task(report_startup(ready))
+    base_fee_tracker = asyncio.create_task(submitter.base_fee.run())
     listener = asyncio.create_task(
         track_mempool(
             max_swaps=20,
@@ -26,21 +73,26 @@ async def main():
             subscription_ready=ready,
             router=router,
             web3_http=web3_http,
+            capture_log=capture_log,
+            writers=swap_writers(),
+            base_fee=submitter.base_fee,
+            warm_state=WarmState(WARM_STATE_PATH, nonces=submitter.nonces) if WARM_STATE_PATH else None,
         )
     )
-    weth_address = web3_http.to_checksum_address(os.getenv("WETH_TOKEN"))
-    usdc_address = web3_http.to_checksum_address(os.getenv("USDC_TOKEN"))
-    #get_liquidity_and_price(web3_http, weth_address, usdc_address, 8543949317590771002000)
-    #execute_swap(web3_http, router, 8543949317590771002000)
     await ready.wait()
+    loop = asyncio.get_running_loop()
     for _ in range(3):
         if random.random() < 0.9:
             amount_eth = round(random.uniform(0.0003, 0.002), 6)
         else:
             amount_eth = round(random.uniform(0.005, 0.02), 6)
-        execute_swap(web3_http, router, amount_eth)
+        await loop.run_in_executor(None, execute_swap, web3_http, router, amount_eth, submitter)
         await asyncio.sleep(0.5)
     swaps = await listener
+    base_fee_tracker.cancel()
+    startup.cancel()
+    if capture_log:
+        capture_log.close()
     print(
         f"🎯 Successfully captured {len(swaps)} router {'swap' if len(swaps) == 1 else 'swaps'}! 🚀"
     )
@@ -52,9 +104,47 @@ async def main():
         t.add_row([to_hex(tx["hash"]), get_transaction_gas_price(tx)])
     print(t)
 
-    with open("output/swaps.json", "w") as f:
-        json.dump([dict(tx) for tx in swaps], f, indent=2, default=to_hex)
+
+async def daemon(top_k, report_interval):
+    """
+    Tracks the mempool until SIGINT/SIGTERM, keeping only the top_k swaps by gas price.
+    """
+    stop = asyncio.Event()
+    ready = asyncio.Event()
+    startup = asyncio.create_task(report_startup(ready))
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    records = await track_mempool(
+        max_swaps=None,
+        max_seconds=None,
+        subscription_ready=ready,
+        router=router,
+        web3_http=web3_http,
+        capture_log=capture_log,
+        top_k=top_k,
+        report_interval=report_interval,
+        stop_event=stop,
+        writers=swap_writers(),
+        warm_state=WarmState(WARM_STATE_PATH, nonces=submitter.nonces) if WARM_STATE_PATH else None,
+    )
+    startup.cancel()
+    if capture_log:
+        capture_log.close()
+    t = PrettyTable(["Transaction Hash", "Gas Price"])
+    t.hrules = True
+    for record in records:
+        t.add_row([to_hex(record.hash), record.gas_price])
+    print(t)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Uniswap V2 mempool MEV bot")
+    parser.add_argument("--daemon", action="store_true", help="Run until stopped with flat memory")
+    parser.add_argument("--top-k", type=int, default=20, help="Swaps kept by gas price in daemon mode")
+    parser.add_argument("--report-interval", type=int, default=60, help="Seconds between daemon stats")
+    args = parser.parse_args()
+    if args.daemon:
+        asyncio.run(daemon(args.top_k, args.report_interval))
+    else:
+        asyncio.run(main())
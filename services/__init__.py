@@ -1,3 +1,7 @@
 from .establish_quicknode_http_connection import *
 from .establish_quicknode_websocket_connection import *
+from .abi_cache import *
 from .initialize_uniswap_router import *
+from .pair_reserve_cache import *
+from .pair_index import *
+from .price_feed import *
@@ -0,0 +1,52 @@
+import functools
+import json
+import threading
+import weakref
+from pathlib import Path
+
+ABI_DIR = Path(__file__).resolve().parent.parent / "abi"
+
+_factories = weakref.WeakKeyDictionary()
+_factories_lock = threading.Lock()
+
+
+@functools.cache
+def load_abi(name):
+    """
+    Parses abi/<name>.json once per process, wherever it was started from.
+    Truffle-style artifacts are unwrapped to their "abi" list.
+
+    Args:
+        name (str): File name without extension, e.g. "UniswapV2Pair"
+
+    Returns:
+        list: The ABI, shared between callers, so it must not be modified
+    """
+    with open(ABI_DIR / f"{name}.json") as f:
+        abi = json.load(f)
+    return abi["abi"] if isinstance(abi, dict) else abi
+
+
+def contract_factory(web3, name):
+    """
+    Builds the contract class of an ABI once per Web3 instance. web3 generates a
+    class per function and event every time eth.contract() gets an ABI, which costs
+    more than binding an address to a class that already exists.
+
+    Returns:
+        type: Contract factory bound to `web3`; call it with address=... for an instance
+    """
+    with _factories_lock:
+        factories = _factories.setdefault(web3, {})
+        factory = factories.get(name)
+        if factory is None:
+            factory = factories[name] = web3.eth.contract(abi=load_abi(name))
+    return factory
+
+
+def load_contract(web3, name, address):
+    """
+    Returns:
+        Contract: Instance of the `name` ABI at `address`
+    """
+    return contract_factory(web3, name)(address=web3.to_checksum_address(address))
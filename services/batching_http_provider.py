@@ -0,0 +1,200 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import HTTPProvider
+from web3._utils.encoding import FriendlyJsonSerde, Web3JsonEncoder
+
+from config import RPC_BATCH_WINDOW, RPC_MAX_BATCH, RPC_POOL_SIZE, RPC_RATE_LIMIT
+
+DEDUP_METHODS = frozenset({
+    "eth_call",
+    "eth_chainId",
+    "eth_blockNumber",
+    "eth_getBalance",
+    "eth_getBlockByNumber",
+    "eth_getBlockReceipts",
+    "eth_getCode",
+    "eth_getTransactionByHash",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+    "eth_estimateGas",
+})
+METHOD_TIMEOUTS = {
+    "eth_call": 5.0,
+    "eth_estimateGas": 5.0,
+    "eth_getBalance": 5.0,
+    "eth_sendRawTransaction": 10.0,
+}
+DEFAULT_TIMEOUT = 10.0
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: `rate` requests per second with bursts up to `burst`.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchingHTTPProvider(HTTPProvider):
+    """
+    HTTPProvider that coalesces concurrent calls into JSON-RPC batches.
+
+    Calls made from any thread are queued; a flusher thread collects whatever
+    arrives within `batch_window` seconds (up to `max_batch` calls) and posts it as
+    one batch over a keep-alive session pool of `pool_size` connections, with up to
+    `pool_size` batches in flight. Identical in-flight reads (same method and
+    params, e.g. getReserves at the same block) share one request. Calls wait at
+    most their per-method timeout, and token buckets keep the request rate under
+    the node provider's quota, globally and per method.
+
+    Args:
+        endpoint_uri (str): JSON-RPC HTTP endpoint
+        batch_window (float, optional): Seconds to wait for more calls before flushing.
+        max_batch (int, optional): Calls per batch.
+        pool_size (int, optional): Keep-alive connections and concurrent batches.
+        rate_limit (float, optional): Requests per second over all methods; 0 for none.
+        method_rate_limits (dict, optional): Requests per second per method.
+        method_timeouts (dict, optional): Seconds a call of each method may take.
+            Defaults to METHOD_TIMEOUTS, DEFAULT_TIMEOUT for others.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri,
+        batch_window=RPC_BATCH_WINDOW,
+        max_batch=RPC_MAX_BATCH,
+        pool_size=RPC_POOL_SIZE,
+        rate_limit=RPC_RATE_LIMIT,
+        method_rate_limits=None,
+        method_timeouts=None,
+        **kwargs,
+    ):
+        super().__init__(endpoint_uri, **kwargs)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.method_timeouts = METHOD_TIMEOUTS if method_timeouts is None else method_timeouts
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.method_limiters = {
+            method: RateLimiter(rate) for method, rate in (method_rate_limits or {}).items()
+        }
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.senders = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="rpc-batch")
+        self.pending = queue.SimpleQueue()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+        self.serde = FriendlyJsonSerde()
+        self.flusher = None
+        self.requests = 0
+        self.batches = 0
+        self.deduplicated = 0
+
+    def timeout(self, method):
+        return self.method_timeouts.get(method, DEFAULT_TIMEOUT)
+
+    def make_request(self, method, params):
+        params = params or []
+        key = self.serde.json_encode([method, params], Web3JsonEncoder) if method in DEDUP_METHODS else None
+        with self.lock:
+            shared = self.in_flight.get(key) if key else None
+            if shared is None:
+                future = Future()
+                if key:
+                    self.in_flight[key] = future
+                if self.flusher is None:
+                    self.flusher = threading.Thread(target=self.flush_forever, name="rpc-flusher", daemon=True)
+                    self.flusher.start()
+            else:
+                self.deduplicated += 1
+        if shared is not None:
+            return shared.result(timeout=self.timeout(method))
+        self.throttle(method)
+        request = {"jsonrpc": "2.0", "method": method, "params": params, "id": next(self.ids)}
+        self.pending.put((request, future, key))
+        return future.result(timeout=self.timeout(method))
+
+    def throttle(self, method):
+        if self.limiter:
+            self.limiter.acquire()
+        limiter = self.method_limiters.get(method)
+        if limiter:
+            limiter.acquire()
+
+    def flush_forever(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            self.senders.submit(self.send, batch)
+
+    def send(self, batch):
+        calls = [request for request, _, _ in batch]
+        payload = calls[0] if len(calls) == 1 else calls
+        timeout = max(self.timeout(request["method"]) for request in calls)
+        try:
+            response = self.session.post(
+                self.endpoint_uri,
+                data=self.serde.json_encode(payload, Web3JsonEncoder),
+                headers=self.get_request_headers(),
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            decoded = json.loads(response.content)
+            responses = {item.get("id"): item for item in (decoded if isinstance(decoded, list) else [decoded])}
+            error = None
+        except Exception as e:
+            responses, error = {}, e
+        with self.lock:
+            self.requests += 1
+            self.batches += len(batch) > 1
+            for _, _, key in batch:
+                if key:
+                    self.in_flight.pop(key, None)
+        for request, future, _ in batch:
+            if error is not None:
+                future.set_exception(error)
+                continue
+            future.set_result(responses.get(request["id"]) or {
+                "jsonrpc": "2.0", "id": request["id"],
+                "error": {"code": -32603, "message": "Response missing from JSON-RPC batch"},
+            })
+
+    def stats(self):
+        """
+        Returns:
+            dict: HTTP requests sent, how many were batches, and calls served by an
+            identical in-flight request
+        """
+        return {"requests": self.requests, "batches": self.batches, "deduplicated": self.deduplicated}
@@ -0,0 +1,123 @@
+import gzip
+import json
+import threading
+import time
+
+from eth_utils import to_hex
+from services.batching_http_provider import BatchingHTTPProvider
+from services.swap_output import iter_jsonl_swaps
+
+
+def to_rpc_json(value):
+    """
+    Converts web3-formatted values back to their raw JSON-RPC form: ints become hex
+    quantities and bytes become hex strings, recursively.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, (bytes, bytearray)):
+        return to_hex(value)
+    if isinstance(value, dict):
+        return {key: to_rpc_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_rpc_json(item) for item in value]
+    return value
+
+
+def rpc_key(method, params):
+    """
+    Key under which an RPC response is stored in, and looked up from, a capture log.
+    """
+    return f"{method}:{json.dumps(to_rpc_json(params), sort_keys=True)}"
+
+
+class CaptureLogWriter:
+    """
+    Appends a mempool capture as gzip-compressed JSON lines.
+
+    Every line is one event:
+        {"t": seconds since start, "k": "pending", "h": hash}
+        {"k": "rpc", "m": method, "p": params, "r": raw JSON-RPC result}
+    Fetched pending transactions are stored as eth_getTransactionByHash RPC events,
+    so the replay provider can answer them like any other recorded call.
+    Safe to use from the event loop and from worker threads at the same time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.events = 0
+
+    def write(self, event):
+        line = json.dumps(event, separators=(",", ":"))
+        with self.lock:
+            self.file.write(line + "\n")
+            self.events += 1
+
+    def pending(self, transaction_hash, at=None):
+        offset = time.perf_counter() - self.start if at is None else at
+        self.write({"t": round(offset, 6), "k": "pending", "h": to_rpc_json(transaction_hash)})
+
+    def rpc(self, method, params, result):
+        self.write({"k": "rpc", "m": method, "p": to_rpc_json(params), "r": to_rpc_json(result)})
+
+    def transaction(self, transaction_hash, transaction):
+        self.rpc("eth_getTransactionByHash", [to_rpc_json(transaction_hash)],
+                 dict(transaction) if transaction else None)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+        print(f"📼 Captured {self.events} events to {self.path}")
+
+
+def read_capture_log(path):
+    """
+    Iterates the events of a capture log one line at a time.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def capture_log_from_swaps_dump(dump_path, log_path, interval=0.1):
+    """
+    Converts a swaps dump into a capture log, spacing the pending hashes `interval`
+    seconds apart. Accepts a JSONL output file (as streamed by main.py) or a legacy
+    swaps.json list of transactions.
+
+    Returns:
+        int: Number of transactions converted
+    """
+    if dump_path.endswith(".jsonl"):
+        transactions = [record["transaction"] for record in iter_jsonl_swaps(dump_path)]
+    else:
+        with open(dump_path) as f:
+            transactions = json.load(f)
+    writer = CaptureLogWriter(log_path)
+    for i, transaction in enumerate(transactions):
+        writer.pending(transaction["hash"], at=i * interval)
+        writer.transaction(transaction["hash"], transaction)
+    writer.close()
+    return len(transactions)
+
+
+class RecordingHTTPProvider(BatchingHTTPProvider):
+    """
+    BatchingHTTPProvider that records every request and its result into a CaptureLogWriter.
+    """
+
+    def __init__(self, endpoint_uri, capture_log, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self.capture_log = capture_log
+
+    def make_request(self, method, params):
+        response = super().make_request(method, params)
+        if "result" in response:
+            self.capture_log.rpc(method, params, response["result"])
+        return response
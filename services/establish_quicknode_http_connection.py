@@ -1,18 +1,28 @@
 from config import (
     QUICK_NODE_HTTP_URL,
 )
-from web3 import Web3, HTTPProvider
+from web3 import Web3
+from services.batching_http_provider import BatchingHTTPProvider
+from services.capture_log import RecordingHTTPProvider
 
 
-def establish_quicknode_http_connection():
+def establish_quicknode_http_connection(capture_log=None):
     """
-    Establishes an HTTP connection to the QuickNode endpoint.
+    Establishes an HTTP connection to the QuickNode endpoint. Concurrent calls are
+    coalesced into JSON-RPC batches over a keep-alive connection pool.
+
+    Args:
+        capture_log (CaptureLogWriter, optional): Records every RPC response for offline replay.
+            Defaults to None.
 
     Returns:
         Web3: The Web3 instance connected to QuickNode HTTP endpoint.
         If connection fails, returns the Web3 instance anyway but prints error message.
     """
-    web3_http = Web3(HTTPProvider(QUICK_NODE_HTTP_URL))
+    if capture_log:
+        web3_http = Web3(RecordingHTTPProvider(QUICK_NODE_HTTP_URL, capture_log))
+    else:
+        web3_http = Web3(BatchingHTTPProvider(QUICK_NODE_HTTP_URL))
 
     is_connected = web3_http.is_connected()
 
@@ -4,15 +4,18 @@ from config import (
 from web3 import AsyncWeb3, WebSocketProvider
 
 
-async def establish_quicknode_websocket_connection():
+async def establish_quicknode_websocket_connection(url=QUICK_NODE_WSS_URL):
     """
     Establishes a WebSocket connection to the QuickNode endpoint.
 
+    Args:
+        url (str, optional): WSS endpoint. Defaults to QUICK_NODE_WSS_URL.
+
     Returns:
         AsyncWeb3: The AsyncWeb3 instance connected to QuickNode WebSocket endpoint.
         If connection fails, returns the AsyncWeb3 instance anyway but prints error message.
     """
-    web3_wss: AsyncWeb3 = await AsyncWeb3(WebSocketProvider(QUICK_NODE_WSS_URL))
+    web3_wss: AsyncWeb3 = await AsyncWeb3(WebSocketProvider(url))
 
     is_connected = await web3_wss.is_connected()
 
@@ -1,50 +1,47 @@
-import json
 import os
 
-import requests
+from config import USDC_PEG_USD
+from services.pair_index import pair_registry
+from services.price_feed import price_oracle
 
 
 def get_pool_reserves(web3, pair_address: str):
     """
-    Fetch raw reserves (USDC, WETH) from on-chain UniswapV2Pair.
-    Returns ints (reserve_usdc, reserve_weth).
+    Fetch raw reserves (reserve0, reserve1) of a UniswapV2Pair.
+    Served from the Sync-event reserve mirror when the pair is watched,
+    otherwise read on-chain with getReserves().
     """
-    abi = json.load(open("abi/UniswapV2Pair.json"))["abi"]
-    contract = web3.eth.contract(address=web3.to_checksum_address(pair_address), abi=abi)
-    reserve_usdc, reserve_weth, _ = contract.functions.getReserves().call()
-    return reserve_usdc, reserve_weth
+    return pair_registry.raw_reserves(web3, pair_address)
 
 
 def get_liquidity_and_price(web3,
-                            pair_token):
-    #FACTORY = os.getenv("FACTORY_V2")
-    #factory = web3.eth.contract(FACTORY, abi=json.load(open("abi/UniswapV2Factory.json", "r"))["abi"])
-    #PAIR_POOL = factory.functions.getPair(weth_address, usdc_address).call() this should be used in real env
-    reserve_usdc, reserve_weth = get_pool_reserves(web3, pair_token)
+                            pair_token=None,
+                            oracle=price_oracle,
+                            registry=pair_registry,
+                            usdc_peg=USDC_PEG_USD):
+    """
+    Prices WETH from the reserves of the USDC/WETH pool.
+
+    The USD price of USDC comes from the price oracle. While the feed is stale or
+    unreachable the pool is priced at the `usdc_peg` anchor instead, so a feed outage
+    never stops the analysis.
+
+    Returns:
+        tuple: (reserve_usdc, reserve_weth, usdc_decimals, weth_decimals, price_weth_in_usdc,
+        price_usdc_in_weth, market price of WETH in USD, USD price of USDC)
+    """
     usdc_address = web3.to_checksum_address(os.getenv("USDC_TOKEN"))
-    usdc_decimals = 18
-    weth_decimals = 18
+    weth_address = web3.to_checksum_address(os.getenv("WETH_TOKEN"))
+    reserve_usdc, reserve_weth = registry.reserves(web3, usdc_address, weth_address, pair_token)
+    usdc_decimals = registry.decimals(web3, usdc_address)
+    weth_decimals = registry.decimals(web3, weth_address)
     price_weth_in_usdc = (reserve_usdc / 10 ** usdc_decimals) / (reserve_weth / 10 ** weth_decimals)
     price_usdc_in_weth = (reserve_weth / 10 ** weth_decimals) / (reserve_usdc / 10 ** usdc_decimals)
-    mainnet_price_usdc = float(fetch_token_data(usdc_address)["data"]["attributes"]["price_usd"])
-    print(f"🦄  Total reserve WETH:   {reserve_weth / 10 ** 18:.5f} ")
-    print(f"💵  Total reserve USDC:   {reserve_usdc / 10 ** 18:.5f} ")
+    mainnet_price_usdc = oracle.get_price(usdc_address, fallback=lambda: usdc_peg)
+    print(f"🦄  Total reserve WETH:   {reserve_weth / 10 ** weth_decimals:.5f} ")
+    print(f"💵  Total reserve USDC:   {reserve_usdc / 10 ** usdc_decimals:.5f} ")
     print("\n📈  Price Before Swap")
     print(f"   • 1 WETH  ≃ {price_weth_in_usdc:.5f} USDC")
     print(f"   • 1 USDC  ≃ {price_usdc_in_weth:.5f} WETH")
     print(f"   • Market  ≃ ${price_weth_in_usdc * mainnet_price_usdc:.5f} US")
-    return reserve_usdc, reserve_weth, usdc_decimals, reserve_weth, price_weth_in_usdc, price_usdc_in_weth, price_weth_in_usdc * mainnet_price_usdc, mainnet_price_usdc
-
-
-
-
-def fetch_token_data(usdc_address):
-    GECKOTERMINAL_API = os.getenv("GECKOTERMINAL_API")
-    NETWORK  = os.getenv("NETWORK")
-    url = f'{GECKOTERMINAL_API}/{NETWORK}/tokens/{usdc_address}'
-    headers = {
-        'accept': 'application/json'
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
\ No newline at end of file
+    return reserve_usdc, reserve_weth, usdc_decimals, weth_decimals, price_weth_in_usdc, price_usdc_in_weth, price_weth_in_usdc * mainnet_price_usdc, mainnet_price_usdc
@@ -1,7 +1,8 @@
-import json
 from config import ROUTER_CHECKSUM_ADDRESS
 from web3 import Web3
 
+from services.abi_cache import contract_factory, load_abi
+
 
 def initialize_uniswap_router(web3_instance: Web3):
     """
@@ -13,13 +14,13 @@ def initialize_uniswap_router(web3_instance: Web3):
     """
     router = {
         "address": ROUTER_CHECKSUM_ADDRESS,
-        "abi": json.load(open("abi/UniswapV2Router02.json", "r")),
+        "abi": load_abi("UniswapV2Router02"),
         "contract": None,
     }
 
     try:
-        router["contract"] = web3_instance.eth.contract(
-            address=ROUTER_CHECKSUM_ADDRESS, abi=router["abi"]
+        router["contract"] = contract_factory(web3_instance, "UniswapV2Router02")(
+            address=ROUTER_CHECKSUM_ADDRESS
         )
         print("✅ Successfully initialized Uniswap V2 Router contract")
     except Exception as e:
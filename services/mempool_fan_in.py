@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from services.establish_quicknode_websocket_connection import (
+    establish_quicknode_websocket_connection,
+)
+
+
+class EndpointStats:
+    """
+    Per-endpoint counters of a MempoolFanIn.
+    """
+
+    __slots__ = ("url", "received", "first_seen", "lag_total", "lagged", "failovers", "failover_s", "connected")
+
+    def __init__(self, url):
+        self.url = url
+        self.received = 0
+        self.first_seen = 0
+        self.lag_total = 0.0
+        self.lagged = 0
+        self.failovers = 0
+        self.failover_s = 0.0
+        self.connected = False
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "received": self.received,
+            "first_seen": self.first_seen,
+            "mean_lag_ms": self.lag_total / self.lagged * 1e3 if self.lagged else None,
+            "failovers": self.failovers,
+            "last_failover_ms": self.failover_s * 1e3,
+            "connected": self.connected,
+        }
+
+
+class MempoolFanIn:
+    """
+    Merges the newPendingTransactions streams of several WSS endpoints.
+
+    Every endpoint is followed on its own subscribed connection while a second,
+    already connected standby waits next to it. When the subscription fails the
+    standby only has to subscribe (one round trip) and a new standby is dialled in
+    the background, so failover does not wait for a handshake; the other endpoints
+    keep delivering meanwhile. Hashes are deduped across endpoints and the endpoint
+    that delivered each one first is remembered for the most recent `history` hashes,
+    along with how far behind the others were.
+
+    Args:
+        urls (list): WSS endpoints
+        connect (callable, optional): Coroutine function returning a connected AsyncWeb3
+            for a URL. Defaults to establish_quicknode_websocket_connection.
+        standby (bool, optional): Keep a warm standby connection per endpoint. Defaults to True.
+        history (int, optional): Recent hashes kept with their first-seen endpoint.
+    """
+
+    def __init__(self, urls, connect=establish_quicknode_websocket_connection, standby=True, history=50_000):
+        self.urls = list(urls)
+        self.connect = connect
+        self.standby = standby
+        self.history = history
+        self.endpoints = [EndpointStats(url) for url in self.urls]
+        self.first_seen = OrderedDict()
+        self.subscribed = asyncio.Event()
+
+    def deliver(self, endpoint, transaction_hash, on_hash):
+        now = time.perf_counter()
+        transaction_hash = bytes(transaction_hash)
+        endpoint.received += 1
+        first = self.first_seen.get(transaction_hash)
+        if first is not None:
+            if first[0] is not endpoint:
+                endpoint.lag_total += now - first[1]
+                endpoint.lagged += 1
+            return
+        self.first_seen[transaction_hash] = (endpoint, now)
+        if len(self.first_seen) > self.history:
+            self.first_seen.popitem(last=False)
+        endpoint.first_seen += 1
+        on_hash(transaction_hash)
+
+    async def dial(self, endpoint):
+        backoff = 0.1
+        while True:
+            try:
+                return await self.connect(endpoint.url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Failed to connect to {endpoint.url}:", str(e))
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 5)
+
+    async def close(self, web3_wss):
+        try:
+            await web3_wss.provider.disconnect()
+        except Exception:
+            pass
+
+    async def follow(self, endpoint, on_hash):
+        """
+        Keeps one subscription to `endpoint` alive, failing over to the warm standby.
+        """
+        primary = await self.dial(endpoint)
+        standby = None
+        failed_at = None
+        try:
+            while True:
+                if self.standby and standby is None:
+                    standby = asyncio.create_task(self.dial(endpoint))
+                try:
+                    sub_id = await primary.eth.subscribe("newPendingTransactions")
+                    endpoint.connected = True
+                    self.subscribed.set()
+                    if failed_at is not None:
+                        endpoint.failover_s = time.perf_counter() - failed_at
+                        print(f"🔁 Failed over {endpoint.url} in {endpoint.failover_s * 1e3:.1f} ms")
+                    async for message in primary.socket.process_subscriptions():
+                        if message.get("subscription") == sub_id:
+                            self.deliver(endpoint, message["result"], on_hash)
+                    raise ConnectionError("subscription stream ended")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    failed_at = time.perf_counter()
+                    endpoint.connected = False
+                    endpoint.failovers += 1
+                    print(f"❌ Subscription to {endpoint.url} lost:", str(e))
+                await self.close(primary)
+                if standby is not None:
+                    primary = await standby
+                    standby = None
+                else:
+                    primary = await self.dial(endpoint)
+        finally:
+            await self.close(primary)
+            if standby is not None:
+                standby.cancel()
+                results = await asyncio.gather(standby, return_exceptions=True)
+                if not isinstance(results[0], BaseException):
+                    await self.close(results[0])
+
+    async def run(self, on_hash):
+        """
+        Follows every endpoint until cancelled, calling on_hash once per new pending hash.
+        """
+        await asyncio.gather(*(self.follow(endpoint, on_hash) for endpoint in self.endpoints))
+
+    def stats(self):
+        """
+        Returns:
+            list: Per-endpoint counters, including how many hashes each delivered first
+        """
+        return [endpoint.to_dict() for endpoint in self.endpoints]
@@ -0,0 +1,158 @@
+import threading
+
+from eth_utils import keccak, to_bytes, to_checksum_address
+
+from config import FACTORYV2, PAIR_INIT_CODE_HASH
+from services.abi_cache import load_contract
+from services.pair_reserve_cache import fetch_pool_reserves, reserve_cache
+
+
+def sort_tokens(token_a, token_b):
+    """
+    UniswapV2Library.sortTokens: returns (token0, token1) ordered by address.
+    """
+    if token_a.lower() == token_b.lower():
+        raise ValueError("UniswapV2Library: IDENTICAL_ADDRESSES")
+    if token_a.lower() < token_b.lower():
+        return token_a, token_b
+    return token_b, token_a
+
+
+def compute_pair_address(factory, token_a, token_b, init_code_hash=PAIR_INIT_CODE_HASH):
+    """
+    UniswapV2Library.pairFor: the CREATE2 address of a pair, computed without any RPC.
+
+    Returns:
+        str: Checksummed pair address
+    """
+    token0, token1 = sort_tokens(token_a, token_b)
+    salt = keccak(to_bytes(hexstr=token0) + to_bytes(hexstr=token1))
+    digest = keccak(b"\xff" + to_bytes(hexstr=factory) + salt + to_bytes(hexstr=init_code_hash))
+    return to_checksum_address(digest[12:])
+
+
+class PairRegistry:
+    """
+    Offline index of UniswapV2 pairs and token metadata for the analysis hot path.
+
+    Pair addresses are derived locally with CREATE2 from the factory and the pair
+    init code hash and memoized, so resolving every hop of a swap path costs no RPC.
+    Token decimals are read once per token with decimals() and cached for the
+    lifetime of the process; warm() preloads them off the hot path. Reserves come
+    from the Sync-event mirror and fall back to a getReserves() call for pairs it
+    does not mirror.
+
+    Args:
+        factory (str, optional): UniswapV2Factory address. Defaults to FACTORYV2.
+        init_code_hash (str, optional): keccak256 of the pair creation code.
+            Defaults to PAIR_INIT_CODE_HASH.
+        cache (ReserveCache, optional): Reserve mirror read before any RPC.
+    """
+
+    def __init__(self, factory=FACTORYV2, init_code_hash=PAIR_INIT_CODE_HASH, cache=reserve_cache):
+        self.factory = factory
+        self.init_code_hash = init_code_hash
+        self.cache = cache
+        self.pairs = {}
+        self.token_decimals = {}
+        self.lock = threading.Lock()
+
+    def pair_address(self, token_a, token_b):
+        """
+        Returns:
+            str: Checksummed address of the token_a/token_b pair
+        """
+        key = frozenset((token_a.lower(), token_b.lower()))
+        pair_address = self.pairs.get(key)
+        if pair_address is None:
+            pair_address = compute_pair_address(self.factory, token_a, token_b, self.init_code_hash)
+            self.pairs[key] = pair_address
+        return pair_address
+
+    def register(self, token_a, token_b, pair_address):
+        """
+        Pins the address of a known pair, e.g. a configured pool on a fork whose
+        factory was deployed with a different init code hash.
+        """
+        self.pairs[frozenset((token_a.lower(), token_b.lower()))] = to_checksum_address(pair_address)
+
+    def hops(self, path):
+        """
+        Returns:
+            list: (pair_address, token_in, token_out) for every hop of a swap path
+        """
+        if len(path) < 2:
+            raise ValueError("UniswapV2Library: INVALID_PATH")
+        return [(self.pair_address(path[i], path[i + 1]), path[i], path[i + 1]) for i in range(len(path) - 1)]
+
+    def decimals(self, web3, token):
+        """
+        Returns:
+            int: Decimals of the token, read on-chain the first time only
+        """
+        key = token.lower()
+        decimals = self.token_decimals.get(key)
+        if decimals is None:
+            decimals = load_contract(web3, "UniswapV2ERC20", token).functions.decimals().call()
+            with self.lock:
+                self.token_decimals[key] = decimals
+        return decimals
+
+    def set_decimals(self, token, decimals):
+        with self.lock:
+            self.token_decimals[token.lower()] = decimals
+
+    def warm(self, web3, *tokens):
+        """
+        Loads the decimals of the given tokens so later lookups are served from memory.
+        """
+        for token in tokens:
+            self.decimals(web3, token)
+
+    def raw_reserves(self, web3, pair_address):
+        """
+        Returns:
+            tuple: (reserve0, reserve1) of the pair, from the mirror when it has them
+        """
+        reserves = self.cache.get(pair_address)
+        if reserves is None:
+            reserves = fetch_pool_reserves(web3, pair_address)
+        return reserves
+
+    def reserves(self, web3, token_a, token_b, pair_address=None):
+        """
+        Returns:
+            tuple: (reserve_a, reserve_b) of the token_a/token_b pair
+        """
+        reserve0, reserve1 = self.raw_reserves(web3, pair_address or self.pair_address(token_a, token_b))
+        if token_a.lower() == sort_tokens(token_a, token_b)[0].lower():
+            return reserve0, reserve1
+        return reserve1, reserve0
+
+    def reserves_lookup(self, web3, overrides=None):
+        """
+        Builds a get_reserves callable for core.uniswap_v2_library.get_amounts_out.
+
+        Args:
+            web3: Web3 instance used for pairs the mirror does not hold
+            overrides (dict, optional): {pair_address: (reserve0, reserve1)} used instead
+                of the current reserves, e.g. reserves projected after pending swaps.
+
+        Returns:
+            callable: get_reserves(token_a, token_b) -> (reserve_a, reserve_b)
+        """
+        overrides = {address.lower(): reserves for address, reserves in (overrides or {}).items()}
+
+        def get_reserves(token_a, token_b):
+            pair_address = self.pair_address(token_a, token_b)
+            reserves = overrides.get(pair_address.lower())
+            if reserves is None:
+                return self.reserves(web3, token_a, token_b, pair_address)
+            if token_a.lower() == sort_tokens(token_a, token_b)[0].lower():
+                return reserves
+            return reserves[1], reserves[0]
+
+        return get_reserves
+
+
+pair_registry = PairRegistry()
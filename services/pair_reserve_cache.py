@@ -0,0 +1,142 @@
+import asyncio
+from collections import deque
+
+from services.abi_cache import load_contract
+from services.establish_quicknode_websocket_connection import (
+    establish_quicknode_websocket_connection,
+)
+
+SYNC_EVENT_TOPIC = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+SNAPSHOT_LOG_INDEX = 2**32
+
+def fetch_pool_reserves(web3, pair_address: str, block_identifier="latest"):
+    """
+    Reads (reserve0, reserve1) of a UniswapV2Pair with a getReserves() RPC.
+    """
+    contract = load_contract(web3, "UniswapV2Pair", pair_address)
+    reserve0, reserve1, _ = contract.functions.getReserves().call(block_identifier=block_identifier)
+    return reserve0, reserve1
+
+
+class ReserveCache:
+    """
+    Local mirror of UniswapV2 pair reserves kept current by Sync event logs.
+
+    Each pair holds an immutable (reserve0, reserve1, block_number, log_index) tuple,
+    so worker threads can read it without locking while the event loop updates it.
+    Logs are ordered by (block_number, log_index): replays older than the current
+    state are ignored, and logs flagged as removed by a reorg roll the pair back to
+    the last state before the reorged block and schedule an RPC resync.
+
+    Args:
+        history (int, optional): Number of past states kept per pair for reorg rollbacks.
+    """
+
+    def __init__(self, history=64):
+        self.history = history
+        self.states = {}
+        self.past_states = {}
+        self.watched = set()
+        self.stale = set()
+
+    def watch(self, *pair_addresses):
+        for pair_address in pair_addresses:
+            self.watched.add(pair_address.lower())
+
+    def get(self, pair_address):
+        """
+        Returns:
+            tuple | None: (reserve0, reserve1) of the pair, or None if it is not mirrored
+        """
+        state = self.states.get(pair_address.lower())
+        if state is None:
+            return None
+        return state[0], state[1]
+
+    def block_number(self, pair_address):
+        state = self.states.get(pair_address.lower())
+        return state[2] if state else None
+
+    def set_state(self, pair_address, reserve0, reserve1, block_number, log_index):
+        key = pair_address.lower()
+        state = (reserve0, reserve1, block_number, log_index)
+        self.states[key] = state
+        self.past_states.setdefault(key, deque(maxlen=self.history)).append(state)
+
+    def sync(self, web3_http, pair_addresses=None):
+        """
+        Reconciles pairs against the chain with getReserves() at a pinned block.
+        Logs at or before that block are treated as already applied.
+        """
+        block_number = web3_http.eth.block_number
+        for pair_address in pair_addresses or list(self.watched):
+            reserve0, reserve1 = fetch_pool_reserves(web3_http, pair_address, block_number)
+            self.set_state(pair_address, reserve0, reserve1, block_number, SNAPSHOT_LOG_INDEX)
+            self.stale.discard(pair_address.lower())
+
+    def apply_log(self, log):
+        """
+        Applies a Sync event log to the mirror.
+
+        Returns:
+            bool: True if the pair state changed
+        """
+        key = log["address"].lower()
+        if key not in self.watched:
+            return False
+        position = (log["blockNumber"], log["logIndex"])
+        if log.get("removed"):
+            return self.rollback(key, position)
+        state = self.states.get(key)
+        if state and position <= (state[2], state[3]):
+            return False
+        data = bytes(log["data"])
+        reserve0 = int.from_bytes(data[:32], "big")
+        reserve1 = int.from_bytes(data[32:64], "big")
+        self.set_state(key, reserve0, reserve1, *position)
+        return True
+
+    def rollback(self, key, position):
+        past = self.past_states.get(key)
+        while past and (past[-1][2], past[-1][3]) >= (position[0], 0):
+            past.pop()
+        if past:
+            self.states[key] = past[-1]
+        else:
+            self.states.pop(key, None)
+        self.stale.add(key)
+        return True
+
+    async def run(self, web3_http, connect=establish_quicknode_websocket_connection):
+        """
+        Keeps the mirror current until cancelled, reconnecting with backoff.
+
+        Subscribes to Sync logs of the watched pairs first and reconciles with RPC
+        afterwards, so no event is lost between the snapshot and the subscription.
+        """
+        loop = asyncio.get_running_loop()
+        backoff = 0.5
+        while True:
+            try:
+                async with await connect() as web3_wss:
+                    sub_id = await web3_wss.eth.subscribe(
+                        "logs", {"address": sorted(self.watched), "topics": [SYNC_EVENT_TOPIC]}
+                    )
+                    await loop.run_in_executor(None, self.sync, web3_http)
+                    print(f"✅ Mirroring reserves of {len(self.watched)} pair(s)")
+                    backoff = 0.5
+                    async for message in web3_wss.socket.process_subscriptions():
+                        if message.get("subscription") != sub_id:
+                            continue
+                        self.apply_log(message["result"])
+                        if self.stale:
+                            await loop.run_in_executor(None, self.sync, web3_http, list(self.stale))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("❌ Reserve mirror connection lost:", str(e))
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10)
+
+
+reserve_cache = ReserveCache()
@@ -0,0 +1,338 @@
+import asyncio
+import itertools
+import json
+import re
+
+from eth_utils import to_checksum_address
+from web3._utils.method_formatters import transaction_result_formatter
+from web3.datastructures import AttributeDict
+from websockets.asyncio.client import connect as websocket_connect
+
+from config import (
+    PENDING_RETRY_DELAYS,
+    QUICK_NODE_WSS_URLS,
+    ROUTER_CHECKSUM_ADDRESS,
+    RPC_BATCH_WINDOW,
+    RPC_MAX_BATCH,
+)
+from data.constants import SWAP_SELECTORS
+
+NOTIFICATION = b'"eth_subscription"'
+FULL_RESULT = b'"result":{'
+HASH_RESULT = b'"result":"0x'
+HASH_FIELD = b'"hash":"0x'
+NULL_RESULT = b'"result":null'
+INPUT_FIELD = b'"input":"0x'
+RESPONSE_ID = re.compile(rb'"id":\s*(\d+)')
+
+
+class IngestStats:
+    """
+    Per-endpoint counters of a PendingTransactionStream.
+    """
+
+    __slots__ = (
+        "url", "frames", "bytes", "full", "hashes", "parsed", "matched", "lookups", "batches", "retries",
+        "misses", "connected",
+    )
+
+    def __init__(self, url):
+        self.url = url
+        self.frames = 0
+        self.bytes = 0
+        self.full = 0
+        self.hashes = 0
+        self.parsed = 0
+        self.matched = 0
+        self.lookups = 0
+        self.batches = 0
+        self.retries = 0
+        self.misses = 0
+        self.connected = False
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RawFilter:
+    """
+    Router and selector test on the raw bytes of a JSON-RPC frame.
+
+    Addresses are matched in both lowercase and checksummed hex, and the selector
+    only when "input" appears in compact form; anything the raw test cannot rule
+    out is parsed and checked again with matches(), so it never drops a swap.
+    """
+
+    def __init__(self, router_address, selectors):
+        router = to_checksum_address(router_address)
+        self.router = router.lower()
+        self.needles = (router[2:].lower().encode(), router[2:].encode())
+        self.selectors = {selector.hex() for selector in selectors}
+        self.raw_selectors = {selector.hex().encode() for selector in selectors}
+
+    def may_match(self, frame):
+        return any(needle in frame for needle in self.needles)
+
+    def selector_excluded(self, frame):
+        position = frame.find(INPUT_FIELD)
+        if position < 0:
+            return False
+        start = position + len(INPUT_FIELD)
+        return frame[start:start + 8] not in self.raw_selectors
+
+    def matches(self, transaction):
+        """
+        Returns:
+            bool: True if a raw JSON-RPC transaction calls a swap on the router
+        """
+        to = transaction.get("to")
+        data = transaction.get("input") or transaction.get("data") or ""
+        return bool(to) and to.lower() == self.router and data[2:10].lower() in self.selectors
+
+
+def format_transaction(transaction):
+    """
+    Returns:
+        AttributeDict: A raw JSON-RPC transaction formatted like web3's get_transaction result
+    """
+    return AttributeDict.recursive(transaction_result_formatter(transaction))
+
+
+class RawSubscription:
+    """
+    One connection of a PendingTransactionStream, with its in-flight hash lookups.
+    """
+
+    def __init__(self, stream, connection, stats, on_transaction):
+        self.stream = stream
+        self.connection = connection
+        self.stats = stats
+        self.on_transaction = on_transaction
+        self.ids = itertools.count(1)
+        self.in_flight = {}
+        self.queued = []
+        self.flush_handle = None
+        self.retry_handles = set()
+        self.sends = set()
+        self.closed = False
+
+    def request(self, method, params, request_id=None):
+        return {"jsonrpc": "2.0", "id": request_id or next(self.ids), "method": method, "params": params}
+
+    def send(self, payload):
+        task = asyncio.ensure_future(self.connection.send(json.dumps(payload, separators=(",", ":"))))
+        self.sends.add(task)
+        task.add_done_callback(self.sends.discard)
+
+    async def subscribe(self, full):
+        params = ["newPendingTransactions", True] if full else ["newPendingTransactions"]
+        await self.connection.send(json.dumps(self.request("eth_subscribe", params)))
+        while True:
+            frame = await self.connection.recv(decode=False)
+            if NOTIFICATION not in frame:
+                response = json.loads(frame)
+                if "error" in response:
+                    raise ValueError(response["error"].get("message", response["error"]))
+                return response["result"]
+
+    def handle(self, frame):
+        stats = self.stats
+        stats.frames += 1
+        stats.bytes += len(frame)
+        if frame.lstrip()[:1] == b"[":
+            self.handle_batch(frame)
+        elif NOTIFICATION not in frame:
+            return
+        elif FULL_RESULT in frame:
+            stats.full += 1
+            position = frame.find(HASH_FIELD)
+            if position >= 0:
+                start = position + len(HASH_FIELD)
+                if not self.stream.first_sighting(bytes.fromhex(frame[start:start + 64].decode())):
+                    return
+            if self.stream.filter.may_match(frame) and not self.stream.filter.selector_excluded(frame):
+                stats.parsed += 1
+                self.deliver(json.loads(frame)["params"]["result"], deduplicated=position >= 0)
+        elif HASH_RESULT in frame:
+            start = frame.rfind(HASH_RESULT) + len(HASH_RESULT)
+            self.announce(bytes.fromhex(frame[start:start + 64].decode()))
+        else:
+            stats.parsed += 1
+            result = json.loads(frame)["params"]["result"]
+            if isinstance(result, dict):
+                stats.full += 1
+                self.deliver(result)
+            else:
+                self.announce(bytes.fromhex(result[2:]))
+
+    def announce(self, transaction_hash):
+        self.stats.hashes += 1
+        if self.stream.first_sighting(transaction_hash):
+            self.lookup(transaction_hash)
+
+    def deliver(self, transaction, deduplicated=False):
+        if not self.stream.filter.matches(transaction):
+            return
+        if not deduplicated and not self.stream.first_sighting(bytes.fromhex(transaction["hash"][2:])):
+            return
+        self.stats.matched += 1
+        self.on_transaction(format_transaction(transaction))
+
+    def lookup(self, transaction_hash, attempt=0):
+        if self.closed:
+            return
+        self.queued.append((transaction_hash, attempt))
+        if len(self.queued) >= self.stream.max_batch:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.stream.batch_window, self.flush)
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.closed or not self.queued:
+            return
+        batch = []
+        for transaction_hash, attempt in self.queued:
+            request_id = next(self.ids)
+            self.in_flight[request_id] = (transaction_hash, attempt)
+            batch.append(self.request("eth_getTransactionByHash", ["0x" + transaction_hash.hex()], request_id))
+        self.queued = []
+        self.stats.lookups += len(batch)
+        self.stats.batches += 1
+        self.send(batch)
+
+    def handle_batch(self, frame):
+        if not self.stream.filter.may_match(frame) and NULL_RESULT not in frame:
+            for request_id in RESPONSE_ID.findall(frame):
+                self.in_flight.pop(int(request_id), None)
+            return
+        self.stats.parsed += 1
+        for response in json.loads(frame):
+            transaction_hash, attempt = self.in_flight.pop(response.get("id"), (None, 0))
+            if transaction_hash is None:
+                continue
+            transaction = response.get("result")
+            if transaction is None:
+                self.retry(transaction_hash, attempt)
+            elif self.stream.filter.matches(transaction):
+                self.stats.matched += 1
+                self.on_transaction(format_transaction(transaction))
+
+    def retry(self, transaction_hash, attempt):
+        """
+        Looks a hash the node did not know yet up again after the next retry delay,
+        in a later batch, without holding up anything meanwhile.
+        """
+        delays = self.stream.retry_delays
+        if attempt >= len(delays):
+            self.stats.misses += 1
+            return
+        self.stats.retries += 1
+
+        def fire():
+            self.retry_handles.discard(handle)
+            self.lookup(transaction_hash, attempt + 1)
+
+        handle = asyncio.get_running_loop().call_later(delays[attempt], fire)
+        self.retry_handles.add(handle)
+
+    def close(self):
+        self.closed = True
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        for handle in self.retry_handles:
+            handle.cancel()
+        for task in self.sends:
+            task.cancel()
+
+
+class PendingTransactionStream:
+    """
+    Pending router swaps read straight off raw WebSockets, filtered before parsing.
+
+    Each endpoint is asked for full transactions (newPendingTransactions with
+    `true`). Every notification frame is tested for the router address and a swap
+    selector as raw bytes, and only frames that pass are JSON-decoded and formatted
+    like web3's get_transaction result. Endpoints that only announce hashes, or that
+    reject the flag, fall back to eth_getTransactionByHash lookups batched over
+    `batch_window`. Batch responses are filtered the same way, and hashes the
+    node does not know yet are looked up again after each of `retry_delays` with
+    call_later, so no task sleeps on them. Every hash, announced alone or inside a
+    full transaction, is deduplicated across endpoints through `seen_hashes` before
+    any lookup or parse. Endpoints reconnect with backoff, without a warm standby.
+
+    Args:
+        urls (list, optional): WSS endpoints. Defaults to QUICK_NODE_WSS_URLS.
+        router_address (str, optional): Defaults to ROUTER_CHECKSUM_ADDRESS.
+        selectors (iterable, optional): 4-byte swap selectors. Defaults to SWAP_SELECTORS.
+        full (bool, optional): Ask for full transactions first. Defaults to True.
+        seen_hashes (SeenHashes, optional): Shared dedup set; anything with add(hash) -> bool.
+        batch_window (float, optional): Seconds hashes are collected into one lookup batch.
+        max_batch (int, optional): Largest lookup batch.
+        retry_delays (tuple, optional): Seconds before each new lookup of an unknown hash.
+        connect (callable, optional): Returns a websockets connection for a URL.
+    """
+
+    def __init__(self, urls=QUICK_NODE_WSS_URLS, router_address=ROUTER_CHECKSUM_ADDRESS,
+                 selectors=SWAP_SELECTORS, full=True, seen_hashes=None, batch_window=RPC_BATCH_WINDOW,
+                 max_batch=RPC_MAX_BATCH, retry_delays=PENDING_RETRY_DELAYS, connect=websocket_connect):
+        self.urls = list(urls)
+        self.filter = RawFilter(router_address, selectors)
+        self.full = full
+        self.seen_hashes = seen_hashes
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.retry_delays = tuple(retry_delays)
+        self.connect = connect
+        self.endpoints = [IngestStats(url) for url in self.urls]
+        self.subscribed = asyncio.Event()
+
+    def first_sighting(self, transaction_hash):
+        return self.seen_hashes is None or self.seen_hashes.add(transaction_hash)
+
+    async def follow(self, stats, on_transaction):
+        backoff = 0.1
+        while True:
+            subscription = None
+            try:
+                async with self.connect(stats.url, max_size=None) as connection:
+                    subscription = RawSubscription(self, connection, stats, on_transaction)
+                    try:
+                        await subscription.subscribe(self.full)
+                    except ValueError as e:
+                        if not self.full:
+                            raise
+                        print(f"⚠️  {stats.url} rejected full pending transactions ({e}), looking up hashes")
+                        await subscription.subscribe(False)
+                    stats.connected = True
+                    self.subscribed.set()
+                    backoff = 0.1
+                    while True:
+                        subscription.handle(await connection.recv(decode=False))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Pending transaction stream from {stats.url} lost:", str(e))
+            finally:
+                stats.connected = False
+                if subscription is not None:
+                    subscription.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 5)
+
+    async def run(self, on_transaction):
+        """
+        Follows every endpoint until cancelled, calling on_transaction with each new
+        pending router swap as a web3-formatted AttributeDict.
+        """
+        await asyncio.gather(*(self.follow(stats, on_transaction) for stats in self.endpoints))
+
+    def stats(self):
+        """
+        Returns:
+            list: Per-endpoint counters: frames and bytes received, full and hash-only
+            notifications, frames parsed, swaps matched, hash lookups, batches, retries, misses
+        """
+        return [stats.to_dict() for stats in self.endpoints]
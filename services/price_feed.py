@@ -0,0 +1,167 @@
+import asyncio
+import os
+import time
+
+import aiohttp
+import requests
+
+from config import (
+    PRICE_HTTP_POOL_SIZE,
+    PRICE_HTTP_TIMEOUT,
+    PRICE_MAX_STALENESS,
+    PRICE_REFRESH_INTERVAL,
+    PRICE_RETRY_BACKOFF,
+    PRICE_TTL,
+)
+
+http_session = requests.Session()
+
+
+def token_data_url(token_address, api=None, network=None):
+    api = api or os.getenv("GECKOTERMINAL_API")
+    network = network or os.getenv("NETWORK")
+    return f"{api}/{network}/tokens/{token_address}"
+
+
+def fetch_token_data(token_address, timeout=PRICE_HTTP_TIMEOUT, api=None):
+    """
+    Blocking GeckoTerminal token lookup over a shared keep-alive session.
+    """
+    response = http_session.get(
+        token_data_url(token_address, api), headers={"accept": "application/json"}, timeout=timeout
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+class PriceOracle:
+    """
+    USD price cache refreshed in the background from GeckoTerminal.
+
+    Prices younger than `ttl` are served as is. Once stale, the caller's on-chain
+    fallback is preferred, then the cached price as long as it is younger than
+    `max_staleness`. The fallback must not read this oracle, or it goes stale
+    together with the feed; derive it from pool reserves and a fixed anchor such as
+    a stablecoin peg instead. Without a running refresh loop (start() not called) a stale
+    token is refreshed inline once, so the oracle still caches for synchronous callers.
+    A failed inline refresh is not retried for `retry_backoff` seconds; meanwhile
+    callers get the fallback or the cached price without touching the network.
+
+    Args:
+        tokens (iterable, optional): Token addresses to keep refreshed.
+        ttl (float, optional): Seconds a price is considered fresh.
+        max_staleness (float, optional): Seconds after which a price is never served.
+        refresh_interval (float, optional): Seconds between background refreshes.
+        pool_size (int, optional): Connections kept in the aiohttp pool.
+        timeout (float, optional): Total timeout of one HTTP request in seconds.
+        api (str, optional): GeckoTerminal base URL. Read from GECKOTERMINAL_API when None.
+        retry_backoff (float, optional): Seconds before a failed inline refresh is retried.
+    """
+
+    def __init__(self, tokens=(), ttl=PRICE_TTL, max_staleness=PRICE_MAX_STALENESS,
+                 refresh_interval=PRICE_REFRESH_INTERVAL, pool_size=PRICE_HTTP_POOL_SIZE,
+                 timeout=PRICE_HTTP_TIMEOUT, api=None, retry_backoff=PRICE_RETRY_BACKOFF):
+        self.tokens = {token.lower() for token in tokens}
+        self.ttl = ttl
+        self.max_staleness = max_staleness
+        self.refresh_interval = refresh_interval
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.api = api
+        self.retry_backoff = retry_backoff
+        self.prices = {}
+        self.retry_at = {}
+        self.failures = 0
+        self.session = None
+        self.task = None
+
+    def track(self, *tokens):
+        for token in tokens:
+            self.tokens.add(token.lower())
+
+    def store(self, token, price):
+        self.prices[token.lower()] = (price, time.monotonic())
+
+    def age(self, token):
+        entry = self.prices.get(token.lower())
+        return time.monotonic() - entry[1] if entry else None
+
+    def last_price(self, token):
+        """
+        Returns the last fetched price within max_staleness, ignoring the TTL.
+        """
+        entry = self.prices.get(token.lower())
+        if entry is None or time.monotonic() - entry[1] > self.max_staleness:
+            raise LookupError(f"No price for {token} in the last {self.max_staleness}s")
+        return entry[0]
+
+    def get_price(self, token, fallback=None):
+        """
+        Returns the USD price of `token` without waiting on the network when the
+        background refresh is running.
+
+        Args:
+            token (str): Token address
+            fallback (callable, optional): Returns a price derived without the feed (e.g. a
+                pool ratio times a pegged anchor), used when the feed is stale or unreachable.
+
+        Returns:
+            float: USD price
+        """
+        self.track(token)
+        entry = self.prices.get(token.lower())
+        if entry and time.monotonic() - entry[1] <= self.ttl:
+            return entry[0]
+        if self.task is None and time.monotonic() >= self.retry_at.get(token.lower(), 0):
+            try:
+                price = float(fetch_token_data(token, self.timeout, self.api)["data"]["attributes"]["price_usd"])
+                self.store(token, price)
+                return price
+            except Exception:
+                self.failures += 1
+                self.retry_at[token.lower()] = time.monotonic() + self.retry_backoff
+        if fallback:
+            try:
+                return fallback()
+            except Exception:
+                pass
+        return self.last_price(token)
+
+    async def start(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"accept": "application/json"},
+        )
+        await self.refresh_all()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def refresh(self, token):
+        try:
+            async with self.session.get(token_data_url(token, self.api)) as response:
+                response.raise_for_status()
+                data = await response.json()
+            self.store(token, float(data["data"]["attributes"]["price_usd"]))
+        except Exception as e:
+            self.failures += 1
+            print(f"❌ Price refresh failed for {token}:", str(e))
+
+    async def refresh_all(self):
+        await asyncio.gather(*(self.refresh(token) for token in list(self.tokens)))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_all()
+
+
+price_oracle = PriceOracle()
@@ -0,0 +1,282 @@
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from websockets.asyncio.server import serve
+from web3.providers import BaseProvider
+from web3.providers.async_base import AsyncBaseProvider
+
+from services.capture_log import rpc_key
+
+GET_RESERVES_SELECTOR = "0x0902f1ac"
+DECIMALS_SELECTOR = "0x313ce567"
+
+
+class ReplayState:
+    """
+    Answers JSON-RPC requests from the events of a capture log.
+
+    Exact (method, params) matches are served first. Requests that were not recorded
+    fall back to sensible stand-ins so logs built from swaps.json dumps replay too:
+    transactions by hash, eth_call by (to, data) at any block, getReserves from the
+    given reserves, 18 for decimals(), and receipts synthesized from the transaction.
+
+    Args:
+        events (iterable): Events from read_capture_log
+        reserves (tuple, optional): (reserve0, reserve1) answered to unrecorded getReserves calls.
+    """
+
+    def __init__(self, events, reserves=None):
+        self.reserves = reserves
+        self.responses = {}
+        self.transactions = {}
+        self.calls = {}
+        for event in events:
+            if event["k"] != "rpc":
+                continue
+            method, params, result = event["m"], event["p"], event["r"]
+            self.responses[rpc_key(method, params)] = result
+            if method == "eth_getTransactionByHash" and result:
+                self.transactions[params[0].lower()] = result
+            elif method == "eth_call":
+                self.calls[(params[0]["to"].lower(), params[0].get("data", params[0].get("input")))] = result
+
+    def answer(self, method, params):
+        key = rpc_key(method, params)
+        if key in self.responses:
+            return self.responses[key]
+        if method == "eth_getTransactionByHash":
+            return self.transactions.get(str(params[0]).lower())
+        if method == "eth_getTransactionReceipt":
+            return self.receipt(str(params[0]).lower())
+        if method == "eth_call":
+            call = params[0]
+            data = call.get("data", call.get("input"))
+            result = self.calls.get((call["to"].lower(), data))
+            if result is None and data == GET_RESERVES_SELECTOR and self.reserves:
+                words = (*self.reserves, int(time.time()))
+                result = "0x" + "".join(f"{word:064x}" for word in words)
+            if result is None and data == DECIMALS_SELECTOR:
+                result = f"0x{18:064x}"
+            return result
+        if method == "eth_getBalance":
+            return "0x0"
+        if method == "eth_blockNumber":
+            return "0x1"
+        if method == "eth_chainId":
+            return "0xaa36a7"
+        if method in ("web3_clientVersion", "net_version"):
+            return "replay"
+        raise KeyError(f"{method} was not recorded")
+
+    def receipt(self, transaction_hash):
+        transaction = self.transactions.get(transaction_hash)
+        if transaction is None:
+            return None
+        return {
+            "transactionHash": transaction["hash"],
+            "transactionIndex": transaction.get("transactionIndex") or "0x0",
+            "blockHash": transaction.get("blockHash") or "0x" + "00" * 32,
+            "blockNumber": transaction.get("blockNumber") or "0x1",
+            "from": transaction["from"],
+            "to": transaction["to"],
+            "status": "0x1",
+            "gasUsed": transaction["gas"],
+            "cumulativeGasUsed": transaction["gas"],
+            "effectiveGasPrice": transaction.get("gasPrice") or transaction["maxFeePerGas"],
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "type": transaction.get("type", "0x2"),
+        }
+
+    def response(self, method, params):
+        try:
+            return {"jsonrpc": "2.0", "id": 0, "result": self.answer(method, params)}
+        except KeyError as e:
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32601, "message": str(e)}}
+
+
+class ReplayProvider(BaseProvider):
+    """
+    Synchronous stand-in node for Web3, answering from a ReplayState.
+
+    Args:
+        state (ReplayState): Recorded responses
+        latency (float, optional): Seconds to wait per request, to mimic a node round trip.
+    """
+
+    def __init__(self, state, latency=0.0):
+        super().__init__()
+        self.state = state
+        self.latency = latency
+
+    def make_request(self, method, params):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.state.response(method, params)
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+
+class AsyncReplayProvider(AsyncBaseProvider):
+    """
+    Asynchronous stand-in node for AsyncWeb3, answering from a ReplayState.
+    """
+
+    def __init__(self, state, latency=0.0):
+        super().__init__()
+        self.state = state
+        self.latency = latency
+
+    async def make_request(self, method, params):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.state.response(method, params)
+
+    async def is_connected(self, show_traceback=False):
+        return True
+
+
+def serve_price_stub(price_usd=1.0, host="127.0.0.1", port=0):
+    """
+    Starts a local stand-in for the GeckoTerminal token endpoint on a daemon thread.
+    Set server.price_usd to change the served price and server.status to an error
+    code (e.g. 503) to simulate an outage.
+
+    Returns:
+        tuple: (server, base_url) — use base_url as a PriceOracle api and call
+        server.shutdown() when done
+    """
+
+    class PriceHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({"data": {"attributes": {"price_usd": str(server.price_usd)}}}).encode()
+            self.send_response(server.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), PriceHandler)
+    server.price_usd = price_usd
+    server.status = 200
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v2/networks"
+
+
+class FakeMempoolNode:
+    """
+    Local WSS stand-in that streams newPendingTransactions notifications.
+
+    Answers eth_subscribe / eth_unsubscribe, eth_getTransactionByHash (alone or in
+    batches) and any other call with null, and pushes every published hash to each
+    subscriber after `latency` seconds, skipping a `loss` fraction of them the way a
+    real node misses part of the mempool. With `full_transactions`, subscriptions
+    made with `true` receive the whole transaction instead of its hash. A published
+    transaction can only be looked up `propagation` seconds after it was announced.
+    kill_connections() drops every subscribed client to exercise failover, and
+    bytes_sent / bytes_received count the JSON-RPC traffic.
+
+    Args:
+        latency (float, optional): Seconds between publish and delivery.
+        loss (float, optional): Fraction of published hashes never delivered.
+        seed (int, optional): Seed of the loss sampling.
+        full_transactions (bool, optional): Honour full-transaction subscriptions.
+        propagation (float, optional): Seconds before a published transaction is known
+            to eth_getTransactionByHash.
+    """
+
+    def __init__(self, latency=0.0, loss=0.0, seed=0, full_transactions=False, propagation=0.0):
+        self.latency = latency
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.full_transactions = full_transactions
+        self.propagation = propagation
+        self.subscribers = {}
+        self.transactions = {}
+        self.known_at = {}
+        self.ids = itertools.count(1)
+        self.server = None
+        self.url = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await serve(self.handle, host, port, max_size=None)
+        self.url = f"ws://{host}:{self.server.sockets[0].getsockname()[1]}"
+        return self.url
+
+    def answer(self, connection, request):
+        result = None
+        if request["method"] == "eth_subscribe":
+            full = self.full_transactions and len(request["params"]) > 1 and request["params"][1] is True
+            result = hex(next(self.ids))
+            self.subscribers[connection] = (result, full)
+        elif request["method"] == "eth_unsubscribe":
+            result = self.subscribers.pop(connection, None) is not None
+        elif request["method"] == "eth_chainId":
+            result = "0xaa36a7"
+        elif request["method"] == "eth_getTransactionByHash":
+            transaction_hash = request["params"][0]
+            if self.known_at.get(transaction_hash, float("inf")) <= time.perf_counter():
+                result = self.transactions[transaction_hash]
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handle(self, connection):
+        try:
+            async for raw in connection:
+                self.bytes_received += len(raw)
+                request = json.loads(raw)
+                if isinstance(request, list):
+                    response = [self.answer(connection, item) for item in request]
+                else:
+                    response = self.answer(connection, request)
+                await self.send(connection, json.dumps(response, separators=(",", ":")))
+        except Exception:
+            pass
+        finally:
+            self.subscribers.pop(connection, None)
+
+    def publish(self, transaction_hash, transaction=None):
+        """
+        Announces a pending hash (0x-prefixed hex) to every subscriber, along with its
+        raw JSON-RPC transaction when given.
+        """
+        if transaction is not None:
+            self.transactions[transaction_hash] = transaction
+            self.known_at[transaction_hash] = time.perf_counter() + self.propagation
+        if self.rng.random() < self.loss:
+            return
+        asyncio.get_running_loop().call_later(self.latency, self.push, transaction_hash)
+
+    def push(self, transaction_hash):
+        for connection, (sub_id, full) in list(self.subscribers.items()):
+            result = self.transactions.get(transaction_hash, transaction_hash) if full else transaction_hash
+            message = {"jsonrpc": "2.0", "method": "eth_subscription",
+                       "params": {"subscription": sub_id, "result": result}}
+            asyncio.ensure_future(self.send(connection, json.dumps(message, separators=(",", ":"))))
+
+    async def send(self, connection, message):
+        try:
+            self.bytes_sent += len(message)
+            await connection.send(message)
+        except Exception:
+            pass
+
+    def kill_connections(self):
+        for connection in list(self.subscribers):
+            connection.transport.abort()
+        self.subscribers.clear()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
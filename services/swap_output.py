@@ -0,0 +1,227 @@
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Mapping
+
+import numpy as np
+from eth_utils import to_hex
+
+from utils import get_transaction_gas_price
+
+COLUMNAR_MAGIC = b"SWAPCOL1"
+COLUMNAR_HEADER_SIZE = 16
+SWAP_RECORD_DTYPE = np.dtype([
+    ("hash", "S32"),
+    ("sender", "S20"),
+    ("selector", "S4"),
+    ("nonce", "<u8"),
+    ("gas_price", "<u8"),
+    ("seen_at", "<f8"),
+    ("value", "<f8"),
+    ("amount_out", "<f8"),
+    ("price_impact", "<f8"),
+    ("max_mev_input", "<f8"),
+    ("profit", "<f8"),
+])
+
+
+def json_default(value):
+    if isinstance(value, Mapping):
+        return dict(value)
+    return to_hex(value)
+
+
+class RotatingSwapWriter:
+    """
+    Base of the streaming swap writers: buffers encoded records, flushes them every
+    `flush_records` records or once the oldest is `flush_seconds` old, and rotates to a new file
+    once the current one exceeds `max_bytes` or is older than `max_seconds`.
+    Files are named <directory>/<prefix>-<YYYYmmdd-HHMMSS>-<index>.<extension>.
+
+    write() only queues the swap, so it is cheap to call from the event loop:
+    encoding, file I/O and rotation run on a writer thread started with the writer,
+    which flushes a partial buffer on time even when no further swap arrives.
+    close() drains the queue and stops the thread. A swap that fails to encode or
+    write is logged and counted in `failed`; the thread keeps draining the queue and
+    reopens a file on the next flush.
+    """
+
+    extension = None
+
+    def __init__(self, directory="output", prefix="swaps", max_bytes=64 << 20, max_seconds=3600,
+                 flush_records=16, flush_seconds=1.0):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+        self.buffer = []
+        self.file = None
+        self.path = None
+        self.index = 0
+        self.written = 0
+        self.failed = 0
+        self.opened_at = 0.0
+        self.buffered_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name=f"{prefix}-{self.extension}-writer", daemon=True)
+        self.thread.start()
+
+    def open(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(self.directory, f"{self.prefix}-{stamp}-{self.index:04d}.{self.extension}")
+        self.index += 1
+        self.file = open(self.path, "ab")
+        self.opened_at = time.monotonic()
+        self.start_file()
+
+    def start_file(self):
+        pass
+
+    def encode(self, transaction, result, seen_at):
+        raise NotImplementedError
+
+    def write(self, transaction, result=None):
+        self.written += 1
+        self.queue.put((transaction, result, time.time()))
+
+    def run(self):
+        while True:
+            timeout = None
+            if self.buffer:
+                timeout = max(self.buffered_at + self.flush_seconds - time.monotonic(), 0)
+            try:
+                record = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self.flush()
+                continue
+            if record is None:
+                break
+            if not self.buffer:
+                self.buffered_at = time.monotonic()
+            try:
+                self.buffer.append(self.encode(*record))
+            except Exception as e:
+                self.failed += 1
+                print("❌ Error encoding swap for output:", str(e))
+            if len(self.buffer) >= self.flush_records:
+                self.flush()
+        self.flush()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def flush(self):
+        if not self.buffer:
+            return
+        try:
+            if self.file is None or (
+                self.file.tell() >= self.max_bytes or time.monotonic() - self.opened_at >= self.max_seconds
+            ):
+                self.rotate()
+            self.file.write(b"".join(self.buffer))
+            self.file.flush()
+        except Exception as e:
+            self.failed += len(self.buffer)
+            print(f"❌ Error writing {len(self.buffer)} swaps to {self.path}:", str(e))
+            self.discard_file()
+        self.buffer.clear()
+
+    def discard_file(self):
+        if self.file:
+            try:
+                self.file.close()
+            except Exception:
+                pass
+            self.file = None
+
+    def rotate(self):
+        if self.file:
+            self.file.close()
+        self.open()
+
+    def close(self):
+        """
+        Writes every queued swap, closes the file and stops the writer thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+
+class JsonlSwapWriter(RotatingSwapWriter):
+    """
+    Append-only JSON lines: {"transaction": {...}, "simulation": {...}} per swap.
+    """
+
+    extension = "jsonl"
+
+    def encode(self, transaction, result, seen_at):
+        record = {"transaction": dict(transaction), "simulation": result}
+        return (json.dumps(record, default=json_default, separators=(",", ":")) + "\n").encode()
+
+
+class ColumnarSwapWriter(RotatingSwapWriter):
+    """
+    Fixed-width binary records (SWAP_RECORD_DTYPE) after a 16-byte header, so capture
+    files can be memory-mapped as NumPy structured arrays for analytics.
+    """
+
+    extension = "swapbin"
+
+    def start_file(self):
+        if self.file.tell() == 0:
+            self.file.write(COLUMNAR_MAGIC.ljust(COLUMNAR_HEADER_SIZE, b"\0"))
+
+    def encode(self, transaction, result, seen_at):
+        result = result or {}
+        record = np.zeros(1, dtype=SWAP_RECORD_DTYPE)
+        record["hash"] = bytes(transaction["hash"])
+        record["sender"] = bytes.fromhex(transaction["from"][2:])
+        record["selector"] = bytes(transaction["input"][:4])
+        record["nonce"] = transaction["nonce"]
+        record["gas_price"] = get_transaction_gas_price(transaction)
+        record["seen_at"] = seen_at
+        record["value"] = transaction["value"]
+        for column in ("amount_out", "price_impact", "max_mev_input", "profit"):
+            record[column] = result.get(column, np.nan)
+        return record.tobytes()
+
+
+SWAP_WRITERS = {"jsonl": JsonlSwapWriter, "columnar": ColumnarSwapWriter}
+
+
+def capture_files(directory="output", prefix="swaps", extension="jsonl"):
+    """
+    Returns the capture files of one writer, oldest first.
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*.{extension}")))
+
+
+def iter_jsonl_swaps(path):
+    """
+    Iterates the records of a JSONL capture file one line at a time.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def open_columnar_swaps(path):
+    """
+    Memory-maps a columnar capture file as a read-only NumPy structured array.
+    A record cut short by a crash at the end of the file is ignored.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar swap capture")
+    count = (os.path.getsize(path) - COLUMNAR_HEADER_SIZE) // SWAP_RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=SWAP_RECORD_DTYPE)
+    return np.memmap(path, dtype=SWAP_RECORD_DTYPE, mode="r", offset=COLUMNAR_HEADER_SIZE, shape=(count,))
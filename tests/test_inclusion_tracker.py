@@ -0,0 +1,43 @@
+"""
+A block that fails to fetch is fetched again on the next head instead of being skipped.
+"""
+import asyncio
+
+from core.inclusion_tracker import MINED, InclusionTracker
+
+SENDER = "0x" + "33" * 20
+TRANSACTION = {"hash": b"\x01" * 32, "from": SENDER, "nonce": 0}
+
+
+class FlakyChain:
+    def __init__(self, blocks, failures):
+        self.eth = self
+        self.blocks = blocks
+        self.failures = failures
+
+    async def get_block(self, number, full_transactions=False):
+        if self.failures.get(number):
+            self.failures[number] -= 1
+            raise TimeoutError("upstream timeout")
+        return {"number": number, "transactions": self.blocks.get(number, [])}
+
+    async def get_block_receipts(self, number):
+        return [{"transactionHash": tx["hash"], "status": 1} for tx in self.blocks.get(number, [])]
+
+
+def test_failed_block_is_refetched():
+    async def run():
+        tracker = InclusionTracker(FlakyChain({11: [TRANSACTION]}, {11: 1}), max_blocks=1)
+        await tracker.process(10)
+        inclusion = tracker.watch(TRANSACTION)
+        heads = []
+        tracker.listeners.append(lambda number, nonces: heads.append(number))
+        await tracker.process(11)
+        await tracker.process(12)
+        await tracker.process(13)
+        return await inclusion, heads, tracker.block_number
+
+    inclusion, heads, block_number = asyncio.run(run())
+    assert (inclusion.status, inclusion.block_number) == (MINED, 11)
+    assert heads == [11, 12, 13]
+    assert block_number == 13
@@ -0,0 +1,164 @@
+"""
+Pending swap projections: token order, builder ordering, exact-output swaps, mined
+swaps and projecting before inclusion.
+"""
+from types import SimpleNamespace
+
+from core.pending_state import PendingState
+from core.slippage import project_reserves
+from core.uniswap_v2_library import get_amount_in, get_amount_out
+
+PAIR = "0x" + "ab" * 20
+TOKEN_A = "0x" + "22" * 20
+TOKEN_B = "0x" + "11" * 20
+SENDER = "0x" + "33" * 20
+
+
+def swap(i, token_in=TOKEN_B, token_out=TOKEN_A, amount_in=10 ** 18, sender=SENDER, nonce=None):
+    transaction = {
+        "hash": bytes([i]) * 32, "from": sender, "nonce": i if nonce is None else nonce,
+        "gasPrice": (100 - i) * 10 ** 9, "value": 0,
+    }
+    return transaction, {"amountIn": amount_in, "path": [token_in, token_out]}
+
+
+def dynamic_fee(transaction, max_fee_gwei, tip_gwei):
+    transaction = dict(transaction, maxFeePerGas=max_fee_gwei * 10 ** 9, maxPriorityFeePerGas=tip_gwei * 10 ** 9)
+    del transaction["gasPrice"]
+    return transaction
+
+
+def order(pending):
+    return [swap.hash[0] for swap in pending.pools[PAIR.lower()].swaps]
+
+
+def pending_state(*swaps, base_fee=None):
+    pending = PendingState(base_fee)
+    pending.watch(PAIR, TOKEN_A, TOKEN_B)
+    for transaction, params in swaps:
+        assert pending.add_transaction(transaction, params) == PAIR.lower()
+    return pending
+
+
+class StubRegistry:
+    def __init__(self, reserves):
+        self.reserves = reserves
+        self.reads = 0
+
+    def pair_address(self, token_a, token_b):
+        return PAIR.lower()
+
+    def raw_reserves(self, web3, pair_address):
+        self.reads += 1
+        return self.reserves
+
+
+def test_watch_sorts_tokens_like_the_pair():
+    first, second = pending_state(), PendingState()
+    second.watch(PAIR, TOKEN_B, TOKEN_A)
+    assert first.tokens == second.tokens == {PAIR.lower(): TOKEN_B}
+
+
+def test_swap_of_token0_raises_reserve0():
+    pending = pending_state(swap(1), swap(2))
+    (reserve0, reserve1), ahead = pending.reserves_before(bytes([2]) * 32, 10 ** 21, 10 ** 21)
+    assert ahead == 1
+    assert reserve0 > 10 ** 21 > reserve1
+
+
+def test_orders_by_effective_priority_fee():
+    base_fee = SimpleNamespace(next_base_fee=40 * 10 ** 9)
+    high_cap, transaction = swap(1, sender="0x" + "44" * 20)
+    high_cap = (dynamic_fee(high_cap, 200, 1), transaction)
+    high_tip, transaction = swap(2)
+    high_tip = (dynamic_fee(high_tip, 50, 5), transaction)
+    assert order(pending_state(high_cap, high_tip, base_fee=base_fee)) == [2, 1]
+
+
+def test_sender_nonces_stay_in_order():
+    other = "0x" + "44" * 20
+    first = (dynamic_fee(swap(1, nonce=0)[0], 100, 1), swap(1)[1])
+    second = (dynamic_fee(swap(2, nonce=1)[0], 100, 10), swap(2)[1])
+    middle = (dynamic_fee(swap(3, sender=other, nonce=0)[0], 100, 5), swap(3)[1])
+    assert order(pending_state(second, middle, first)) == [3, 1, 2]
+    pending = pending_state(first, second, middle)
+    assert order(pending) == [3, 1, 2]
+    pending.remove(bytes([1]) * 32)
+    assert order(pending) == [2, 3]
+
+
+def test_new_head_reranks_for_the_next_base_fee():
+    base_fee = SimpleNamespace(next_base_fee=10 * 10 ** 9)
+    capped = (dynamic_fee(swap(1, sender="0x" + "44" * 20)[0], 16, 5), swap(1)[1])
+    tipped = (dynamic_fee(swap(2)[0], 100, 3), swap(2)[1])
+    pending = pending_state(capped, tipped, base_fee=base_fee)
+    assert order(pending) == [1, 2]
+    base_fee.next_base_fee = 14 * 10 ** 9
+    pending.on_head(100, {})
+    assert order(pending) == [2, 1]
+
+
+def test_replacement_takes_the_nonce():
+    pending = pending_state(swap(1, nonce=0), swap(2, nonce=0))
+    assert order(pending) == [2]
+    assert len(pending) == 1
+
+
+def test_exact_output_swaps_use_get_amount_in():
+    exact_out = (swap(1)[0], {"amountOut": 10 ** 18, "amountInMax": 2 * 10 ** 18, "path": [TOKEN_B, TOKEN_A]})
+    pending = pending_state(exact_out, swap(2))
+    reserves, _ = pending.reserves_before(bytes([2]) * 32, 10 ** 21, 10 ** 21)
+    amount_in = get_amount_in(10 ** 18, 10 ** 21, 10 ** 21)
+    assert reserves == (10 ** 21 + amount_in, 10 ** 21 - 10 ** 18)
+
+
+def test_reverting_swaps_leave_the_reserves():
+    short = (swap(1)[0], {"amountOut": 10 ** 18, "amountInMax": 10 ** 18, "path": [TOKEN_B, TOKEN_A]})
+    pending = pending_state(short, swap(2))
+    assert pending.reserves_before(bytes([2]) * 32, 10 ** 21, 10 ** 21) == ((10 ** 21, 10 ** 21), 1)
+
+
+def test_exact_input_swaps_use_get_amount_out():
+    pending = pending_state(swap(1, token_in=TOKEN_A, token_out=TOKEN_B), swap(2))
+    reserves, _ = pending.reserves_before(bytes([2]) * 32, 10 ** 21, 10 ** 21)
+    assert reserves == (10 ** 21 - get_amount_out(10 ** 18, 10 ** 21, 10 ** 21), 10 ** 21 + 10 ** 18)
+
+
+def test_multi_hop_exact_output_is_not_tracked():
+    pending = pending_state()
+    transaction = swap(1)[0]
+    params = {"amountOut": 10 ** 18, "amountInMax": 2 * 10 ** 18, "path": [TOKEN_B, TOKEN_A, "0x" + "55" * 20]}
+    assert pending.add_transaction(transaction, params) is None
+
+
+def test_mined_swaps_leave_the_projection():
+    pending = pending_state(swap(1), swap(2), swap(3))
+    pending.on_head(100, {SENDER: 2})
+    assert len(pending) == 1
+    assert bytes([1]) * 32 not in pending
+    _, ahead = pending.reserves_before(bytes([3]) * 32, 10 ** 21, 10 ** 21)
+    assert ahead == 0
+
+
+def test_on_head_keeps_other_senders():
+    other = "0x" + "44" * 20
+    pending = pending_state(swap(1), swap(2, sender=other, nonce=0))
+    pending.on_head(100, {SENDER: 1})
+    assert bytes([2]) * 32 in pending
+
+
+def test_project_reserves_reads_the_pending_state_once():
+    pending = pending_state(swap(1), swap(2))
+    registry = StubRegistry((10 ** 21, 10 ** 21))
+    transaction, params = swap(2)
+    pair_address, reserves, ahead = project_reserves(None, transaction, params["path"], pending, registry)
+    assert (pair_address, ahead, registry.reads) == (PAIR.lower(), 1, 1)
+    assert reserves == pending.reserves_before(transaction["hash"], 10 ** 21, 10 ** 21)[0]
+
+
+def test_project_reserves_skips_untracked_swaps():
+    registry = StubRegistry((10 ** 21, 10 ** 21))
+    transaction, params = swap(9)
+    assert project_reserves(None, transaction, params["path"], pending_state(), registry) is None
+    assert project_reserves(None, transaction, params["path"], None, registry) is None
+    assert registry.reads == 0
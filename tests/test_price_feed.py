@@ -0,0 +1,121 @@
+"""
+PriceOracle and get_liquidity_and_price against a local stand-in of the GeckoTerminal feed.
+"""
+import asyncio
+import time
+
+import pytest
+from web3 import Web3
+
+from services.get_liquidity_weth_usdc import get_liquidity_and_price
+from services.price_feed import PriceOracle
+from services.replay_provider import serve_price_stub
+
+USDC = "0xbbd3edd4d3b519c0d14965d9311185cfac8c3220"
+WETH = "0xe0232d625ea3b94698f0a7dff702931b704083c9"
+
+
+class StubRegistry:
+    """
+    1,000,000 USDC (6 decimals) against 400 WETH (18 decimals).
+    """
+
+    def reserves(self, web3, token_a, token_b, pair_address=None):
+        return 1_000_000 * 10 ** 6, 400 * 10 ** 18
+
+    def decimals(self, web3, token):
+        return 6 if token.lower() == USDC else 18
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server, url = serve_price_stub()
+    yield server, url
+    server.shutdown()
+
+
+@pytest.fixture
+def feed(stub_server):
+    server, url = stub_server
+    server.price_usd, server.status = 1.0, 200
+    return server, url
+
+
+def test_inline_refresh_is_cached_for_the_ttl(feed):
+    server, url = feed
+    oracle = PriceOracle(ttl=60, api=url)
+    assert oracle.get_price(USDC) == 1.0
+    server.price_usd = 0.98
+    assert oracle.get_price(USDC) == 1.0
+    assert oracle.failures == 0
+
+
+def test_outage_serves_the_fallback_then_the_last_price(feed):
+    server, url = feed
+    oracle = PriceOracle(ttl=0, max_staleness=60, api=url)
+    assert oracle.get_price(USDC) == 1.0
+    server.status = 503
+    assert oracle.get_price(USDC, fallback=lambda: 0.999) == 0.999
+    assert oracle.get_price(USDC) == 1.0
+    assert oracle.failures == 1
+
+
+def test_failed_fetch_is_retried_after_the_backoff(feed):
+    server, url = feed
+    oracle = PriceOracle(ttl=0, max_staleness=60, api=url, retry_backoff=0.05)
+    server.status = 503
+    assert oracle.get_price(USDC, fallback=lambda: 0.999) == 0.999
+    server.status = 200
+    assert oracle.get_price(USDC, fallback=lambda: 0.999) == 0.999
+    time.sleep(0.1)
+    assert oracle.get_price(USDC, fallback=lambda: 0.999) == 1.0
+    assert oracle.failures == 1
+
+
+def test_price_past_max_staleness_is_never_served(feed):
+    server, url = feed
+    oracle = PriceOracle(ttl=0, max_staleness=0.05, api=url)
+    oracle.get_price(USDC)
+    server.status = 503
+    time.sleep(0.1)
+    with pytest.raises(LookupError):
+        oracle.get_price(USDC)
+    assert oracle.get_price(USDC, fallback=lambda: 1.0) == 1.0
+
+
+def test_background_refresh_follows_the_feed_until_it_goes_down(feed):
+    server, url = feed
+
+    async def scenario():
+        oracle = PriceOracle(tokens=[USDC], ttl=0.05, max_staleness=0.15, refresh_interval=0.02, api=url)
+        await oracle.start()
+        try:
+            server.price_usd = 1.01
+            await asyncio.sleep(0.1)
+            assert oracle.get_price(USDC) == 1.01
+            server.status = 503
+            await asyncio.sleep(0.1)
+            assert oracle.get_price(USDC) == 1.01
+            assert oracle.get_price(USDC, fallback=lambda: 1.0) == 1.0
+            await asyncio.sleep(0.1)
+            with pytest.raises(LookupError):
+                oracle.get_price(USDC)
+            assert oracle.failures > 0
+        finally:
+            await oracle.stop()
+
+    asyncio.run(scenario())
+
+
+def test_pool_price_survives_a_feed_outage_past_max_staleness(feed, monkeypatch):
+    server, url = feed
+    monkeypatch.setenv("USDC_TOKEN", USDC)
+    monkeypatch.setenv("WETH_TOKEN", WETH)
+    oracle = PriceOracle(ttl=0, max_staleness=0.05, api=url)
+    server.price_usd = 1.002
+    assert get_liquidity_and_price(Web3(), oracle=oracle, registry=StubRegistry())[-1] == 1.002
+    server.status = 503
+    time.sleep(0.1)
+    result = get_liquidity_and_price(Web3(), oracle=oracle, registry=StubRegistry(), usdc_peg=1.0)
+    assert result[4] == pytest.approx(2500.0)
+    assert result[-2:] == (pytest.approx(2500.0), 1.0)
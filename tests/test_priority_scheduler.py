@@ -0,0 +1,47 @@
+"""
+PriorityScheduler ordering: effective priority fee first, then the tiebreak score.
+"""
+import asyncio
+
+from core.pipeline import PipelineItem, estimated_profit
+from core.priority_scheduler import PriorityScheduler
+
+
+def item(i, tip, profit=None):
+    item = PipelineItem(bytes([i]) * 32)
+    item.transaction = {
+        "hash": item.transaction_hash, "from": "0x" + f"{i:040x}", "nonce": 0,
+        "maxFeePerGas": 100 * 10 ** 9, "maxPriorityFeePerGas": tip * 10 ** 9,
+    }
+    item.estimate = None if profit is None else ("0x" + "ab" * 20, 1.0, profit, 0.01)
+    return item
+
+
+def drain(scheduler):
+    async def get_all():
+        return [(await scheduler.get()).transaction_hash[0] for _ in range(scheduler.qsize())]
+
+    return asyncio.run(get_all())
+
+
+def test_equal_fees_go_by_estimated_profit():
+    scheduler = PriorityScheduler("decode", 10, tiebreak=estimated_profit)
+    for queued in (item(1, 1, 5.0), item(2, 1), item(3, 1, 9.0), item(4, 2, 1.0)):
+        scheduler.put_nowait(queued)
+    assert drain(scheduler) == [4, 3, 1, 2]
+
+
+def test_without_tiebreak_equal_fees_keep_arrival_order():
+    scheduler = PriorityScheduler("decode", 10)
+    for queued in (item(1, 1, 5.0), item(2, 1), item(3, 1, 9.0)):
+        scheduler.put_nowait(queued)
+    assert drain(scheduler) == [1, 2, 3]
+
+
+def test_full_queue_evicts_the_least_profitable_tie():
+    evicted = []
+    scheduler = PriorityScheduler("decode", 2, on_evict=evicted.append, tiebreak=estimated_profit)
+    for queued in (item(1, 1, 5.0), item(2, 1, 1.0), item(3, 1, 9.0)):
+        scheduler.put_nowait(queued)
+    assert [evicted_item.transaction_hash[0] for evicted_item in evicted] == [2]
+    assert drain(scheduler) == [3, 1]
@@ -0,0 +1,35 @@
+"""
+First-hop victim amounts the sharded sandwich estimate is sized against.
+"""
+from core.sharded_analysis import victim_amounts
+from core.swap_decoder import SwapCall
+from core.uniswap_v2_library import get_amount_in
+
+PATH = ("0x" + "11" * 20, "0x" + "22" * 20)
+RESERVES = (10 ** 24, 10 ** 21)
+
+
+def call(path=PATH, **amounts):
+    return SwapCall(b"\x00" * 4, "swap", path=path, **amounts)
+
+
+def test_exact_input_uses_amount_in():
+    assert victim_amounts(call(amount_in=10 ** 20, amount_out_min=5), *RESERVES) == (10 ** 20, 5)
+
+
+def test_exact_output_pays_get_amount_in_not_amount_in_max():
+    amount_in = get_amount_in(10 ** 18, *RESERVES)
+    amount_in, min_out = victim_amounts(call(amount_out=10 ** 18, amount_in_max=2 * amount_in), *RESERVES)
+    assert amount_in == get_amount_in(10 ** 18, *RESERVES)
+    assert min_out == 10 ** 18 // 2
+
+
+def test_exact_output_that_would_revert_is_skipped():
+    amount_in = get_amount_in(10 ** 18, *RESERVES)
+    assert victim_amounts(call(amount_out=10 ** 18, amount_in_max=amount_in - 1), *RESERVES) is None
+    assert victim_amounts(call(amount_out=RESERVES[1], amount_in_max=10 ** 30), *RESERVES) is None
+
+
+def test_multi_hop_exact_output_is_skipped():
+    path = PATH + ("0x" + "33" * 20,)
+    assert victim_amounts(call(path=path, amount_out=10 ** 18, amount_in_max=10 ** 24), *RESERVES) is None
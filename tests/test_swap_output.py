@@ -0,0 +1,69 @@
+"""
+Streaming swap writers: background flushes, rotation and the capture readers.
+"""
+import time
+
+from services.swap_output import ColumnarSwapWriter, JsonlSwapWriter, iter_jsonl_swaps, open_columnar_swaps
+
+
+def swap(i):
+    return {
+        "hash": bytes([i]) * 32, "from": "0x" + "11" * 20, "input": bytes.fromhex("7ff36ab5") + bytes(64),
+        "nonce": i, "gasPrice": 10 ** 9, "value": 10 ** 16,
+    }
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_quiet_period_flushes_a_partial_buffer(tmp_path):
+    writer = JsonlSwapWriter(str(tmp_path), flush_records=16, flush_seconds=0.05)
+    try:
+        for i in range(3):
+            writer.write(swap(i), {"profit": i})
+        assert wait_for(lambda: writer.path is not None and len(list(iter_jsonl_swaps(writer.path))) == 3)
+    finally:
+        writer.close()
+
+
+def test_close_writes_every_queued_swap(tmp_path):
+    writer = ColumnarSwapWriter(str(tmp_path), flush_records=1000, flush_seconds=60)
+    for i in range(50):
+        writer.write(swap(i), {"profit": float(i)})
+    writer.close()
+    records = open_columnar_swaps(writer.path)
+    assert len(records) == 50
+    assert records["profit"].tolist() == [float(i) for i in range(50)]
+    assert records["nonce"].tolist() == list(range(50))
+
+
+def test_failed_write_is_counted_and_the_writer_keeps_draining(tmp_path):
+    writer = JsonlSwapWriter(str(tmp_path), flush_records=1)
+    opened = writer.open
+    failures = [OSError("No space left on device")]
+
+    def open_or_fail():
+        if failures:
+            raise failures.pop()
+        opened()
+
+    writer.open = open_or_fail
+    for i in range(3):
+        writer.write(swap(i))
+    writer.close()
+    assert writer.failed == 1
+    assert [record["transaction"]["nonce"] for record in iter_jsonl_swaps(writer.path)] == [1, 2]
+
+
+def test_rotates_past_max_bytes(tmp_path):
+    writer = JsonlSwapWriter(str(tmp_path), max_bytes=1, flush_records=1)
+    for i in range(3):
+        writer.write(swap(i))
+    writer.close()
+    files = sorted(tmp_path.glob("swaps-*.jsonl"))
+    assert len(files) == 3
+    assert [len(list(iter_jsonl_swaps(str(path)))) for path in files] == [1, 1, 1]
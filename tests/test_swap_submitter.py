@@ -0,0 +1,92 @@
+"""
+A nonce or base fee restored from warm state never replaces the submitter's first chain read.
+"""
+import json
+import time
+from types import SimpleNamespace
+
+from eth_account import Account
+from eth_account.typed_transactions import TypedTransaction
+from web3 import Web3
+
+from config import CHAIN_ID
+from core.swap_submitter import SwapSubmitter
+from core.warm_state import WARM_STATE_VERSION, WarmState
+
+PATH = ["0x" + "11" * 20, "0x" + "22" * 20]
+
+
+class StubEth:
+    def __init__(self, base_fee):
+        self.head = {"number": 200, "baseFeePerGas": base_fee, "gasLimit": 30_000_000, "gasUsed": 15_000_000}
+        self.blocks_read = 0
+        self.pending_nonce = 0
+        self.sent = []
+
+    def get_block(self, block_identifier):
+        self.blocks_read += 1
+        return self.head
+
+    def get_transaction_count(self, address, block_identifier):
+        return self.pending_nonce
+
+    def estimate_gas(self, transaction):
+        return 150_000
+
+    def send_raw_transaction(self, raw_transaction):
+        self.sent.append(raw_transaction)
+        return Web3.keccak(raw_transaction)
+
+
+def submitter(base_fee):
+    web3 = SimpleNamespace(eth=StubEth(base_fee), to_wei=Web3.to_wei)
+    return SwapSubmitter(web3, {"address": "0x" + "33" * 20}, account=Account.create(), tip_gwei=2,
+                         chain_id=11155111)
+
+
+def snapshot(path, next_base_fee):
+    path.write_text(json.dumps({
+        "version": WARM_STATE_VERSION, "saved_at": time.time() - 500, "chain_id": CHAIN_ID,
+        "base_fee": {"block_number": 100, "base_fee": next_base_fee, "next_base_fee": next_base_fee},
+    }))
+
+
+def sent(swap_submitter, field):
+    return TypedTransaction.from_bytes(swap_submitter.web3.eth.sent[-1]).as_dict()[field]
+
+
+def test_restored_base_fee_is_primed_from_the_chain(tmp_path):
+    swap_submitter = submitter(base_fee=50 * 10 ** 9)
+    snapshot(tmp_path / "warm.json", 5 * 10 ** 9)
+    restored = WarmState(str(tmp_path / "warm.json"), base_fee=swap_submitter.base_fee, cache=None,
+                         registry=None).restore()
+    assert restored["block_number"] == 100
+    assert not swap_submitter.base_fee.live
+
+    swap_submitter.swap_exact_eth_for_tokens(10 ** 16, 1, PATH)
+    assert swap_submitter.web3.eth.blocks_read == 1
+    assert swap_submitter.base_fee.block_number == 200
+    assert sent(swap_submitter, "maxFeePerGas") == 52 * 10 ** 9
+
+
+def test_live_base_fee_is_not_read_again():
+    swap_submitter = submitter(base_fee=50 * 10 ** 9)
+    swap_submitter.swap_exact_eth_for_tokens(10 ** 16, 1, PATH)
+    swap_submitter.swap_exact_eth_for_tokens(10 ** 16, 1, PATH)
+    assert swap_submitter.web3.eth.blocks_read == 1
+
+
+def test_restored_nonce_ahead_of_the_chain_is_lowered():
+    swap_submitter = submitter(base_fee=50 * 10 ** 9)
+    swap_submitter.web3.eth.pending_nonce = 7
+    swap_submitter.nonces.restore(9)
+    swap_submitter.swap_exact_eth_for_tokens(10 ** 16, 1, PATH)
+    assert sent(swap_submitter, "nonce") == 7
+
+
+def test_late_sync_does_not_rewind_handed_out_nonces():
+    swap_submitter = submitter(base_fee=50 * 10 ** 9)
+    swap_submitter.web3.eth.pending_nonce = 3
+    assert swap_submitter.nonces.next() == 3
+    swap_submitter.nonces.sync()
+    assert swap_submitter.nonces.next() == 4
@@ -2,12 +2,13 @@ from config import ROUTER_CHECKSUM_ADDRESS
 from data.constants import SWAP_SELECTORS
 
 
-def is_uniswap_router_transaction(transaction):
+def is_uniswap_router_transaction(transaction, router_address=ROUTER_CHECKSUM_ADDRESS):
     """
     Analyzes if a transaction is a Uniswap router swap transaction.
 
     Args:
         transaction (dict): The transaction to analyze
+        router_address (str, optional): Defaults to ROUTER_CHECKSUM_ADDRESS.
 
     Returns:
         bool: True if the transaction is a Uniswap router swap
@@ -15,6 +16,6 @@ def is_uniswap_router_transaction(transaction):
     return (
         transaction
         and transaction.get("to")
-        and transaction["to"].lower() == ROUTER_CHECKSUM_ADDRESS.lower()
+        and transaction["to"].lower() == router_address.lower()
         and transaction["input"][:4] in SWAP_SELECTORS
     )